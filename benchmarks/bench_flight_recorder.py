@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the flight recorder's overhead on a successful run.
+Times the recorder's event handlers against a no-op baseline with stand-in
+console messages, responses and protocol calls. If Playwright is installed,
+it also clicks and fills through a synthetic page in headless Chromium with
+and without the recorder attached. Run from the repository root:
+
+    python benchmarks/bench_flight_recorder.py [event_count]
+"""
+
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.flight_recorder import FlightRecorder  # noqa: E402
+
+RUNS = 5
+BROWSER_ACTIONS = 200
+
+
+def build_events(count: int):
+    """A mix of protocol calls, console messages and responses in the proportions a booking run sees."""
+    request = SimpleNamespace(resource_type='xhr', method='GET')
+    asset = SimpleNamespace(resource_type='image', method='GET')
+    events = []
+    for i in range(count):
+        kind = i % 4
+        if kind == 0:
+            events.append(('call', ('click', {'selector': f'button:has-text("Slot {i}")', 'timeout': 10000})))
+        elif kind == 1:
+            events.append(('call', ('querySelectorAll', {'selector': 'div.card'})))
+        elif kind == 2:
+            events.append(('console', SimpleNamespace(type='log', text=f'render {i}')))
+        else:
+            events.append(('response', SimpleNamespace(
+                status=200, url=f'https://api.playo.io/slots/{i}', request=request if i % 8 == 3 else asset
+            )))
+    return events
+
+
+def bench_handlers(events):
+    """Median per-event cost of the recorder's handlers and of a no-op handler, in microseconds."""
+    recorder = FlightRecorder(out_dir=tempfile.gettempdir())
+    handlers = {
+        'call': lambda args: recorder._on_call(*args),
+        'console': lambda message: recorder._add('console', f"{message.type}: {message.text}"),
+        'response': recorder._on_response,
+    }
+
+    def noop(_):
+        pass
+
+    recorded, baseline = [], []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        for kind, payload in events:
+            noop(payload)
+        baseline.append((time.perf_counter() - start) * 1e6 / len(events))
+
+        start = time.perf_counter()
+        for kind, payload in events:
+            handlers[kind](payload)
+        recorded.append((time.perf_counter() - start) * 1e6 / len(events))
+    return sorted(recorded)[RUNS // 2], sorted(baseline)[RUNS // 2], len(recorder.events)
+
+
+async def bench_browser():
+    """Median wall time for a click/fill loop without and with the recorder attached, in milliseconds."""
+    from playwright.async_api import async_playwright
+
+    html = (
+        '<html><body><input id="q"><button id="b" onclick="console.log(\'clicked\')">Go</button>'
+        '<div role="dialog">Pick a slot</div></body></html>'
+    )
+
+    async def actions(page):
+        start = time.perf_counter()
+        for i in range(BROWSER_ACTIONS // 2):
+            await page.fill('#q', f'court {i}')
+            await page.click('#b')
+        return (time.perf_counter() - start) * 1000
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        plain, recorded = [], []
+        for _ in range(RUNS):
+            context = await browser.new_context()
+            page = await context.new_page()
+            await page.set_content(html)
+            plain.append(await actions(page))
+            await context.close()
+
+            context = await browser.new_context()
+            page = await context.new_page()
+            await page.set_content(html)
+            recorder = FlightRecorder(out_dir=tempfile.gettempdir())
+            await recorder.attach(context, current_page=lambda: page)
+            await recorder.mark_step('bench')
+            recorded.append(await actions(page))
+            await context.close()
+        await browser.close()
+        return sorted(plain)[RUNS // 2], sorted(recorded)[RUNS // 2]
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    recorded_us, baseline_us, kept = bench_handlers(build_events(count))
+    print(f"events={count} kept in ring={kept}")
+    print(f"handler median={recorded_us:.2f}us/event baseline={baseline_us:.2f}us/event "
+          f"overhead={recorded_us - baseline_us:.2f}us/event")
+
+    try:
+        plain_ms, recorded_ms = asyncio.run(bench_browser())
+    except ImportError:
+        print("⚠️ Playwright not installed; skipping in-browser comparison")
+        return 0
+    print(f"browser {BROWSER_ACTIONS} actions median: plain={plain_ms:.1f}ms recorded={recorded_ms:.1f}ms "
+          f"({(recorded_ms / plain_ms - 1) * 100:+.1f}%)")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
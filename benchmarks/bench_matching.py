@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Microbenchmark for the fuzzy matching index.
+Builds synthetic catalogues of venue names and reports index build time and
+query latency percentiles, checking the p99 budget at every size. Run from the
+repository root:
+
+    python benchmarks/bench_matching.py [venue_count ...]
+"""
+
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.matching import MatchIndex  # noqa: E402
+
+PREFIXES = ['Smash', 'Ace', 'Shuttle', 'Turf', 'Play', 'Sports', 'Court', 'Arena', 'Hub', 'Box']
+SUFFIXES = ['Arena', 'Club', 'Zone', 'Park', 'Centre', 'Courts', 'Academy', 'Point', 'Field', 'Den']
+AREAS = ['HSR Layout', 'Koramangala', 'Bellandur', 'Indiranagar', 'Whitefield', 'Marathahalli',
+         'Jayanagar', 'BTM Layout', 'Electronic City', 'Sarjapur Road', 'Hebbal', 'Yelahanka']
+BUDGET_MS = 1.0
+SIZES = (5000, 20000)  # Search gathers at most MAX_PROBE_POSTINGS candidates, so cost should stay flat
+
+
+def build_names(count: int, rng: random.Random):
+    """Generate unique venue names in the "<Venue> - <Area>" format used by Playo."""
+    names = []
+    for i in range(count):
+        names.append(f"{rng.choice(PREFIXES)} {rng.choice(SUFFIXES)} {i} - {rng.choice(AREAS)}")
+    return names
+
+
+def build_queries(names, rng: random.Random, count: int = 2000):
+    """Mix exact names, prefixes, typos and multi-token queries."""
+    queries = []
+    for _ in range(count):
+        name = rng.choice(names)
+        kind = rng.randrange(4)
+        if kind == 0:
+            queries.append(name)
+        elif kind == 1:
+            queries.append(name[:rng.randint(3, 10)])
+        elif kind == 2:
+            pos = rng.randrange(len(name))
+            queries.append(name[:pos] + name[pos + 1:])
+        else:
+            parts = name.replace(' - ', ' ').split()
+            queries.append(' '.join(rng.sample(parts, 2)))
+    return queries
+
+
+def percentile(samples, pct: float) -> float:
+    """Nearest-rank percentile of a sorted list."""
+    return samples[min(len(samples) - 1, int(len(samples) * pct / 100))]
+
+
+def bench(count: int) -> bool:
+    """Benchmark one catalogue size and report whether p99 is within budget."""
+    rng = random.Random(42)
+    names = build_names(count, rng)
+    queries = build_queries(names, rng)
+
+    start = time.perf_counter()
+    index = MatchIndex(names)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        index.search(query)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+
+    p50, p99 = percentile(timings, 50), percentile(timings, 99)
+    print(f"venues={count} build={build_ms:.1f}ms queries={len(queries)}")
+    print(f"search p50={p50:.3f}ms p99={p99:.3f}ms max={timings[-1]:.3f}ms")
+    print(f"{'✅' if p99 < BUDGET_MS else '❌'} p99 budget {BUDGET_MS}ms")
+    return p99 < BUDGET_MS
+
+
+def main():
+    sizes = [int(arg) for arg in sys.argv[1:]] or SIZES
+    results = [bench(count) for count in sizes]
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Benchmark for snapshot extraction against in-browser extraction.
+Builds a synthetic venue result page (or loads a saved HTML fixture) and
+times venue extraction in Python. If Playwright is installed, it also loads
+the page into headless Chromium and times the per-card DOM queries that
+VenueFinder makes on the browser backend. Run from the repository root:
+
+    python benchmarks/bench_snapshot.py [card_count | fixture.html]
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import SELECTORS  # noqa: E402
+from src.snapshot import Snapshot, extract_venues  # noqa: E402
+from bench_matching import AREAS, PREFIXES, SUFFIXES  # noqa: E402
+
+RUNS = 5
+
+
+def build_page(count: int, rng: random.Random) -> str:
+    """Venue listing markup shaped like Playo's result grid, padded with page chrome."""
+    cards = []
+    for i in range(count):
+        name = f"{rng.choice(PREFIXES)} {rng.choice(SUFFIXES)} {i} - {rng.choice(AREAS)}"
+        cards.append(
+            '<div class="border_radius bg-white card_shadow pb-2 cursor-pointer">'
+            f'<img src="https://playo.gumlet.io/venue{i}.jpg" alt="">'
+            '<div class="flex flex-col px-3 mt-2">'
+            f'<div class="title_large truncate text-base font-semibold">{name}</div>'
+            '<div class="flex items-center gap-1 text-xs text-gray-500">'
+            f'<span class="overflow-hidden truncate">({rng.uniform(0.3, 25):.1f} km)</span>'
+            f'<span class="text-xs">{rng.uniform(3, 5):.1f}</span></div>'
+            '<div class="flex gap-2"><span class="text-xs">Badminton</span><span class="text-xs">Tennis</span></div>'
+            '</div></div>'
+        )
+    chrome = ''.join(f'<nav class="flex gap-4"><a href="/p{i}">Link {i}</a></nav>' for i in range(50))
+    return (
+        '<html><head><script>window.__DATA__ = {};</script></head><body>'
+        f'{chrome}<div class="grid w-full grid-cols-1 gap-11">{"".join(cards)}</div></body></html>'
+    )
+
+
+def bench_snapshot(html: str):
+    """Median wall time for parse plus extraction, and the venue count."""
+    timings = []
+    for _ in range(RUNS):
+        start = time.perf_counter()
+        _, venues = extract_venues(Snapshot(html))
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[RUNS // 2], len(venues)
+
+
+async def bench_browser(html: str):
+    """Median wall time for the browser backend's card-by-card extraction and for page.content()."""
+    from playwright.async_api import async_playwright
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+        await page.set_content(html)
+        card_selector = SELECTORS["venue_cards"][0]
+
+        dom_timings, content_timings = [], []
+        for _ in range(RUNS):
+            start = time.perf_counter()
+            cards = await page.query_selector_all(card_selector)
+            for card in cards:
+                for name_selector in SELECTORS["venue_name_selectors"]:
+                    name_el = await card.query_selector(name_selector)
+                    if name_el and len((await name_el.inner_text()).strip()) > 3:
+                        break
+                for dist_selector in SELECTORS["venue_distance_selectors"]:
+                    dist_els = await card.query_selector_all(dist_selector)
+                    texts = [(await el.inner_text()) for el in dist_els]
+                    if any('km' in text for text in texts):
+                        break
+            dom_timings.append((time.perf_counter() - start) * 1000)
+
+            start = time.perf_counter()
+            await page.content()
+            content_timings.append((time.perf_counter() - start) * 1000)
+
+        await browser.close()
+        return sorted(dom_timings)[RUNS // 2], sorted(content_timings)[RUNS // 2]
+
+
+def main():
+    arg = sys.argv[1] if len(sys.argv) > 1 else '500'
+    if arg.endswith(('.html', '.htm')):
+        with open(arg, 'r', encoding='utf-8') as f:
+            html = f.read()
+        label = os.path.basename(arg)
+    else:
+        html = build_page(int(arg), random.Random(42))
+        label = f"{arg} synthetic cards"
+
+    snapshot_ms, found = bench_snapshot(html)
+    print(f"page={label} size={len(html) / 1024:.0f}KiB venues={found}")
+    print(f"snapshot parse+extract median={snapshot_ms:.1f}ms")
+
+    try:
+        dom_ms, content_ms = asyncio.run(bench_browser(html))
+    except ImportError:
+        print("⚠️ Playwright not installed; skipping in-browser comparison")
+        return 0
+    print(f"browser per-card queries median={dom_ms:.1f}ms")
+    print(f"page.content() median={content_ms:.1f}ms -> snapshot total ~{content_ms + snapshot_ms:.1f}ms")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Soak test for handle lifecycle in the scrape paths.
+Loads a synthetic venue result page into headless Chromium and runs
+VenueFinder's venue scrape hundreds of times, sampling the renderer's JS
+heap (after a forced GC), its DOM node count and this process's RSS.
+Leaked ElementHandles show up as steady renderer heap growth. Run from the
+repository root (needs Playwright and Chromium):
+
+    python benchmarks/soak_scrape.py [scans] [card_count]
+"""
+
+import asyncio
+import contextlib
+import io
+import os
+import random
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import src.venue_finder as venue_finder_module  # noqa: E402
+from src.selector_cache import selector_resolver  # noqa: E402
+from src.utils import HandleScope  # noqa: E402
+from src.venue_finder import VenueFinder  # noqa: E402
+from src.venue_index import VenueIndex  # noqa: E402
+from bench_snapshot import build_page  # noqa: E402
+
+SAMPLE_EVERY = 25
+MAX_HEAP_GROWTH = 0.10  # Allowed renderer heap growth between the first and last sample
+
+
+def rss_mib() -> float:
+    """Resident set size of this process, 0 where /proc is unavailable."""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2 ** 20
+    except (OSError, ValueError):
+        return 0.0
+
+
+async def sample(cdp):
+    """Renderer heap after GC (MiB) and DOM node count."""
+    await cdp.send('HeapProfiler.collectGarbage')
+    heap = await cdp.send('Runtime.getHeapUsage')
+    metrics = await cdp.send('Performance.getMetrics')
+    nodes = next((m['value'] for m in metrics['metrics'] if m['name'] == 'Nodes'), 0)
+    return heap['usedSize'] / 2 ** 20, int(nodes)
+
+
+async def soak(scans: int, cards: int) -> int:
+    from playwright.async_api import async_playwright
+
+    workdir = tempfile.mkdtemp(prefix="soak-")
+    selector_resolver.path = os.path.join(workdir, "selector_cache.json")
+    # No network payloads on a static page; skip the capture wait
+    venue_finder_module.CAPTURE_WAIT_SECONDS = 0
+
+    async with async_playwright() as p:
+        browser = await p.chromium.launch()
+        page = await browser.new_page()
+        await page.set_content(build_page(cards, random.Random(7)))
+        cdp = await page.context.new_cdp_session(page)
+        await cdp.send('Performance.enable')
+
+        finder = VenueFinder(page, VenueIndex(path=os.path.join(workdir, "catalogue.json")))
+        samples = []
+        for scan in range(1, scans + 1):
+            with contextlib.redirect_stdout(io.StringIO()):
+                venues = await finder._scrape_venues()
+            if scan == 1 or scan % SAMPLE_EVERY == 0:
+                heap, nodes = await sample(cdp)
+                samples.append((scan, heap, nodes, rss_mib()))
+                print(f"scan={scan:4d} venues={len(venues)} heap={heap:.2f}MiB nodes={nodes} "
+                      f"rss={samples[-1][3]:.1f}MiB handles={len(finder.handles)}")
+
+        await browser.close()
+
+    first, last = samples[0], samples[-1]
+    growth = (last[1] - first[1]) / first[1] if first[1] else 0.0
+    print(f"renderer heap {first[1]:.2f} → {last[1]:.2f} MiB ({growth:+.1%}), "
+          f"handles disposed by scopes: {HandleScope.disposed}")
+    ok = growth < MAX_HEAP_GROWTH
+    print(f"{'✅' if ok else '❌'} heap growth budget {MAX_HEAP_GROWTH:.0%}")
+    return 0 if ok else 1
+
+
+def main():
+    scans = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    cards = int(sys.argv[2]) if len(sys.argv) > 2 else 60
+    try:
+        return asyncio.run(soak(scans, cards))
+    except ImportError:
+        print("⚠️ Playwright not installed; the soak test needs a browser")
+        return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
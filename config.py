@@ -15,14 +15,103 @@ LONG_TIMEOUT = 15000
 HOVER_DELAY = 0.5
 CLICK_DELAY = 0.5
 OTP_WAIT_TIME = 10  # seconds
+BOOKING_BUDGET_SECONDS = 300  # Overall latency budget for a run, excluding time spent at prompts
 
 # Booking Configuration
 DEFAULT_DURATION_HOURS = 1.0
 DURATION_INCREMENT = 0.5  # Each plus click adds 30 minutes
+SLOT_MINUTES = 60  # Length of a listed slot when neither the payload nor its label gives one
 
 # Venue Display Configuration
 VENUE_BATCH_SIZE = 3
 
+# Venue Catalogue Configuration
+VENUE_CATALOGUE_PATH = os.path.join(os.getcwd(), "venue_catalogue.json")
+
+# Network Capture Configuration
+NETWORK_CAPTURE_ENABLED = True
+CAPTURE_URL_PATTERNS = [r"api\.playo\.(io|co)", r"playo\.co/api/", r"/(venues?|slots?|availability|courts?)\b"]
+CAPTURE_MAX_RECORDS = 20  # Payloads kept per record kind
+CAPTURE_WAIT_SECONDS = 3
+
+# Availability Client Configuration
+AVAILABILITY_BASE_URL = None  # e.g. "http://127.0.0.1:8080" to replay against a stand-in server
+AVAILABILITY_CONCURRENCY = 4  # Requests in flight at once
+AVAILABILITY_RATE_LIMIT = 2  # Requests per second, shared by every scan
+AVAILABILITY_CACHE_TTL = 60  # seconds
+AVAILABILITY_SCAN_DAYS = 7  # Dates covered by `python main.py scan` when none are given
+AVAILABILITY_SCAN_DIR = os.path.join(os.getcwd(), "availability_scans")  # One JSON lines file per scanned date
+
+# Extraction Configuration
+EXTRACTION_BACKEND = "browser"  # "browser" queries the live DOM, "snapshot" parses page.content() in Python
+SNAPSHOT_WORKERS = 2  # Threads parsing snapshots
+
+# Retry Configuration
+RETRY_DEFAULT = {"attempts": 3, "base_delay": 0.5, "max_delay": 8.0}
+RETRY_POLICIES = {  # Per-step overrides of RETRY_DEFAULT
+    "login": {"attempts": 1},  # Never re-send an OTP on its own
+    # Steps that prompt would ask the same question again; their "<step> (replay)" runs keep the default
+    "sport": {"attempts": 1},
+    "venue": {"attempts": 1},
+    "date": {"attempts": 1},
+    "duration": {"attempts": 1},
+    "slot": {"attempts": 1},
+    "court": {"attempts": 1},
+    "checkout": {"attempts": 1},  # A rerun would add to the cart again
+    "book now": {"attempts": 1},  # The Book Now click retries itself
+    "book now click": {"attempts": 4, "base_delay": 1.0},
+    "availability": {"attempts": 3, "base_delay": 0.25, "max_delay": 2.0},
+}
+CIRCUIT_FAILURE_THRESHOLD = 5  # Consecutive transient failures before calls stop
+CIRCUIT_RESET_SECONDS = 30
+
+# Latency History Configuration
+LATENCY_DB_PATH = os.path.join(os.getcwd(), "latency_history.sqlite3")
+LATENCY_WINDOW = 200  # Latest successful samples per step used for learning
+ADAPTIVE_TIMEOUT_MIN_SAMPLES = 5  # Below this a step runs on the overall budget alone
+ADAPTIVE_TIMEOUT_MARGIN = 1.5  # Learned timeout = p99 * margin + pad
+ADAPTIVE_TIMEOUT_PAD = 2.0  # seconds
+ADAPTIVE_TIMEOUT_MIN = 5.0  # seconds
+ADAPTIVE_TIMEOUT_MAX = 180.0  # seconds
+LATENCY_REPORT_DAYS = 90  # History covered by `python main.py report <split>`
+TREND_RECENT_DAYS = 7
+TREND_BASELINE_DAYS = 28  # Days before the recent window used as the baseline
+TREND_REGRESSION_THRESHOLD = 0.25  # p50 growth flagged as a regression
+
+# Flight Recorder Configuration
+FLIGHT_RECORDER_ENABLED = True
+FLIGHT_RECORDER_CAPACITY = 500  # Events kept in memory
+FLIGHT_RECORDER_DIR = os.path.join(os.getcwd(), "flight_recorder")  # Dumps, one folder per failed step
+FLIGHT_RECORDER_TRACING = False  # Keep a Playwright trace of the current step (costly; dumped on failure)
+FLIGHT_RECORDER_SNIPPET_CHARS = 300  # DOM snippet length taken at each step start
+
+# Diagnostics Configuration (also enabled by `python main.py diagnose`)
+DIAGNOSTICS_ENABLED = False
+DIAGNOSTICS_DIR = os.path.join(os.getcwd(), "diagnostics")  # Profiles and summaries, one folder per run
+SLOW_CALLBACK_SECONDS = 0.1  # asyncio debug reports callbacks that hold the loop longer than this
+STALL_THRESHOLD_SECONDS = 0.5  # Loop lag after which the loop thread's stack is sampled
+STALL_SAMPLE_INTERVAL = 0.05  # seconds
+DIAGNOSTICS_PROFILE = True  # cProfile each step
+DIAGNOSTICS_TRACE_ALLOCATIONS = True  # tracemalloc snapshots around each step (slow)
+DIAGNOSTICS_TRACE_FRAMES = 25  # Stack depth kept per allocation
+
+# Metrics Configuration
+METRICS_ENABLED = False  # Serve Prometheus metrics while the flow runs and the browser stays open
+METRICS_HOST = "127.0.0.1"
+METRICS_PORT = 9464
+METRICS_LATENCY_BUCKETS = (0.5, 1, 2, 5, 10, 30, 60, 120)  # Step duration histogram bounds, seconds
+
+# Logging Configuration
+LOG_LEVEL = "INFO"  # Console level; "DEBUG" also shows every click and fill
+LOG_JSON_PATH = os.path.join(os.getcwd(), "playo_log.jsonl")  # Structured copy of every record; None to disable
+LOG_FAST_MODE = False  # Drop per-click logging entirely, from the console and the JSON log
+
+# Checkpoint Configuration
+CHECKPOINT_PATH = os.path.join(os.getcwd(), "booking_checkpoint.json")
+
+# Selector Cache Configuration
+SELECTOR_CACHE_PATH = os.path.join(os.getcwd(), "selector_cache.json")
+
 # Selectors - organized by functionality
 SELECTORS = {
     # Authentication
@@ -33,6 +122,9 @@ SELECTORS = {
     "verify_button": 'button.bg-primary.new-button:has-text("VERIFY")',
     "error_modal_ok": 'button.bg-error.text-on_error',
     
+    # Blocking Overlays
+    "popup_close_button": 'div[role="dialog"]:not(:has(input)) button[aria-label="Close"]',
+    
     # Sports Selection
     "popular_sports_header": 'h3:has-text("Popular Sports")',
     "sports_container": 'div.flex.mt-6.gap-6.overflow-x-auto',
@@ -56,8 +148,8 @@ SELECTORS = {
     "venue_distance_selectors": [
         '.overflow-hidden.truncate',
         '[class*="overflow-hidden"][class*="truncate"]',
-        'div:contains("km")',
-        'span:contains("km")'
+        'div:text("km")',
+        'span:text("km")'
     ],
     
     # Booking Flow
@@ -70,6 +162,15 @@ SELECTORS = {
     "date_picker_button": 'button#headlessui-popover-button-6',
     "calendar_popover": 'div[id^="headlessui-popover-panel-"]',
     "calendar_days": 'div[id^="headlessui-popover-panel-"] div.cursor-pointer.font-medium',
+    # Month navigation is only clicked through buttons that say what they do
+    "calendar_next_buttons": [
+        'div[id^="headlessui-popover-panel-"] button[aria-label*="next" i]',
+        'div[id^="headlessui-popover-panel-"] button[title*="next" i]'
+    ],
+    "calendar_prev_buttons": [
+        'div[id^="headlessui-popover-panel-"] button[aria-label*="prev" i]',
+        'div[id^="headlessui-popover-panel-"] button[title*="prev" i]'
+    ],
     
     # Time Selection
     "time_picker_buttons": [
@@ -85,6 +186,7 @@ SELECTORS = {
     # Duration
     "duration_text": 'div.text-sm.font-semibold.text-gray-700.capitalize',
     "plus_button_svg": 'svg:has(path[d="M10 3a1 1 0 011 1v5h5a1 1 0 110 2h-5v5a1 1 0 11-2 0v-5H4a1 1 0 110-2h5V4a1 1 0 011-1z"])',
+    "minus_button_svg": 'svg:has(path[d="M3 10a1 1 0 011-1h12a1 1 0 110 2H4a1 1 0 01-1-1z"])',
     
     # Court Selection
     "court_selector_span": 'span.block.px-3.font-semibold.text-base.truncate',
@@ -106,6 +208,12 @@ SELECTORS = {
     ]
 }
 
+# Class pattern marking a calendar day cell that belongs to the previous or next month
+CALENDAR_OUTSIDE_CLASSES = r"\b(outside|other-month|adjacent-month|disabled)\b"
+
+# Overlays dismissed automatically by the popup guard (keys into SELECTORS)
+BLOCKING_OVERLAYS = ["error_modal_ok", "popup_close_button"]
+
 # Garbage filter patterns for venue names
 VENUE_GARBAGE_PATTERNS = [
     'featured', 'regular', 'mixed doubles', 'doubles', 'singles',
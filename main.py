@@ -1,5 +1,3 @@
-## 📄 main.py (UPDATED)
-```python
 #!/usr/bin/env python3
 """
 Playo Sports Venue Booking Automation
@@ -8,79 +6,356 @@ Main entry point for the booking automation script.
 
 import asyncio
 import os
+import sys
+from datetime import date, timedelta
+from itertools import chain
+from typing import Awaitable, Callable, List, Optional
 from playwright.async_api import async_playwright
 
 from src.auth import PlayoAuth
+from src.checkpoint import Checkpoint, CheckpointStore, Step, StepGraph
+from src.deadline import BudgetExceeded, Deadline, prompt
+from src.diagnostics import diagnostics
+from src.flight_recorder import flight_recorder
+from src.latency import latency_history, round_trip_counter
+from src.log import get_logger, setup_logging, start_job
+from src.metrics import metrics
+from src.models import dump_jsonl
+from src.network_capture import network_capture
+from src.popups import popup_guard
 from src.venue_finder import VenueFinder
 from src.booking import BookingFlow
+from src.selector_registry import selector_registry
 from src.utils import setup_browser_context, add_mouse_cursor
-from config import USER_DATA_DIR, GEOLOCATION
+from config import (
+    USER_DATA_DIR, GEOLOCATION, NETWORK_CAPTURE_ENABLED, BOOKING_BUDGET_SECONDS, FLIGHT_RECORDER_ENABLED,
+    DIAGNOSTICS_ENABLED, METRICS_ENABLED, AVAILABILITY_SCAN_DAYS, AVAILABILITY_SCAN_DIR
+)
 
+log = get_logger("main")
 
-async def main():
-    """Main function to run the Playo booking automation."""
-    print("🏆 Starting Playo Sports Venue Booking Automation...")
+PLAYO_URL = "https://playo.co/"
+
+# Steps that open a venue's booking page; read-only modes stop after them
+BROWSE_STEPS = ("login", "sport", "venue", "book now")
+
+
+def build_flow(page, auth: PlayoAuth, venue_finder: VenueFinder, booking_flow: BookingFlow) -> List[Step]:
+    """
+    Steps of the booking flow, in run order.
+
+    Each step records its choice on the checkpoint. Steps whose result lives
+    in the page (date, slot, duration, court) replay the recorded choice when
+    resuming on a reloaded page; login, sport and venue search are skipped.
+    """
+    async def login(checkpoint: Checkpoint) -> bool:
+        log.info("\n🔐 Starting authentication process...")
+        if not await auth.handle_login():
+            return False
+        # Dismiss error modals and overlays in the background from here on
+        await popup_guard.install(page)
+        return True
+
+    async def install_guard(checkpoint: Checkpoint) -> bool:
+        await popup_guard.install(page)
+        return True
+
+    async def select_sport(checkpoint: Checkpoint) -> bool:
+        log.info("\n🏃 Starting sport selection...")
+        checkpoint.sport = await venue_finder.select_sport()
+        return checkpoint.sport is not None
+
+    async def restore_sport(checkpoint: Checkpoint) -> bool:
+        venue_finder.sport = checkpoint.sport
+        return True
+
+    async def select_venue(checkpoint: Checkpoint) -> bool:
+        log.info("\n📍 Starting venue search...")
+        venue = await venue_finder.select_venue()
+        if venue is None:
+            return False
+        checkpoint.area = venue_finder.area
+        checkpoint.venue, checkpoint.venue_url = venue.name, venue.url or None
+        latency_history.tag(checkpoint.area, checkpoint.venue)
+        return True
+
+    async def open_booking(checkpoint: Checkpoint) -> bool:
+        log.info("\n📅 Starting booking process...")
+        if not await booking_flow.open_booking():
+            return False
+        checkpoint.venue_url = checkpoint.venue_url or booking_flow.page.url
+        venue_finder.remember_venue_url(checkpoint.venue, checkpoint.venue_url)
+        return True
+
+    async def check_sport(checkpoint: Checkpoint) -> bool:
+        return await booking_flow.ensure_sport(checkpoint.sport)
+
+    async def choose_date(checkpoint: Checkpoint) -> bool:
+        checkpoint.date = await booking_flow.choose_date()
+        return checkpoint.date is not None
+
+    async def replay_date(checkpoint: Checkpoint) -> bool:
+        return await booking_flow.choose_date(checkpoint.date) is not None
+
+    async def choose_duration(checkpoint: Checkpoint) -> bool:
+        # Asked before the slot so the slot choice can check contiguous availability
+        checkpoint.duration = booking_flow.prompt_duration()
+        return True
+
+    async def choose_slot(checkpoint: Checkpoint) -> bool:
+        checkpoint.slot = await booking_flow.choose_slot(checkpoint.duration)
+        return checkpoint.slot is not None
+
+    async def replay_slot(checkpoint: Checkpoint) -> bool:
+        return await booking_flow.choose_slot(checkpoint.duration, checkpoint.slot) is not None
+
+    async def set_duration(checkpoint: Checkpoint) -> bool:
+        return await booking_flow.set_duration(checkpoint.duration)
+
+    async def choose_court(checkpoint: Checkpoint) -> bool:
+        checkpoint.court = await booking_flow.choose_court()
+        return checkpoint.court is not None
+
+    async def replay_court(checkpoint: Checkpoint) -> bool:
+        return await booking_flow.choose_court(checkpoint.court) is not None
+
+    async def checkout(checkpoint: Checkpoint) -> bool:
+        return await booking_flow.checkout()
+
+    return [
+        Step("login", login, replay=install_guard),
+        Step("sport", select_sport, after=("login",), replay=restore_sport),
+        Step("venue", select_venue, after=("sport",)),
+        Step("book now", open_booking, after=("venue",), replay=lambda checkpoint: booking_flow.resume_booking()),
+        Step("check sport", check_sport, after=("book now",), replay=check_sport),
+        Step("date", choose_date, after=("book now",), replay=replay_date),
+        Step("duration", choose_duration, after=("book now",)),
+        Step("slot", choose_slot, after=("date", "duration"), replay=replay_slot),
+        Step("set duration", set_duration, after=("slot",), replay=set_duration),
+        Step("court", choose_court, after=("set duration",), replay=replay_court),
+        Step("checkout", checkout, after=("court",)),
+    ]
+
+
+def load_checkpoint(store: CheckpointStore, graph: StepGraph) -> Checkpoint:
+    """Offer to resume an unfinished run, otherwise start from a fresh checkpoint."""
+    checkpoint = store.load()
+    if checkpoint is None:
+        return Checkpoint()
+
+    next_step = graph.next_step(checkpoint)
+    if next_step is None:
+        return Checkpoint()
+
+    summary = ", ".join(f"{key}={value}" for key, value in (
+        ("sport", checkpoint.sport), ("venue", checkpoint.venue), ("date", checkpoint.date),
+        ("slot", checkpoint.slot), ("duration", checkpoint.duration), ("court", checkpoint.court),
+    ) if value is not None)
+    log.info("💾 Found an unfinished run (%s)", summary or 'no choices yet')
+    answer = prompt(f"Resume from '{next_step}'? [Y/n]: ").strip().lower()
+    if answer in ('n', 'no'):
+        store.clear()
+        return Checkpoint()
+    return checkpoint
+
+
+async def browse(name: str, action: Callable[[BookingFlow, Checkpoint], Awaitable[None]]):
+    """
+    Open a venue's booking page through the first steps of the flow, then run a read-only action on it.
+    
+    Nothing is booked and the saved checkpoint is left alone.
+    
+    Args:
+        name: Step name the action is timed under
+        action: Called with the booking flow and the steps' checkpoint once the booking page is open
+    """
+    setup_logging()
+    start_job()
+    
+    async with async_playwright() as p:
+        context = await setup_browser_context(p, USER_DATA_DIR, GEOLOCATION)
+        page = context.pages[0] if context.pages else await context.new_page()
+        if NETWORK_CAPTURE_ENABLED:
+            network_capture.attach(context)
+        
+        venue_finder = VenueFinder(page)
+        booking_flow = BookingFlow(page, context)
+        steps = build_flow(page, PlayoAuth(page), venue_finder, booking_flow)
+        # No store: a read-only run never touches the booking checkpoint
+        graph = StepGraph([step for step in steps if step.name in BROWSE_STEPS], page_url=lambda: booking_flow.page.url)
+        deadline = Deadline(BOOKING_BUDGET_SECONDS, latency_history, page_url=lambda: booking_flow.page.url)
+        
+        try:
+            await deadline.run("navigate", lambda: page.goto(PLAYO_URL))
+            await deadline.run("validate selectors", lambda: selector_registry.validate(page))
+            checkpoint = Checkpoint()
+            if await graph.run(checkpoint, deadline):
+                await deadline.run(name, lambda: action(booking_flow, checkpoint))
+            else:
+                log.warning("\n⚠️ Could not open a booking page.")
+        except BudgetExceeded as e:
+            log.warning("\n⌛ %s", e)
+        print(deadline.report())
+
+
+async def scan(dates: List[str]):
+    """
+    Print slot availability for several dates without booking anything.
+    
+    Each date's slots and courts are also written to AVAILABILITY_SCAN_DIR as
+    JSON lines, for other processes to read back with models.iter_jsonl.
+    
+    Args:
+        dates: Dates in YYYY-MM-DD format; the next AVAILABILITY_SCAN_DAYS days if empty
+    """
+    today = date.today()
+    dates = dates or [(today + timedelta(days=offset)).isoformat() for offset in range(AVAILABILITY_SCAN_DAYS)]
+    
+    async def report(booking_flow: BookingFlow, checkpoint: Checkpoint):
+        results = await booking_flow.scan_availability(dates)
+        for day, records in results.items():
+            if records is None:
+                print(f"❓ {day}: could not be read")
+                continue
+            slots = ", ".join(slot.text for slot in records['slots']) or "no free slots"
+            print(f"📅 {day}: {slots}")
+            if records['courts']:
+                print(f"   🏟️ {len({court.name for court in records['courts']})} courts listed")
+            try:
+                os.makedirs(AVAILABILITY_SCAN_DIR, exist_ok=True)
+                dump_jsonl(chain(records['slots'], records['courts']), os.path.join(AVAILABILITY_SCAN_DIR, f"{day}.jsonl"))
+            except OSError as e:
+                log.warning("⚠️ Could not save scan for %s: %s", day, e)
+    
+    await browse("scan", report)
+
+
+async def matrix(day: Optional[str] = None):
+    """
+    Print every court's price for each slot of one date without booking anything.
+    
+    Args:
+        day: Date in YYYY-MM-DD format, asked for unless given
+    """
+    async def report(booking_flow: BookingFlow, checkpoint: Checkpoint):
+        court_matrix = await booking_flow.court_matrix(day, checkpoint.venue or '')
+        if court_matrix is None:
+            log.error("❌ Could not read court prices")
+            return
+        print(court_matrix.report())
+    
+    await browse("court matrix", report)
+
+
+async def main(diagnose: bool = DIAGNOSTICS_ENABLED):
+    """
+    Main function to run the Playo booking automation.
+    
+    Args:
+        diagnose: Report event loop stalls and profile every step
+    """
+    setup_logging()
+    start_job()
+    log.info("🏆 Starting Playo Sports Venue Booking Automation...")
+    if diagnose:
+        diagnostics.start()
     
     async with async_playwright() as p:
         # Setup browser context
         context = await setup_browser_context(p, USER_DATA_DIR, GEOLOCATION)
         page = context.pages[0] if context.pages else await context.new_page()
         
+        # Decode venue/slot/court API payloads as they arrive, on every tab
+        if NETWORK_CAPTURE_ENABLED:
+            network_capture.attach(context)
+        
         # Add visual mouse cursor for debugging
         await add_mouse_cursor(page)
         
+        # Initialize components
+        auth = PlayoAuth(page)
+        venue_finder = VenueFinder(page)
+        booking_flow = BookingFlow(page, context)
+        
+        store = CheckpointStore()
+        # Keep recent browser activity in memory; written to disk only when a step fails
+        if FLIGHT_RECORDER_ENABLED:
+            await flight_recorder.attach(context, current_page=lambda: booking_flow.page)
+        
+        graph = StepGraph(
+            build_flow(page, auth, venue_finder, booking_flow), store,
+            page_url=lambda: booking_flow.page.url,
+            recorder=flight_recorder if FLIGHT_RECORDER_ENABLED else None,
+            diagnostics=diagnostics
+        )
+        checkpoint = load_checkpoint(store, graph)
+        
+        # Record area, venue and browser round trips with every step timing
+        latency_history.tag(checkpoint.area or '', checkpoint.venue or '')
+        round_trip_counter.install()
+        
+        # Every step gets whatever is left of the overall budget, capped by its learned timeout
+        deadline = Deadline(BOOKING_BUDGET_SECONDS, latency_history, page_url=lambda: booking_flow.page.url)
+        
+        if METRICS_ENABLED:
+            metrics.track(deadline, context, venue_finder.venue_index)
+            metrics.start()
+        
+        def print_reports():
+            print(deadline.report())
+            if diagnostics.enabled:
+                print(diagnostics.stop())
+        
         try:
-            # Navigate to Playo
-            await page.goto("https://playo.co/")
-            print("✅ Navigated to Playo.co")
-            
-            # Initialize components
-            auth = PlayoAuth(page)
-            venue_finder = VenueFinder(page)
-            booking_flow = BookingFlow(page, context)
-            
-            # Step 1: Authentication
-            print("\n🔐 Starting authentication process...")
-            login_successful = await auth.handle_login()
-            if not login_successful:
-                print("❌ Login failed. Exiting...")
-                return
-            
-            # Step 2: Sport Selection
-            print("\n🏃 Starting sport selection...")
-            selected_sport = await venue_finder.select_sport()
-            if not selected_sport:
-                print("❌ Sport selection failed. Exiting...")
-                return
+            # Navigate to Playo, or back to where the last run stopped
+            await deadline.run("navigate", lambda: page.goto(checkpoint.page_url or PLAYO_URL))
+            log.info("✅ Navigated to %s", page.url)
             
-            # Step 3: Location and Venue Selection
-            print("\n📍 Starting venue search...")
-            selected_venue = await venue_finder.select_venue()
-            if not selected_venue:
-                print("❌ Venue selection failed. Exiting...")
-                return
+            # Compile every selector once so hot loops skip invalid ones
+            await deadline.run("validate selectors", lambda: selector_registry.validate(page))
             
-            # Step 4: Booking Flow
-            print("\n📅 Starting booking process...")
-            booking_successful = await booking_flow.complete_booking(selected_sport)
+            booking_successful = await graph.run(checkpoint, deadline)
             
+            metrics.job_finished("success" if booking_successful else "stopped")
             if booking_successful:
-                print("\n🎉 Booking flow completed successfully!")
-                print("The script will now wait. You can manually complete any remaining steps.")
+                store.clear()
+                log.info("\n🎉 Booking flow completed successfully!")
+                log.info("The script will now wait. You can manually complete any remaining steps.")
             else:
-                print("\n⚠️ Booking flow completed with some issues. Please check manually.")
+                log.warning("\n⚠️ Booking flow stopped early. Rerun to resume, or check manually.")
+            print_reports()
             
             # Keep browser open for manual intervention if needed
-            print("\n⏳ Keeping browser open for manual completion...")
+            log.info("\n⏳ Keeping browser open for manual completion...")
+            await asyncio.Future()
+        
+        except BudgetExceeded as e:
+            metrics.job_finished("budget_exceeded")
+            log.warning("\n⌛ %s", e)
+            print_reports()
+            log.info("Browser will remain open for manual intervention")
             await asyncio.Future()
-            
         except KeyboardInterrupt:
-            print("\n🛑 Script interrupted by user")
+            log.info("\n🛑 Script interrupted by user")
         except Exception as e:
-            print(f"\n❌ Unexpected error: {e}")
-            print("Browser will remain open for manual intervention")
+            metrics.job_finished("error")
+            log.error("\n❌ Unexpected error: %s", e)
+            print_reports()
+            log.info("Browser will remain open for manual intervention")
             await asyncio.Future()
 
 
 if __name__ == "__main__":
-    asyncio.run(main())
+    if sys.argv[1:2] == ["report"]:
+        # python main.py report [step|day|area|venue]
+        print(latency_history.report(*sys.argv[2:3]))
+    elif sys.argv[1:2] == ["diagnose"]:
+        asyncio.run(main(diagnose=True))
+    elif sys.argv[1:2] == ["scan"]:
+        # python main.py scan [YYYY-MM-DD ...]
+        asyncio.run(scan(sys.argv[2:]))
+    elif sys.argv[1:2] == ["matrix"]:
+        # python main.py matrix [YYYY-MM-DD]
+        asyncio.run(matrix(*sys.argv[2:3]))
+    else:
+        asyncio.run(main())
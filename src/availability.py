@@ -0,0 +1,152 @@
+"""
+Availability module for Playo booking automation.
+Holds the court x slot price matrix for a venue and date so cheapest-court
+and any-court-free questions are answered without reopening dropdowns.
+"""
+
+import math
+from typing import Dict, Iterable, List, Optional, Tuple
+from src.models import Court
+from src.slots import parse_time_to_minutes
+
+UNKNOWN_PRICE = math.inf  # Court offered, but its price couldn't be parsed
+
+
+class CourtMatrix:
+    """Court prices per time slot; None marks a court not offered for a slot."""
+
+    def __init__(self, venue: str = '', date: str = ''):
+        self.venue = venue
+        self.date = date
+        self.slots: List[str] = []
+        self.courts: List[str] = []
+        self.prices: List[List[Optional[float]]] = []  # prices[slot][court]
+        self._court_idx: Dict[str, int] = {}
+        self._slot_idx: Dict[str, int] = {}
+
+    @classmethod
+    def from_courts(cls, courts: List[Court], slots: Iterable[str] = (), venue: str = '',
+                    date: str = '') -> 'CourtMatrix':
+        """
+        Build the matrix in one pass from courts tagged with their slot, e.g. a decoded availability payload.
+
+        Args:
+            courts: Courts whose `slot` names the slot they are offered for; untagged ones are skipped
+            slots: Slot labels to list even when no court is free for them
+            venue: Venue name recorded on the matrix
+            date: Date recorded on the matrix
+
+        Returns:
+            CourtMatrix: Slots in time order
+        """
+        by_slot: Dict[str, List[Court]] = {slot: [] for slot in slots}
+        for court in courts:
+            if court.slot:
+                by_slot.setdefault(court.slot, []).append(court)
+
+        def start(slot: str) -> float:
+            minutes = parse_time_to_minutes(slot)
+            return math.inf if minutes is None else minutes
+
+        matrix = cls(venue, date)
+        for slot in sorted(by_slot, key=start):
+            matrix.add_slot(slot, by_slot[slot])
+        return matrix
+
+    def add_slot(self, slot: str, courts: List[Court]):
+        """
+        Record the courts offered for a slot.
+
+        Args:
+            slot: Slot label
+            courts: Courts offered for the slot
+        """
+        row = [None] * len(self.courts)
+        for court in courts:
+            idx = self._court_idx.get(court.name)
+            if idx is None:
+                idx = self._court_idx[court.name] = len(self.courts)
+                self.courts.append(court.name)
+                for other in self.prices:
+                    other.append(None)
+                row.append(None)
+            price = court.price_value
+            row[idx] = UNKNOWN_PRICE if price is None else price
+
+        if slot in self._slot_idx:
+            self.prices[self._slot_idx[slot]] = row
+        else:
+            self._slot_idx[slot] = len(self.slots)
+            self.slots.append(slot)
+            self.prices.append(row)
+
+    def free_courts(self, slot: str) -> List[str]:
+        """Courts offered for a slot."""
+        row = self._row(slot)
+        return [court for court, price in zip(self.courts, row) if price is not None]
+
+    def any_free(self, slot: str) -> bool:
+        """True if any court is offered for a slot."""
+        return any(price is not None for price in self._row(slot))
+
+    def cheapest(self, slot: str) -> Optional[Tuple[str, float]]:
+        """
+        Cheapest court with a known price for a slot.
+
+        Returns:
+            Tuple: (court name, price), or None if no priced court is offered
+        """
+        priced = [(price, court) for court, price in zip(self.courts, self._row(slot))
+                  if price is not None and price != UNKNOWN_PRICE]
+        if not priced:
+            return None
+        price, court = min(priced)
+        return court, price
+
+    def cheapest_overall(self) -> Optional[Tuple[str, str, float]]:
+        """
+        Cheapest (slot, court) pair across the whole matrix.
+
+        Returns:
+            Tuple: (slot, court name, price), or None if nothing is priced
+        """
+        best = None
+        for slot in self.slots:
+            found = self.cheapest(slot)
+            if found and (best is None or found[1] < best[2]):
+                best = (slot, found[0], found[1])
+        return best
+
+    def to_dict(self) -> Dict:
+        """Compact serialisable form of the matrix (-1 marks an unknown price)."""
+        return {
+            'venue': self.venue,
+            'date': self.date,
+            'slots': self.slots,
+            'courts': self.courts,
+            'prices': [[-1 if p == UNKNOWN_PRICE else p for p in row] for row in self.prices],
+        }
+
+    def report(self) -> str:
+        """Prices as a table, one row per slot; "-" marks a court not offered, "?" an unknown price."""
+        def cell(price: Optional[float]) -> str:
+            if price is None:
+                return '-'
+            return '?' if price == UNKNOWN_PRICE else f"{price:g}"
+
+        slot_width = max([4] + [len(slot) for slot in self.slots])
+        widths = [max(6, len(court)) for court in self.courts]
+        lines = [
+            f"📊 {self.venue or 'Court prices'} {self.date}".rstrip(),
+            "   " + "  ".join(["Slot".ljust(slot_width)] + [court.ljust(w) for court, w in zip(self.courts, widths)]),
+        ]
+        for slot, row in zip(self.slots, self.prices):
+            lines.append("   " + "  ".join([slot.ljust(slot_width)] + [cell(p).ljust(w) for p, w in zip(row, widths)]))
+        cheapest = self.cheapest_overall()
+        if cheapest:
+            lines.append(f"   Cheapest: {cheapest[1]} at {cheapest[0]} ({cheapest[2]:g})")
+        return "\n".join(line.rstrip() for line in lines)
+
+    def _row(self, slot: str) -> List[Optional[float]]:
+        idx = self._slot_idx.get(slot)
+        return self.prices[idx] if idx is not None else []
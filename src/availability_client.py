@@ -0,0 +1,184 @@
+"""
+Availability client for Playo booking automation.
+Replays the availability endpoints seen by network capture through the
+logged-in context's request API, so read-only scans skip the UI entirely.
+"""
+
+import asyncio
+import re
+import time
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit, urlunsplit
+from asyncio_throttle import Throttler
+from config import (
+    AVAILABILITY_BASE_URL, AVAILABILITY_CONCURRENCY, AVAILABILITY_RATE_LIMIT, AVAILABILITY_CACHE_TTL
+)
+from src.network_capture import decode_payload, is_availability_payload, network_capture
+from src.utils import CircuitOpen, RetryableError, retry_async, retry_policy, site_breaker
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+_DATE_RE = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+# Fallback: date -> {'slots': [...], 'courts': [...]} read from the DOM, None if the date couldn't be shown
+DomFallback = Callable[[str], Awaitable[Optional[Dict[str, List]]]]
+
+
+def swap_date(text: Optional[str], date: str) -> Optional[str]:
+    """Replace every ISO date in a URL or request body with another date."""
+    if text is None:
+        return None
+    return _DATE_RE.sub(date, text)
+
+
+def rebase_url(url: str, base_url: Optional[str]) -> str:
+    """Point a captured URL at another scheme and host, keeping path and query."""
+    if not base_url:
+        return url
+    base, original = urlsplit(base_url), urlsplit(url)
+    return urlunsplit((base.scheme, base.netloc, original.path, original.query, ''))
+
+
+class AvailabilityClient:
+    """Fetches slot and court availability per date through the browser's request context."""
+
+    def __init__(self, context, fallback: Optional[DomFallback] = None,
+                 base_url: Optional[str] = AVAILABILITY_BASE_URL,
+                 concurrency: int = AVAILABILITY_CONCURRENCY,
+                 rate_limit: float = AVAILABILITY_RATE_LIMIT,
+                 cache_ttl: float = AVAILABILITY_CACHE_TTL):
+        self.context = context
+        self.fallback = fallback
+        self.base_url = base_url
+        self.cache_ttl = cache_ttl
+        self._semaphore = asyncio.Semaphore(concurrency)
+        self._throttler = Throttler(rate_limit=rate_limit, period=1.0)
+        self._fallback_lock = asyncio.Lock()
+        # (method, url, body) -> (expiry, records)
+        self._cache: Dict[Tuple[str, str, Optional[str]], Tuple[float, Dict[str, List]]] = {}
+        self.requests = 0
+        self.cache_hits = 0
+        self.fallbacks = 0
+
+    def has_endpoint(self) -> bool:
+        """True once network capture has seen an availability request that names a date."""
+        return self._endpoint() is not None
+
+    async def fetch(self, date: str) -> Optional[Dict[str, List]]:
+        """
+        Fetch availability for one date.
+
+        Args:
+            date: Date in YYYY-MM-DD format
+
+        Returns:
+            Dict: {'slots': [...], 'courts': [...]}, empty lists for a fully booked date;
+            None if availability couldn't be read
+        """
+        try:
+            had_endpoint = self.has_endpoint()
+            records = await self._replay(date)
+            if records is not None:
+                return records
+            async with self._fallback_lock:  # The DOM flow drives a single page
+                if not had_endpoint:
+                    # Selecting an earlier date on the page may have captured the endpoint meanwhile
+                    records = await self._replay(date)
+                    if records is not None:
+                        return records
+                return await self._fallback(date)
+        except CircuitOpen as e:
+            # The page would hit the same degraded site; stop instead of falling back
+            log.warning("🚧 %s", e)
+            return None
+
+    async def scan(self, dates: Iterable[str]) -> Dict[str, Optional[Dict[str, List]]]:
+        """
+        Fetch availability for several dates concurrently.
+
+        Args:
+            dates: Dates in YYYY-MM-DD format
+
+        Returns:
+            Dict: Date to {'slots': [...], 'courts': [...]}, or to None if it couldn't be read
+        """
+        dates = list(dict.fromkeys(dates))
+        results = await asyncio.gather(*(self.fetch(date) for date in dates))
+        return dict(zip(dates, results))
+
+    def _endpoint(self) -> Optional[Tuple[str, str, Optional[str], Dict[str, str]]]:
+        """Most useful captured endpoint: courts carry slots too, so prefer them."""
+        for kind in ('courts', 'slots'):
+            endpoint = network_capture.endpoints.get(kind)
+            if endpoint and (_DATE_RE.search(endpoint[1]) or _DATE_RE.search(endpoint[2] or '')):
+                return endpoint
+        return None
+
+    async def _replay(self, date: str) -> Optional[Dict[str, List]]:
+        """
+        Availability for a date from the cache or the captured endpoint; None without either.
+
+        Raises:
+            CircuitOpen: If the site looks degraded
+        """
+        endpoint = self._endpoint()
+        if endpoint is None:
+            return None
+        method, url, body, headers = endpoint
+        key = (method, rebase_url(swap_date(url, date), self.base_url), swap_date(body, date))
+        cached = self._cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self.cache_hits += 1
+            return cached[1]
+
+        records = await self._request(*key, headers)
+        if records is not None:
+            self._cache[key] = (time.monotonic() + self.cache_ttl, records)
+        return records
+
+    async def _request(self, method: str, url: str, body: Optional[str],
+                       headers: Dict[str, str]) -> Optional[Dict[str, List]]:
+        """
+        Send one request, retrying transient failures; None unless it returned availability.
+
+        Raises:
+            CircuitOpen: If the site looks degraded
+        """
+        try:
+            return await retry_async(
+                lambda: self._send(method, url, body, headers), retry_policy("availability"),
+                "availability request", site_breaker
+            )
+        except CircuitOpen:
+            raise
+        except Exception as e:
+            log.warning("⚠️ Availability request error: %s", e)
+            return None
+
+    async def _send(self, method: str, url: str, body: Optional[str],
+                    headers: Dict[str, str]) -> Optional[Dict[str, List]]:
+        """One attempt under the concurrency bound and rate limit."""
+        async with self._semaphore:
+            async with self._throttler:
+                self.requests += 1
+                response = await self.context.request.fetch(url, method=method, data=body, headers=headers)
+                if response.status == 429 or response.status >= 500:
+                    raise RetryableError(f"HTTP {response.status} from {url}")
+                if not response.ok:
+                    log.warning("⚠️ Availability request failed (%s): %s", response.status, url)
+                    return None
+                payload = await response.json()
+                if not is_availability_payload(payload):
+                    log.warning("⚠️ Availability request returned no slots or courts: %s", url)
+                    return None
+                # A payload whose slots are all taken decodes to empty lists: the date is fully booked
+                return decode_payload(payload)
+
+    async def _fallback(self, date: str) -> Optional[Dict[str, List]]:
+        """Read availability through the DOM flow; callers hold the fallback lock."""
+        if not self.fallback:
+            return None
+        self.fallbacks += 1
+        log.warning("🐢 Falling back to the booking page for %s", date)
+        return await self.fallback(date)
@@ -4,71 +4,131 @@ Handles date selection, time selection, court booking, and checkout process.
 """
 
 import asyncio
+import dataclasses
 import re
+from datetime import datetime
 from typing import List, Optional, Dict
-from config import SELECTORS, DEFAULT_TIMEOUT, LONG_TIMEOUT, DEFAULT_DURATION_HOURS, DURATION_INCREMENT
+from config import (
+    SELECTORS, DEFAULT_TIMEOUT, SHORT_TIMEOUT, DEFAULT_DURATION_HOURS, DURATION_INCREMENT,
+    EXTRACTION_BACKEND
+)
+from src.deadline import budget_timeout, prompt, step
+from src.matching import MatchIndex, SUBSTRING_SCORE, best_or_closest
+from src.models import Court, HandleRegistry, TimeSlot
+from src.network_capture import network_capture
+from src.popups import popup_guard
+from src.availability import CourtMatrix
+from src.availability_client import AvailabilityClient
+from src.calendar_resolver import calendar_resolver
+from src.slots import SlotIndex, parse_time_to_minutes
+from src.snapshot import extract_courts, extract_time_slots, snapshot_extractor
+from src.utils import (
+    FIND_CLICKABLE_JS, HandleScope, parse_price, resolve_clickable_ancestor, retry_async, retry_policy, site_breaker
+)
+from src.selector_cache import selector_resolver
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+# Clicks a stepper button N times in one evaluation, letting the page
+# re-render between clicks. Returns how many clicks were dispatched.
+_STEPPER_BURST_JS = """
+async ({selector, count}) => {
+    const findClickable = %s;
+    const nextFrame = () => new Promise(resolve => requestAnimationFrame(() => resolve()));
+    let clicked = 0;
+    for (let i = 0; i < count; i++) {
+        const icon = document.querySelector(selector);
+        if (!icon) break;
+        const target = findClickable(icon, {includeSelf: true}) || icon.parentElement || icon;
+        target.dispatchEvent(new MouseEvent('click', {bubbles: true, cancelable: true, view: window}));
+        clicked++;
+        await nextFrame();
+    }
+    await nextFrame();
+    return clicked;
+}
+""" % FIND_CLICKABLE_JS
 
 
 class BookingFlow:
-    """Handles the complete booking flow from venue selection to checkout."""
+    """Booking steps from the venue page to checkout; main.build_flow orders them into the flow."""
     
     def __init__(self, page, context):
         self.page = page
         self.context = context
+        self._capture_mark = 0
+        self._slot_minutes: Optional[int] = None  # Start of the last clicked slot, for filtering court payloads
+        self.handles = HandleRegistry()  # Option handles/locators for scraped courts
+        # One client per flow, so its rate limit and response cache span every scan
+        self.availability = AvailabilityClient(context, fallback=self._dom_availability)
     
-    async def complete_booking(self, sport_name: str) -> bool:
+    async def open_booking(self) -> bool:
+        """
+        Switch to the venue tab opened by the venue click and click Book Now.
+        
+        Returns:
+            bool: True if Book Now was clicked
         """
-        Complete the entire booking flow.
+        new_page = await step("new tab", self._wait_for_new_tab)
+        if new_page:
+            self.page = new_page
+            await self.page.bring_to_front()
+            await asyncio.sleep(2)
+        await popup_guard.install(self.page)
+        
+        return await step("book now", lambda: popup_guard.run(self.page, self._click_book_now, "Book Now"))
+    
+    async def resume_booking(self) -> bool:
+        """
+        Reopen the booking form on a freshly loaded venue page, e.g. when resuming a run.
+        
+        Returns:
+            bool: True if the form is open
+        """
+        await popup_guard.install(self.page)
+        if await self.page.locator(SELECTORS["book_now_button"]).first.is_visible():
+            return await popup_guard.run(self.page, self._click_book_now, "Book Now")
+        return True
+    
+    async def ensure_sport(self, sport_name: str) -> bool:
+        """Make sure the booking form is set to the selected sport."""
+        await self._ensure_correct_sport(sport_name)
+        return True
+    
+    async def choose_date(self, date: Optional[str] = None) -> Optional[str]:
+        """
+        Select the booking date, asking for it unless one is given.
         
         Args:
-            sport_name: Name of the selected sport
+            date: Date in YYYY-MM-DD format, e.g. from a checkpoint
             
         Returns:
-            bool: True if booking completed successfully
+            str: The selected date, or None if it could not be selected
         """
-        try:
-            # Wait for new tab and switch to it
-            new_page = await self._wait_for_new_tab()
-            if new_page:
-                self.page = new_page
-                await self.page.bring_to_front()
-                await asyncio.sleep(2)
-            
-            # Click Book Now
-            if not await self._click_book_now():
-                return False
-            
-            # Ensure correct sport is selected
-            await self._ensure_correct_sport(sport_name)
-            
-            # Get booking details from user
-            date = input("What date do you want to book the turf for? (YYYY-MM-DD): ").strip()
-            await self._select_date(date)
-            
-            # Handle time selection
-            available_times = await self._scrape_time_slots()
-            if available_times:
-                await self._select_time_slot(available_times)
-            
-            # Handle duration
-            await self._set_duration()
-            
-            # Handle court selection
-            await self._select_court()
-            
-            # Complete checkout
-            await self._complete_checkout()
-            
-            print("🎉 Booking flow completed!")
-            return True
+        if date is None:
+            date = prompt("What date do you want to book the turf for? (YYYY-MM-DD): ").strip()
+        return date if await self._select_date(date) else None
+    
+    async def choose_slot(self, duration_hours: float, slot: Optional[str] = None) -> Optional[str]:
+        """
+        Scrape the time slots and select one, asking for it unless one is given.
+        
+        Args:
+            duration_hours: Booking duration, used to check contiguous availability
+            slot: Slot label or time, e.g. from a checkpoint
             
-        except Exception as e:
-            print(f"❌ Error in booking flow: {e}")
-            return False
+        Returns:
+            str: Label of the selected slot, or None if none was selected
+        """
+        slots = await step("slot scrape", lambda: popup_guard.run(self.page, self._scrape_time_slots, "time slot scrape"))
+        if not slots:
+            return None
+        return await self._select_time_slot(slots, duration_hours, slot)
     
     async def _wait_for_new_tab(self) -> Optional[object]:
         """Wait for a new tab to open and return the new page."""
-        print("⏳ Waiting for new tab to open...")
+        log.info("⏳ Waiting for new tab to open...")
         old_pages = self.context.pages.copy()
         
         for _ in range(20):  # Wait up to 10 seconds
@@ -76,221 +136,281 @@ class BookingFlow:
             pages = self.context.pages
             if len(pages) > len(old_pages):
                 new_page = [p for p in pages if p not in old_pages][0]
-                print(f"✅ Switched to new tab: {new_page.url}")
+                log.info("✅ Switched to new tab: %s", new_page.url)
                 return new_page
         
-        print("⚠️ No new tab detected. Staying on current page.")
+        log.warning("⚠️ No new tab detected. Staying on current page.")
         return None
     
     async def _click_book_now(self) -> bool:
         """Click the Book Now button."""
-        print("🎯 Looking for 'Book Now' button...")
+        log.debug("🎯 Looking for 'Book Now' button...")
+        button = self.page.locator(SELECTORS["book_now_button"]).first
+        
+        async def click() -> bool:
+            await button.click(timeout=budget_timeout(DEFAULT_TIMEOUT))
+            return True
+        
         try:
-            await self.page.wait_for_selector(SELECTORS["book_now_button"], timeout=DEFAULT_TIMEOUT)
-            await self.page.click(SELECTORS["book_now_button"])
-            print("✅ Clicked 'Book Now' button!")
+            # Each attempt returns the moment the button is clickable, e.g. after a manual fix
+            await retry_async(click, retry_policy("book now click"), "Book Now click", site_breaker)
+            log.debug("✅ Clicked 'Book Now' button!")
             return True
         except Exception as e:
-            print(f"❌ Could not click 'Book Now' button: {e}")
-            print("The script will pause for 10 seconds for manual intervention...")
-            await asyncio.sleep(10)
+            log.error("❌ Could not click 'Book Now' button: %s", e)
             return False
     
     async def _ensure_correct_sport(self, sport_name: str):
         """Ensure the correct sport is selected."""
-        print(f"🏃 Ensuring correct sport is selected: {sport_name}")
+        log.info("🏃 Ensuring correct sport is selected: %s", sport_name)
         try:
-            selected_sport_btn = await self.page.query_selector(SELECTORS["sport_selector_button"])
-            if not selected_sport_btn:
-                print("❌ Could not find sport selection button")
+            selected_sport_btn = self.page.locator(SELECTORS["sport_selector_button"]).first
+            if not await selected_sport_btn.count():
+                log.error("❌ Could not find sport selection button")
                 return
             
-            selected_sport_text = (await selected_sport_btn.inner_text()).strip().lower()
+            selected_sport_text = (await selected_sport_btn.inner_text()).strip()
             
-            if sport_name.lower() not in selected_sport_text:
-                print(f"Current sport is not '{sport_name}'. Selecting correct sport...")
+            ranked = MatchIndex([selected_sport_text]).search(sport_name, limit=1)
+            if not ranked or ranked[0][1] < SUBSTRING_SCORE:
+                log.info("Current sport is not '%s'. Selecting correct sport...", sport_name)
                 await selected_sport_btn.click()
                 await asyncio.sleep(1)
                 
-                await self.page.wait_for_selector(SELECTORS["sport_dropdown"], timeout=5000)
-                sport_options = await self.page.query_selector_all(SELECTORS["sport_options"])
+                await self.page.locator(SELECTORS["sport_dropdown"]).first.wait_for(timeout=budget_timeout(SHORT_TIMEOUT))
+                sport_options = self.page.locator(SELECTORS["sport_options"])
+                option_texts = [text.strip() for text in await sport_options.all_inner_texts()]
                 
-                for option in sport_options:
-                    text = (await option.inner_text()).strip().lower()
-                    if sport_name.lower() in text:
-                        await option.click()
-                        print(f"✅ Selected sport: {text}")
-                        return
+                match = best_or_closest(MatchIndex.for_names(option_texts), sport_name, "sport option")
+                if match is not None:
+                    await sport_options.nth(match).click()
+                    log.info("✅ Selected sport: %s", option_texts[match])
+                    return
                 
-                print(f"❌ Could not find sport option matching '{sport_name}'")
+                log.error("❌ Could not find sport option matching '%s'", sport_name)
             else:
-                print(f"✅ Correct sport '{sport_name}' is already selected")
+                log.info("✅ Correct sport '%s' is already selected", sport_name)
                 
         except Exception as e:
-            print(f"❌ Error ensuring correct sport: {e}")
+            log.error("❌ Error ensuring correct sport: %s", e)
     
-    async def _select_date(self, date: str):
-        """Select the booking date."""
-        day = str(int(date.split('-')[-1]))  # Extract day
+    async def _select_date(self, date: str) -> bool:
+        """Select the booking date, moving to another month if needed."""
+        log.info("📅 Selecting date: %s", date)
         
-        print(f"📅 Selecting date: {date} (day {day})")
+        try:
+            target = datetime.strptime(date, '%Y-%m-%d').date()
+        except ValueError:
+            log.error("❌ Invalid date '%s'. Expected YYYY-MM-DD", date)
+            return False
         
         try:
-            # Click date picker
-            await self.page.wait_for_selector(SELECTORS["date_picker_button"], timeout=DEFAULT_TIMEOUT)
-            await self.page.click(SELECTORS["date_picker_button"])
-            print("✅ Clicked date picker button")
-            await asyncio.sleep(1)
-            
-            # Wait for calendar and select day
-            await self.page.wait_for_selector(SELECTORS["calendar_popover"], timeout=DEFAULT_TIMEOUT)
-            day_divs = await self.page.query_selector_all(SELECTORS["calendar_days"])
-            
-            for div in day_divs:
-                text = (await div.inner_text()).strip()
-                if text == day or text.lstrip('0') == day:
-                    await div.click()
-                    print(f"✅ Selected day {day}")
-                    return
-            
-            print(f"❌ Could not find day {day} in calendar")
-            
+            self._capture_mark = network_capture.mark()
+            return await calendar_resolver.select(self.page, target)
         except Exception as e:
-            print(f"❌ Error selecting date: {e}")
+            calendar_resolver.invalidate()
+            log.error("❌ Error selecting date: %s", e)
+            return False
     
-    async def _scrape_time_slots(self) -> List[str]:
-        """Scrape available time slots."""
-        print("🕐 Scraping available time slots...")
+    async def _scrape_time_slots(self) -> List[TimeSlot]:
+        """
+        Scrape available time slots.
+        
+        Returns:
+            List[TimeSlot]: Slots whose selector and index locate the option
+            directly, so clicking needs no second scan
+        """
+        log.info("🕐 Scraping available time slots...")
         try:
             # Try to open time picker dropdown
             await self._open_time_picker()
             
-            # Try new structure first
-            time_options = await self.page.query_selector_all(SELECTORS["time_slots_new"])
-            if time_options:
-                print(f"Found {len(time_options)} time slots (new structure)")
-                available_times = []
-                for option in time_options:
-                    text = (await option.inner_text()).strip()
-                    if text:
-                        available_times.append(text)
-            else:
-                # Fallback to old structure
-                time_options = await self.page.query_selector_all(SELECTORS["time_slots_old"])
-                print(f"Found {len(time_options)} time slots (old structure)")
-                available_times = []
-                for option in time_options:
-                    text = (await option.inner_text()).strip()
-                    if text:
-                        available_times.append(text)
+            # Prefer the availability payload for the selected date
+            slots = network_capture.latest('slots', self._capture_mark)
+            if slots:
+                log.info("Found %s time slots in network payload", len(slots))
+                self._print_slots(slots)
+                return slots
+            
+            if EXTRACTION_BACKEND == "snapshot":
+                slots = await snapshot_extractor.run(self.page, extract_time_slots)
+                log.info("Found %s time slots in page snapshot", len(slots))
+                self._print_slots(slots)
+                return slots
             
-            if available_times:
-                print("Available time slots:")
-                for idx, time in enumerate(available_times, 1):
-                    print(f"{idx}. {time}")
+            # Try new structure first, then fall back to old structure
+            for selector, structure in ((SELECTORS["time_slots_new"], "new"), (SELECTORS["time_slots_old"], "old")):
+                texts = await self.page.eval_on_selector_all(
+                    selector, "options => options.map(option => option.innerText.trim())"
+                )
+                if texts:
+                    break
+            log.info("Found %s time slots (%s structure)", len(texts), structure)
             
-            return available_times
+            slots = [
+                TimeSlot(text, parse_time_to_minutes(text), selector, idx)
+                for idx, text in enumerate(texts) if text
+            ]
+            
+            self._print_slots(slots)
+            return slots
             
         except Exception as e:
-            print(f"❌ Error scraping time slots: {e}")
+            log.error("❌ Error scraping time slots: %s", e)
             return []
     
+    def _print_slots(self, slots: List[TimeSlot]):
+        """List slots for the user."""
+        if slots:
+            print("Available time slots:")
+            for idx, slot in enumerate(slots, 1):
+                print(f"{idx}. {slot.text}")
+    
     async def _open_time_picker(self):
         """Aggressively try to open the time picker dropdown."""
-        print("🎯 Opening time picker dropdown...")
+        log.debug("🎯 Opening time picker dropdown...")
         
-        # Try multiple selectors for the time picker button
-        time_picker_btn = None
-        for selector in SELECTORS["time_picker_buttons"]:
-            try:
-                time_picker_btn = await self.page.query_selector(selector)
-                if time_picker_btn:
-                    print(f"✅ Found time picker button with selector: {selector}")
-                    break
-            except Exception:
-                continue
+        # Resolve the time picker button, trying the last winning selector first
+        selector, time_picker_btns = await selector_resolver.locate(self.page, "time_picker_buttons")
+        if time_picker_btns:
+            log.debug("✅ Found time picker button with selector: %s", selector)
         
-        if not time_picker_btn:
-            print("❌ Could not find time picker button")
+        if not time_picker_btns:
+            log.error("❌ Could not find time picker button")
             return
+        time_picker_btn = time_picker_btns.first
         
         # Aggressively click the button
         box = await time_picker_btn.bounding_box()
         if box:
             await self.page.mouse.move(box['x'] + box['width']/2, box['y'] + box['height']/2)
-            await asyncio.sleep(1)
             
             try:
-                await time_picker_btn.click(force=True, timeout=5000)
-                print("✅ Opened time picker with element click")
+                await time_picker_btn.click(force=True, timeout=budget_timeout(SHORT_TIMEOUT))
+                log.debug("✅ Opened time picker with element click")
             except Exception as e:
-                print(f"Element click failed: {e}, trying mouse click")
+                log.debug("Element click failed: %s, trying mouse click", e)
                 try:
                     await self.page.mouse.click(box['x'] + box['width']/2, box['y'] + box['height']/2)
-                    print("✅ Opened time picker with mouse click")
+                    log.debug("✅ Opened time picker with mouse click")
                 except Exception as e2:
-                    print(f"❌ Both click methods failed: {e2}")
+                    log.error("❌ Both click methods failed: %s", e2)
             
-            await asyncio.sleep(2)
+            try:
+                # Returns as soon as the options render
+                await self.page.locator(SELECTORS["time_slots_old"]).first.wait_for(
+                    timeout=budget_timeout(SHORT_TIMEOUT)
+                )
+            except Exception as e:
+                log.warning("⚠️ Time slot list did not appear: %s", e)
     
-    async def _select_time_slot(self, available_times: List[str]):
-        """Select a time slot from available options."""
-        start_time_input = input("Enter the number or time string of your desired slot: ").strip()
+    async def _select_time_slot(self, slots: List[TimeSlot], duration_hours: float = DEFAULT_DURATION_HOURS,
+                                answer: Optional[str] = None) -> Optional[str]:
+        """
+        Select a time slot from available options, checking there is room for the duration.
+        
+        Args:
+            slots: Slots from _scrape_time_slots
+            duration_hours: Booking duration in hours
+            answer: Number, time or label to use instead of asking
+            
+        Returns:
+            str: Label of the selected slot, or None if it could not be clicked
+        """
+        if answer is None:
+            answer = prompt("Enter the number or time string of your desired slot: ")
+        start_time_input = answer.strip()
+        available_times = [slot.text for slot in slots]
+        slot_index = SlotIndex(available_times, [slot.length for slot in slots])
         
         # Try number selection
         try:
             num_choice = int(start_time_input) - 1
             if 0 <= num_choice < len(available_times):
-                start_time = available_times[num_choice]
+                choice = num_choice
             else:
                 print(f"Invalid number. Using first available: {available_times[0]}")
-                start_time = available_times[0]
+                choice = 0
         except ValueError:
-            # Try string matching
-            matches = [t for t in available_times if start_time_input.lower().replace(' ', '') in t.lower().replace(' ', '')]
-            if matches:
-                start_time = matches[0]
+            target = parse_time_to_minutes(start_time_input)
+            if target is not None and len(slot_index):
+                # Time input: use the slot nearest to the requested time
+                choice = slot_index.nearest(target)
             else:
-                print(f"No match found. Using first available: {available_times[0]}")
-                start_time = available_times[0]
+                # Try ranked string matching
+                match = best_or_closest(MatchIndex.for_names(available_times), start_time_input, "time slot")
+                if match is not None:
+                    choice = match
+                else:
+                    print(f"No match found. Using first available: {available_times[0]}")
+                    choice = 0
         
-        print(f"🎯 Selecting time slot: {start_time}")
-        await self._click_time_slot(start_time)
+        choice = self._ensure_slot_fits(slot_index, choice, duration_hours)
+        log.info("🎯 Selecting time slot: %s", available_times[choice])
+        if await self._click_time_slot(slots[choice]):
+            return available_times[choice]
+        return None
     
-    async def _click_time_slot(self, start_time: str):
-        """Aggressively click the selected time slot."""
+    def _ensure_slot_fits(self, slot_index: SlotIndex, choice: int, duration_hours: float) -> int:
+        """Move the choice to the earliest later slot with enough contiguous time, if needed."""
+        duration = int(round(duration_hours * 60))
+        label = slot_index.labels[choice]
+        start = parse_time_to_minutes(label)
+        if start is None or slot_index.free_minutes(choice) >= duration:
+            return choice
+        
+        fit = slot_index.earliest_fit(start, duration)
+        if fit is None:
+            log.warning("⚠️ No slot from %s onwards has %s free minutes. Keeping %s", label, duration, label)
+            return choice
+        
+        log.warning("⚠️ %s only has %s free minutes. Using %s instead",
+                    label, slot_index.free_minutes(choice), slot_index.labels[fit])
+        return fit
+    
+    async def _click_time_slot(self, slot: TimeSlot) -> bool:
+        """Click a time slot through the reference returned by _scrape_time_slots."""
+        self._capture_mark = network_capture.mark()
+        self._slot_minutes = parse_time_to_minutes(slot.text)
+        if slot.index is None:
+            slot = await self._resolve_slot_ref(slot)
+            if slot is None:
+                return False
+        
+        options = self.page.locator(slot.selector)
         try:
-            # Try new structure first
-            time_slot_divs = await self.page.query_selector_all(SELECTORS["time_slots_new"])
-            if not time_slot_divs:
-                # Fallback to old structure
-                time_slot_divs = await self.page.query_selector_all(SELECTORS["time_slots_old"])
-            
-            for slot_div in time_slot_divs:
-                text = (await slot_div.inner_text()).strip()
-                if start_time.lower().replace(' ', '') == text.lower().replace(' ', ''):
-                    box = await slot_div.bounding_box()
-                    if box:
-                        await self.page.mouse.move(box['x'] + box['width']/2, box['y'] + box['height']/2)
-                        await asyncio.sleep(0.5)
-                        
-                        try:
-                            await slot_div.click(force=True, timeout=5000)
-                            print(f"✅ Selected time slot: {text}")
-                            return
-                        except Exception:
-                            await self.page.mouse.click(box['x'] + box['width']/2, box['y'] + box['height']/2)
-                            print(f"✅ Selected time slot with mouse: {text}")
-                            return
-            
-            print(f"❌ Could not find time slot: {start_time}")
-            
+            await options.nth(slot.index).click(force=True, timeout=budget_timeout(SHORT_TIMEOUT))
+            log.info("✅ Selected time slot: %s", slot.text)
+            return True
         except Exception as e:
-            print(f"❌ Error clicking time slot: {e}")
+            log.warning("⚠️ Slot reference for %s is stale (%s), matching by text", slot.text, e)
+        
+        try:
+            # The list re-rendered; fall back to the option with exactly the same text ("1:00 PM", not "11:00 PM")
+            exact = re.compile(rf"^\s*{re.escape(slot.text)}\s*$")
+            await options.filter(has_text=exact).first.click(force=True, timeout=budget_timeout(SHORT_TIMEOUT))
+            log.info("✅ Selected time slot: %s", slot.text)
+            return True
+        except Exception as e:
+            log.error("❌ Error clicking time slot: %s", e)
+            return False
     
-    async def _set_duration(self):
-        """Set the booking duration."""
-        duration_input = input(
+    async def _resolve_slot_ref(self, slot: TimeSlot) -> Optional[TimeSlot]:
+        """Find the DOM option for a slot that came from a network payload."""
+        minutes = parse_time_to_minutes(slot.text)
+        for selector in (SELECTORS["time_slots_new"], SELECTORS["time_slots_old"]):
+            texts = await self.page.eval_on_selector_all(
+                selector, "options => options.map(option => option.innerText.trim())"
+            )
+            for idx, text in enumerate(texts):
+                if parse_time_to_minutes(text) == minutes:
+                    return dataclasses.replace(slot, text=text, selector=selector, index=idx)
+        log.error("❌ Could not find time slot: %s", slot.text)
+        return None
+    
+    def prompt_duration(self) -> float:
+        """Ask for the booking duration in hours."""
+        duration_input = prompt(
             "How many hours do you want to book? "
             "(e.g., 1.5, 2 hrs, 1 hr 30 min, 90 min): "
         ).strip()
@@ -299,15 +419,55 @@ class BookingFlow:
         if duration_hours is None or duration_hours <= 0:
             print("Invalid duration. Defaulting to 1 hour.")
             duration_hours = DEFAULT_DURATION_HOURS
+        return duration_hours
+    
+    async def set_duration(self, duration_hours: float) -> bool:
+        """Set the booking duration from the value currently shown on the page."""
+        current = await self._read_duration()
+        if current is None:
+            log.warning("⚠️ Could not read current duration, assuming %s hours", DEFAULT_DURATION_HOURS)
+            current = DEFAULT_DURATION_HOURS
         
-        # Calculate clicks needed
-        clicks_needed = int(round((duration_hours - DEFAULT_DURATION_HOURS) / DURATION_INCREMENT))
+        # Calculate clicks needed in either direction
+        clicks_needed = int(round((duration_hours - current) / DURATION_INCREMENT))
+        if clicks_needed == 0:
+            log.info("✅ Duration already set to %s hours", duration_hours)
+            return True
         
-        if clicks_needed > 0:
-            print(f"⏱️ Setting duration to {duration_hours} hours ({clicks_needed} clicks)...")
-            await self._click_duration_plus(clicks_needed)
-        else:
-            print(f"✅ Duration already set to {duration_hours} hours")
+        key = "plus_button_svg" if clicks_needed > 0 else "minus_button_svg"
+        log.info("⏱️ Setting duration from %s to %s hours (%s clicks)...", current, duration_hours, abs(clicks_needed))
+        try:
+            await self.page.evaluate(
+                _STEPPER_BURST_JS, {'selector': SELECTORS[key], 'count': abs(clicks_needed)}
+            )
+        except Exception as e:
+            log.warning("⚠️ Duration burst failed: %s", e)
+        
+        # Confirm once, falling back to one-by-one clicks for whatever is left
+        final = await self._read_duration()
+        if final is not None and abs(final - duration_hours) < 1e-6:
+            log.info("✅ Duration set to %s hours", duration_hours)
+            return True
+        
+        remaining = int(round((duration_hours - (final if final is not None else current)) / DURATION_INCREMENT))
+        if final is None or remaining == 0:
+            log.warning("⚠️ Could not confirm duration (page shows %s)", final)
+            return False
+        
+        log.warning("⚠️ Duration shows %s hours, clicking %s more time(s)...", final, abs(remaining))
+        await self._click_duration_button(
+            "plus_button_svg" if remaining > 0 else "minus_button_svg", abs(remaining)
+        )
+        final = await self._read_duration()
+        return final is not None and abs(final - duration_hours) < 1e-6
+    
+    async def _read_duration(self) -> Optional[float]:
+        """Read the duration currently shown on the page, in hours."""
+        try:
+            text = await self.page.inner_text(SELECTORS["duration_text"], timeout=budget_timeout(DEFAULT_TIMEOUT))
+        except Exception:
+            return None
+        return self._parse_duration(text)
     
     def _parse_duration(self, duration_input: str) -> Optional[float]:
         """Parse duration input into hours."""
@@ -332,32 +492,154 @@ class BookingFlow:
         except ValueError:
             return None
     
-    async def _click_duration_plus(self, clicks_needed: int):
-        """Click the plus button to increase duration."""
+    async def _click_duration_button(self, key: str, clicks_needed: int):
+        """Click the plus or minus duration button one click at a time."""
         for i in range(clicks_needed):
             try:
-                svg = await self.page.query_selector(SELECTORS["plus_button_svg"])
-                if svg:
+                svg = self.page.locator(SELECTORS[key]).first
+                if await svg.count():
                     box = await svg.bounding_box()
                     if box:
                         await self.page.mouse.move(box['x'] + box['width']/2, box['y'] + box['height']/2)
                         await asyncio.sleep(0.5)
                         await self.page.mouse.click(box['x'] + box['width']/2, box['y'] + box['height']/2)
-                        print(f"✅ Duration click {i+1}/{clicks_needed}")
+                        log.debug("✅ Duration click %s/%s", i+1, clicks_needed)
                     else:
-                        print(f"❌ Could not get bounding box for plus button (click {i+1})")
+                        log.error("❌ Could not get bounding box for duration button (click %s)", i+1)
                 else:
-                    print(f"❌ Could not find plus button (click {i+1})")
+                    log.error("❌ Could not find duration button (click %s)", i+1)
+            except Exception as e:
+                log.error("❌ Error on duration click %s: %s", i+1, e)
+    
+    async def court_matrix(self, date: Optional[str] = None, venue: str = '') -> Optional[CourtMatrix]:
+        """
+        Select a date and read every court's price for each of its slots.
+        
+        The matrix comes from the date's availability payload in one pass when
+        one lists courts per slot; only otherwise is each slot's court list
+        opened on the page.
+        
+        Args:
+            date: Date in YYYY-MM-DD format, asked for unless given
+            venue: Venue name recorded on the matrix
+            
+        Returns:
+            CourtMatrix: Court x slot prices, or None if the date or its slots couldn't be read
+        """
+        date = await self.choose_date(date)
+        if date is None:
+            return None
+        
+        records = await self._payload_availability(date)
+        if records and any(court.slot for court in records['courts']):
+            matrix = CourtMatrix.from_courts(
+                records['courts'], [slot.text for slot in records['slots']], venue, date
+            )
+            log.info("✅ Read %s slots x %s courts from the availability payload",
+                     len(matrix.slots), len(matrix.courts))
+        else:
+            slots = await step("slot scrape", lambda: popup_guard.run(self.page, self._scrape_time_slots, "time slot scrape"))
+            await self.page.keyboard.press('Escape')
+            if not slots:
+                log.error("❌ No time slots found")
+                return None
+            matrix = await self.extract_court_matrix(slots, venue, date)
+        
+        cheapest = matrix.cheapest_overall()
+        if cheapest:
+            log.info("✅ Cheapest option: %s at %s (%.0f)", cheapest[1], cheapest[0], cheapest[2])
+        return matrix
+    
+    async def _payload_availability(self, date: str) -> Optional[Dict[str, List]]:
+        """Slots and courts for the selected date from the payload it loaded, or the replayed endpoint."""
+        courts = network_capture.latest('courts', self._capture_mark)
+        if courts:
+            return {'slots': network_capture.latest('slots', self._capture_mark), 'courts': courts}
+        if self.availability.has_endpoint():
+            return await self.availability.fetch(date)
+        return None
+    
+    async def extract_court_matrix(self, slots: List[TimeSlot], venue: str = '', date: str = '') -> CourtMatrix:
+        """
+        Collect every court and its price for each slot by opening each slot's court list.
+        
+        The page fallback for court_matrix: each slot's court panel is read in a
+        single evaluation, and every wait is on a locator rather than a pause.
+        
+        Args:
+            slots: Slots as returned by _scrape_time_slots
+            venue: Venue name recorded on the matrix
+            date: Date recorded on the matrix
+            
+        Returns:
+            CourtMatrix: Court x slot prices
+        """
+        log.info("📊 Extracting court prices for %s slots...", len(slots))
+        matrix = CourtMatrix(venue, date)
+        
+        for slot in slots:
+            try:
+                await self._open_time_picker()
+                await self._click_time_slot(slot)
+                
+                court_span = self.page.locator(SELECTORS["court_selector_span"]).first
+                if not await court_span.count():
+                    matrix.add_slot(slot.text, [])
+                    continue
+                await self._click_court_dropdown(court_span)
+                matrix.add_slot(slot.text, await self._scrape_courts())
+                await self.page.keyboard.press('Escape')
             except Exception as e:
-                print(f"❌ Error on duration click {i+1}: {e}")
+                log.warning("⚠️ Could not read courts for %s: %s", slot.text, e)
+                matrix.add_slot(slot.text, [])
+        
+        return matrix
     
-    async def _select_court(self):
-        """Select a court from available options."""
-        print("🏟️ Selecting court...")
+    async def scan_availability(self, dates: List[str]) -> Dict[str, Optional[Dict[str, List]]]:
+        """
+        Read-only availability scan for several dates.
+        
+        Replays the captured availability endpoint when one has been seen and
+        falls back to selecting each date on the booking page otherwise.
+        
+        Args:
+            dates: Dates in YYYY-MM-DD format
+            
+        Returns:
+            Dict: Date to {'slots': [...], 'courts': [...]}, or to None if it couldn't be read
+        """
+        client = self.availability
+        before = (client.requests, client.cache_hits, client.fallbacks)
+        results = await client.scan(dates)
+        log.info("✅ Scanned %s dates (%s requests, %s cached, %s via the page)", len(results),
+                 client.requests - before[0], client.cache_hits - before[1], client.fallbacks - before[2])
+        return results
+    
+    async def _dom_availability(self, date: str) -> Optional[Dict[str, List]]:
+        """Availability for one date read from the booking page; None if the date can't be selected."""
+        if not await self._select_date(date):
+            # The slots on show belong to another date
+            log.warning("⚠️ Could not select %s on the booking page", date)
+            return None
+        slots = await popup_guard.run(self.page, self._scrape_time_slots, "time slot scrape")
+        await self.page.keyboard.press('Escape')
+        return {'slots': slots, 'courts': []}
+    
+    async def choose_court(self, court: Optional[str] = None) -> Optional[str]:
+        """
+        Select a court from available options, asking for it unless one is given.
+        
+        Args:
+            court: Court number, name or 'cheapest', e.g. from a checkpoint
+            
+        Returns:
+            str: Name of the selected court, or None if none was selected
+        """
+        log.info("🏟️ Selecting court...")
         try:
             # Click court selection dropdown
-            court_span = await self.page.query_selector(SELECTORS["court_selector_span"])
-            if court_span:
+            court_span = self.page.locator(SELECTORS["court_selector_span"]).first
+            if await court_span.count():
                 text = (await court_span.inner_text()).strip()
                 if text == '--Select Court--':
                     await self._click_court_dropdown(court_span)
@@ -365,62 +647,85 @@ class BookingFlow:
                     # Scrape and select court
                     courts = await self._scrape_courts()
                     if courts:
-                        await self._prompt_and_select_court(courts)
+                        return await self._prompt_and_select_court(courts, court)
                 else:
-                    print(f"❌ Court selector text was '{text}', not '--Select Court--'")
+                    log.error("❌ Court selector text was '%s', not '--Select Court--'", text)
             else:
-                print("❌ Could not find court selection element")
+                log.error("❌ Could not find court selection element")
                 
         except Exception as e:
-            print(f"❌ Error selecting court: {e}")
+            log.error("❌ Error selecting court: %s", e)
+        return None
     
     async def _click_court_dropdown(self, court_span):
         """Click the court selection dropdown."""
-        # Walk up DOM to find clickable parent
-        clickable = court_span
-        parent = court_span
-        
-        for _ in range(5):
-            parent = await parent.query_selector('xpath=..')
-            if not parent:
-                break
-            
-            tag_handle = await parent.get_property('tagName')
-            tag = (await tag_handle.json_value()).lower() if tag_handle else ''
-            classes = await parent.get_attribute('class') or ''
+        async with HandleScope() as scope:
+            # Find the clickable parent in one in-page call; the handle is disposed on exit
+            clickable = scope.track(await resolve_clickable_ancestor(court_span, tags=('button',), roles=()))
             
-            if tag == 'button' or 'cursor-pointer' in classes:
-                clickable = parent
-                break
-        
-        box = await clickable.bounding_box()
-        if box:
-            await self.page.mouse.move(box['x'] + box['width']/2, box['y'] + box['height']/2)
-            await asyncio.sleep(0.5)
-            await clickable.click(force=True, timeout=5000)
-            print("✅ Clicked court selection dropdown")
+            box = await clickable.bounding_box()
+            if box:
+                await self.page.mouse.move(box['x'] + box['width']/2, box['y'] + box['height']/2)
+                await clickable.click(force=True, timeout=budget_timeout(SHORT_TIMEOUT))
+                log.debug("✅ Clicked court selection dropdown")
     
-    async def _scrape_courts(self) -> List[Dict]:
-        """Scrape available court options."""
-        await self.page.wait_for_selector('ul[role="listbox"]', timeout=5000)
-        court_options = await self.page.query_selector_all(SELECTORS["court_options"])
+    async def _scrape_courts(self) -> List[Court]:
+        """Scrape court options for the clicked slot, preferring the availability payload."""
+        await self.page.locator('ul[role="listbox"]').first.wait_for(timeout=budget_timeout(SHORT_TIMEOUT))
+        await self.handles.dispose()
+        options = self.page.locator(SELECTORS["court_options"])
+        
+        courts = self._courts_for_slot(network_capture.latest('courts', self._capture_mark))
+        if courts:
+            # The option whose name span reads exactly the court's name: "Court 1" must not pick "Court 10"
+            return [
+                self.handles.register(court, options.filter(has=self.page.get_by_text(court.name, exact=True)).first)
+                for court in courts
+            ]
+        
+        if EXTRACTION_BACKEND == "snapshot":
+            courts = await snapshot_extractor.run(self.page, extract_courts)
+            return [self.handles.register(court, options.nth(court.index)) for court in courts]
+        
+        # No payload seen: read every name and price in one evaluation
+        texts = await options.evaluate_all("""
+            options => options.map(option => {
+                const spans = option.querySelectorAll('span');
+                return [
+                    spans[0] ? spans[0].innerText.trim() : '',
+                    spans[1] ? spans[1].innerText.trim() : ''
+                ];
+            })
+        """)
         
         courts = []
-        for option in court_options:
-            spans = await option.query_selector_all('span')
-            name = (await spans[0].inner_text()).strip() if len(spans) > 0 else ''
-            price = (await spans[1].inner_text()).strip() if len(spans) > 1 else ''
-            courts.append({'name': name, 'price': price, 'el': option})
+        for idx, (name, price) in enumerate(texts):
+            courts.append(self.handles.register(Court(name, price, parse_price(price), index=idx), options.nth(idx)))
         
         return courts
     
-    async def _prompt_and_select_court(self, courts: List[Dict]):
-        """Prompt user to select a court."""
-        print("Available courts:")
-        for i, court in enumerate(courts, 1):
-            print(f"{i}. {court['name']} ({court['price']})")
+    def _courts_for_slot(self, courts: List[Court]) -> List[Court]:
+        """Payload courts for the clicked slot, or for no slot in particular, one per name."""
+        by_name: Dict[str, Court] = {}
+        for court in courts:
+            if court.slot and parse_time_to_minutes(court.slot) != self._slot_minutes:
+                continue
+            by_name.setdefault(court.name, court)
+        return list(by_name.values())
+    
+    async def _prompt_and_select_court(self, courts: List[Court], answer: Optional[str] = None) -> Optional[str]:
+        """Prompt user to select a court, unless an answer is given. Returns the selected court's name."""
+        if answer is None:
+            print("Available courts:")
+            for i, court in enumerate(courts, 1):
+                print(f"{i}. {court.name} ({court.price})")
+            answer = prompt("Which court do you want? Enter the number, name, or 'cheapest': ")
+        user_input = answer.strip()
         
-        user_input = input("Which court do you want? Enter the number or name: ").strip()
+        if user_input.lower() == 'cheapest':
+            priced = [i for i, c in enumerate(courts) if c.price_value is not None]
+            choice = min(priced, key=lambda i: courts[i].price_value) if priced else 0
+            return courts[choice].name if await self._click_court_option(courts[choice]) else None
         
         # Try number selection
         try:
@@ -428,22 +733,22 @@ class BookingFlow:
             if 0 <= num_choice < len(courts):
                 choice = num_choice
             else:
-                print(f"Invalid number. Using first court: {courts[0]['name']}")
+                print(f"Invalid number. Using first court: {courts[0].name}")
                 choice = 0
         except ValueError:
-            # Try name matching
-            matches = [i for i, c in enumerate(courts) if user_input.lower() in c['name'].lower()]
-            if matches:
-                choice = matches[0]
+            # Try ranked name matching
+            match = best_or_closest(MatchIndex.for_names([c.name for c in courts]), user_input, "court")
+            if match is not None:
+                choice = match
             else:
-                print(f"No match found. Using first court: {courts[0]['name']}")
+                print(f"No match found. Using first court: {courts[0].name}")
                 choice = 0
         
-        await self._click_court_option(courts[choice])
+        return courts[choice].name if await self._click_court_option(courts[choice]) else None
     
-    async def _click_court_option(self, court: Dict):
+    async def _click_court_option(self, court: Court) -> bool:
         """Aggressively click the selected court option."""
-        selected = court['el']
+        selected = self.handles.get(court)
         box = await selected.bounding_box()
         
         if box:
@@ -451,58 +756,54 @@ class BookingFlow:
             await asyncio.sleep(0.5)
             
             try:
-                await selected.click(force=True, timeout=5000)
-                print(f"✅ Selected court: {court['name']} ({court['price']})")
+                await selected.click(force=True, timeout=budget_timeout(SHORT_TIMEOUT))
+                log.info("✅ Selected court: %s (%s)", court.name, court.price)
+                return True
             except Exception as e:
-                print(f"Element click failed: {e}, trying mouse click")
+                log.debug("Element click failed: %s, trying mouse click", e)
                 try:
                     await self.page.mouse.click(box['x'] + box['width']/2, box['y'] + box['height']/2)
-                    print(f"✅ Selected court with mouse: {court['name']}")
+                    log.debug("✅ Selected court with mouse: %s", court.name)
+                    return True
                 except Exception as e2:
-                    print(f"❌ Both click methods failed: {e2}")
+                    log.error("❌ Both click methods failed: %s", e2)
+        return False
     
-    async def _complete_checkout(self):
+    async def checkout(self) -> bool:
         """Complete the checkout process."""
-        print("🛒 Completing checkout process...")
+        log.info("🛒 Completing checkout process...")
         
         # Add to cart
-        await self._click_add_to_cart()
+        if not await self._click_add_to_cart():
+            return False
         await asyncio.sleep(2)
         
         # Proceed to checkout
-        await self._click_proceed_to_checkout()
+        return await self._click_proceed_to_checkout()
     
-    async def _click_add_to_cart(self):
+    async def _click_add_to_cart(self) -> bool:
         """Click the Add to Cart button."""
-        print("🛒 Clicking Add to Cart...")
+        log.debug("🛒 Clicking Add to Cart...")
         
-        for selector in SELECTORS["add_to_cart_buttons"]:
-            try:
-                button = await self.page.query_selector(selector)
-                if button:
-                    await self._aggressive_click(button, "Add to Cart")
-                    return
-            except Exception:
-                continue
+        _, buttons = await selector_resolver.locate(self.page, "add_to_cart_buttons")
+        if buttons:
+            return await self._aggressive_click(buttons.first, "Add to Cart")
         
-        print("❌ Could not find Add to Cart button")
+        log.error("❌ Could not find Add to Cart button")
+        return False
     
-    async def _click_proceed_to_checkout(self):
+    async def _click_proceed_to_checkout(self) -> bool:
         """Click the Proceed to Checkout button."""
-        print("💳 Clicking Proceed to Checkout...")
+        log.debug("💳 Clicking Proceed to Checkout...")
         
-        for selector in SELECTORS["checkout_buttons"]:
-            try:
-                button = await self.page.query_selector(selector)
-                if button:
-                    await self._aggressive_click(button, "Proceed to Checkout")
-                    return
-            except Exception:
-                continue
+        _, buttons = await selector_resolver.locate(self.page, "checkout_buttons")
+        if buttons:
+            return await self._aggressive_click(buttons.first, "Proceed to Checkout")
         
-        print("❌ Could not find Proceed to Checkout button")
+        log.error("❌ Could not find Proceed to Checkout button")
+        return False
     
-    async def _aggressive_click(self, element, description: str):
+    async def _aggressive_click(self, element, description: str) -> bool:
         """Perform aggressive clicking on an element."""
         box = await element.bounding_box()
         if box:
@@ -510,14 +811,17 @@ class BookingFlow:
             await asyncio.sleep(1)
             
             try:
-                await element.click(force=True, timeout=10000)
-                print(f"✅ Clicked {description} successfully")
+                await element.click(force=True, timeout=budget_timeout(DEFAULT_TIMEOUT))
+                log.debug("✅ Clicked %s successfully", description)
+                return True
             except Exception as e:
-                print(f"Element click failed: {e}, trying mouse click")
+                log.debug("Element click failed: %s, trying mouse click", e)
                 try:
                     await self.page.mouse.click(box['x'] + box['width']/2, box['y'] + box['height']/2)
-                    print(f"✅ Clicked {description} with mouse")
+                    log.debug("✅ Clicked %s with mouse", description)
+                    return True
                 except Exception as e2:
-                    print(f"❌ All click methods failed for {description}: {e2}")
+                    log.error("❌ All click methods failed for %s: %s", description, e2)
         else:
-            print(f"❌ Could not get bounding box for {description}")
+            log.error("❌ Could not get bounding box for %s", description)
+        return False
@@ -0,0 +1,287 @@
+"""
+Calendar module for Playo booking automation.
+Maps full dates to cells of the date picker popover in one evaluation and
+navigates between months when the requested date isn't shown.
+"""
+
+import calendar
+import re
+from datetime import date, datetime
+from typing import Dict, List, Optional, Tuple
+from config import SELECTORS, DEFAULT_TIMEOUT, SHORT_TIMEOUT, EXTRACTION_BACKEND, CALENDAR_OUTSIDE_CLASSES
+from src.deadline import budget_timeout
+from src.selector_cache import selector_resolver
+from src.snapshot import extract_calendar, snapshot_extractor
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+MAX_MONTH_JUMPS = 12
+
+_MONTHS = {name.lower(): idx for idx, name in enumerate(calendar.month_name) if name}
+_MONTHS.update({name.lower(): idx for idx, name in enumerate(calendar.month_abbr) if name})
+_HEADER_RE = re.compile(r"\b(" + "|".join(sorted(_MONTHS, key=len, reverse=True)) + r")\w*\s+(\d{4})\b", re.IGNORECASE)
+
+_READ_GRID_JS = """
+([panelSelector, daySelector, outsidePattern]) => {
+    const panel = document.querySelector(panelSelector);
+    if (!panel) return null;
+    const outside = new RegExp(outsidePattern);
+    const cells = Array.from(document.querySelectorAll(daySelector)).map(el => ({
+        text: el.innerText.trim(),
+        label: el.getAttribute('aria-label') || el.getAttribute('data-date') || el.getAttribute('datetime') || '',
+        outside: outside.test(el.className) || el.getAttribute('aria-disabled') === 'true'
+    }));
+    return {header: panel.innerText.slice(0, 300), cells};
+}
+"""
+
+# True once the popover heading differs from the one read before a month change
+_HEADER_CHANGED_JS = """
+([panelSelector, previous]) => {
+    const panel = document.querySelector(panelSelector);
+    return !!panel && panel.innerText.slice(0, 300) !== previous;
+}
+"""
+
+
+def parse_month_header(text: str) -> Optional[Tuple[int, int]]:
+    """
+    Find the "Month YYYY" heading in calendar text.
+
+    Args:
+        text: Calendar panel text
+
+    Returns:
+        Tuple: (year, month), or None if no heading was found
+    """
+    match = _HEADER_RE.search(text or '')
+    if not match:
+        return None
+    return int(match.group(2)), _MONTHS[match.group(1).lower()]
+
+
+def _shift_month(year: int, month: int, offset: int) -> Tuple[int, int]:
+    """Move a (year, month) pair by a number of months."""
+    total = year * 12 + (month - 1) + offset
+    return total // 12, total % 12 + 1
+
+
+def map_calendar_cells(year: int, month: int, cells: List[Dict]) -> Dict[date, int]:
+    """
+    Map dates to cell indexes for a grid showing a given month.
+
+    Explicit date attributes win, and fix the month of the run they sit in
+    for the unlabelled cells around them. Otherwise each drop in day number
+    starts the next month. Without labels, the leading run belongs to the
+    header month unless there is evidence it is the previous month's tail:
+    its cells carry an outside-month marker, or it ends on the previous
+    month's last day and is followed by the whole header month (1 through
+    its last day).
+
+    Args:
+        year: Year of the month in the header
+        month: Month in the header
+        cells: Cell dicts with 'text' and optional 'label' and 'outside'
+
+    Returns:
+        Dict[date, int]: Date to cell index
+    """
+    mapping: Dict[date, int] = {}
+    # Runs of rising day numbers; 'month' is set when a labelled cell in the run names it
+    segments: List[Dict] = [{'days': [], 'month': None}]
+    previous_day = 0
+
+    for idx, cell in enumerate(cells):
+        explicit = _parse_label_date(cell.get('label', ''))
+        if explicit:
+            mapping[explicit] = idx
+            day = explicit.day
+        elif cell.get('text', '').isdigit():
+            day = int(cell['text'])
+        else:
+            continue
+        if day < previous_day:
+            segments.append({'days': [], 'month': None})
+        if explicit:
+            segments[-1]['month'] = (explicit.year, explicit.month)
+        else:
+            segments[-1]['days'].append((idx, day))
+        previous_day = day
+
+    segments = [segment for segment in segments if segment['days'] or segment['month']]
+    anchors = [(i, segment['month']) for i, segment in enumerate(segments) if segment['month']]
+    if anchors:
+        months = []
+        for i in range(len(segments)):
+            # Count from the nearest labelled run before this one, else the first after it
+            anchor_idx, (anchor_year, anchor_month) = next(
+                (anchor for anchor in reversed(anchors) if anchor[0] <= i), anchors[0]
+            )
+            months.append(_shift_month(anchor_year, anchor_month, i - anchor_idx))
+    else:
+        first_offset = 0
+        if len(segments) > 1:
+            prev_year, prev_month = _shift_month(year, month, -1)
+            leading, following = segments[0]['days'], segments[1]['days']
+            flagged = all(cells[idx].get('outside') for idx, _ in leading)
+            tail_shaped = (
+                len(leading) < 7 and leading[0][1] > 1
+                and leading[-1][1] == calendar.monthrange(prev_year, prev_month)[1]
+            )
+            whole_month_follows = following[0][1] == 1 and following[-1][1] == calendar.monthrange(year, month)[1]
+            if flagged or (tail_shaped and whole_month_follows):
+                first_offset = -1
+        months = [_shift_month(year, month, i + first_offset) for i in range(len(segments))]
+
+    for segment, (seg_year, seg_month) in zip(segments, months):
+        for idx, day in segment['days']:
+            try:
+                mapping.setdefault(date(seg_year, seg_month, day), idx)
+            except ValueError:
+                continue
+    return mapping
+
+
+def _parse_label_date(label: str) -> Optional[date]:
+    """Parse an ISO or long-form date from a cell attribute."""
+    text = (label or '').strip()
+    if not text:
+        return None
+    if re.match(r"\d{4}-\d{2}-\d{2}", text):
+        try:
+            return date.fromisoformat(text[:10])
+        except ValueError:
+            return None
+    for fmt in ('%A, %B %d, %Y', '%B %d, %Y', '%d %B %Y'):
+        try:
+            return datetime.strptime(text, fmt).date()
+        except ValueError:
+            continue
+    return None
+
+
+class CalendarResolver:
+    """Resolves dates to calendar cells, caching the grid while the popover is open."""
+
+    def __init__(self):
+        self.shown: Optional[Tuple[int, int]] = None
+        self.cells: Dict[date, int] = {}
+        self._page = None
+        self._header = ''
+
+    def invalidate(self):
+        """Forget the cached grid, e.g. after a click closed the popover."""
+        self.shown = None
+        self.cells = {}
+        self._page = None
+        self._header = ''
+
+    async def open(self, page):
+        """Open the date picker popover unless it is already open."""
+        if self._page is page and self.cells and await page.is_visible(SELECTORS["calendar_popover"]):
+            return
+        self.invalidate()
+        if not await page.is_visible(SELECTORS["calendar_popover"]):
+            await page.locator(SELECTORS["date_picker_button"]).first.click(timeout=budget_timeout(DEFAULT_TIMEOUT))
+            log.debug("✅ Clicked date picker button")
+        await page.locator(SELECTORS["calendar_popover"]).first.wait_for(timeout=budget_timeout(DEFAULT_TIMEOUT))
+        self._page = page
+        await self._read_grid(page)
+
+    async def locate(self, page, target: date) -> Optional[int]:
+        """
+        Return the cell index for a date, navigating months as needed.
+
+        Args:
+            page: Playwright page object
+            target: Date to find
+
+        Returns:
+            int: Index into SELECTORS["calendar_days"], or None if unreachable
+        """
+        await self.open(page)
+
+        for _ in range(MAX_MONTH_JUMPS):
+            if target in self.cells:
+                return self.cells[target]
+            if not self.shown:
+                return None
+
+            diff = (target.year - self.shown[0]) * 12 + (target.month - self.shown[1])
+            if diff == 0:
+                return None  # Month is shown but the day isn't selectable
+            key = "calendar_next_buttons" if diff > 0 else "calendar_prev_buttons"
+            _, buttons = await selector_resolver.locate(page, key)
+            if not buttons:
+                log.error("❌ No month navigation button matched SELECTORS['%s']; add the site's button "
+                          "selector to config.py or pick %s by hand", key, target.isoformat())
+                return None
+            await buttons.first.click()
+            if not await self._wait_for_month_change(page):
+                log.error("❌ Clicking SELECTORS['%s'] did not change the month; stopping", key)
+                return None
+            await self._read_grid(page)
+        return None
+
+    async def select(self, page, target: date) -> bool:
+        """
+        Click the cell for a date.
+
+        Args:
+            page: Playwright page object
+            target: Date to select
+
+        Returns:
+            bool: True if the date was clicked
+        """
+        idx = await self.locate(page, target)
+        if idx is None:
+            log.error("❌ Could not find %s in calendar", target.isoformat())
+            return False
+
+        await page.locator(SELECTORS["calendar_days"]).nth(idx).click()
+        self.invalidate()  # Picking a day closes the popover
+        log.info("✅ Selected %s", target.isoformat())
+        return True
+
+    async def available_dates(self, page) -> List[date]:
+        """Selectable dates in the currently shown grid, read from the cache when possible."""
+        await self.open(page)
+        return sorted(self.cells)
+
+    async def _wait_for_month_change(self, page) -> bool:
+        """Wait until the grid shows a different month after a navigation click; False if it never did."""
+        try:
+            await page.wait_for_function(
+                _HEADER_CHANGED_JS, arg=[SELECTORS["calendar_popover"], self._header],
+                timeout=budget_timeout(SHORT_TIMEOUT)
+            )
+            return True
+        except Exception as e:
+            log.warning("⚠️ Calendar did not change month after navigating: %s", e)
+            return False
+
+    async def _read_grid(self, page):
+        """Read the header and every day cell in one evaluation."""
+        if EXTRACTION_BACKEND == "snapshot":
+            grid = await snapshot_extractor.run(page, extract_calendar)
+        else:
+            grid = await page.evaluate(
+                _READ_GRID_JS, [SELECTORS["calendar_popover"], SELECTORS["calendar_days"], CALENDAR_OUTSIDE_CLASSES]
+            )
+        if not grid:
+            self.shown, self.cells, self._header = None, {}, ''
+            return
+
+        self._header = grid['header']
+        self.shown = parse_month_header(grid['header'])
+        if self.shown is None:
+            # No heading: assume the grid starts at the current month
+            today = date.today()
+            self.shown = (today.year, today.month)
+        self.cells = map_calendar_cells(self.shown[0], self.shown[1], grid['cells'])
+
+
+# Shared resolver; its cache is tied to the popover that is currently open
+calendar_resolver = CalendarResolver()
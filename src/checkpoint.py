@@ -0,0 +1,224 @@
+"""
+Checkpoint module for Playo booking automation.
+Runs the booking flow as a graph of steps and persists the choices made so
+far after every completed step, so a rerun resumes where the last one
+stopped instead of logging in, searching and scraping again.
+"""
+
+import contextlib
+import dataclasses
+import json
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+from config import CHECKPOINT_PATH
+from src.deadline import BudgetExceeded
+from src.utils import RetryPolicy, retry_async, retry_policy
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+CHECKPOINT_VERSION = 1
+
+
+@dataclass
+class Checkpoint:
+    """Choices made so far and the steps that completed."""
+    sport: Optional[str] = None
+    area: Optional[str] = None  # Location searched for venues
+    venue: Optional[str] = None
+    venue_url: Optional[str] = None
+    date: Optional[str] = None  # YYYY-MM-DD
+    slot: Optional[str] = None  # Slot label as shown on the page
+    duration: Optional[float] = None  # hours
+    court: Optional[str] = None
+    page_url: Optional[str] = None  # Page to reopen when resuming
+    completed: List[str] = field(default_factory=list)
+    updated: float = 0.0
+
+
+# A step's action; returns a truthy value once the step succeeded
+StepAction = Callable[[Checkpoint], Awaitable[bool]]
+
+
+@dataclass
+class Step:
+    """
+    One node of the flow.
+
+    run performs the step and records its choice on the checkpoint. replay,
+    if given, re-applies a recorded choice to a freshly opened page without
+    asking again; completed steps without one are skipped on resume.
+    Errors raised by either are retried under policy, which defaults to the
+    RETRY_POLICIES entry for the step's name, or for "<name> (replay)" when
+    replaying, so a step that prompts can refuse retries while its replay
+    keeps them.
+    """
+    name: str
+    run: StepAction
+    after: Tuple[str, ...] = ()
+    replay: Optional[StepAction] = None
+    policy: Optional[RetryPolicy] = None
+
+
+class CheckpointStore:
+    """Persists a checkpoint as JSON next to the other state files."""
+
+    def __init__(self, path: str = CHECKPOINT_PATH):
+        self.path = path
+
+    def load(self) -> Optional[Checkpoint]:
+        """
+        Load the saved checkpoint.
+
+        Returns:
+            Checkpoint: The saved checkpoint, or None if there is none or it is unreadable
+        """
+        if not os.path.exists(self.path):
+            return None
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("⚠️ Could not read checkpoint: %s", e)
+            return None
+
+        if data.get('version') != CHECKPOINT_VERSION:
+            return None
+        names = {f.name for f in dataclasses.fields(Checkpoint)}
+        return Checkpoint(**{key: value for key, value in data.items() if key in names})
+
+    def save(self, checkpoint: Checkpoint):
+        """Persist a checkpoint atomically."""
+        checkpoint.updated = time.time()
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': CHECKPOINT_VERSION, **dataclasses.asdict(checkpoint)}, f, indent=2)
+        os.replace(tmp_path, self.path)
+
+    def clear(self):
+        """Delete the saved checkpoint."""
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+
+
+class StepGraph:
+    """Runs steps in dependency order, checkpointing after each one."""
+
+    def __init__(self, steps: List[Step], store: Optional[CheckpointStore] = None,
+                 page_url: Optional[Callable[[], Optional[str]]] = None, recorder=None, diagnostics=None):
+        """
+        Args:
+            steps: Steps in the order they should run; `after` may only name earlier steps
+            store: Where checkpoints are saved; None keeps them in memory
+            page_url: Returns the URL of the page the flow is on, recorded after each step
+            recorder: Optional FlightRecorder, dumped when a step fails
+            diagnostics: Optional Diagnostics, profiling each step while it is on
+
+        Raises:
+            ValueError: If a step name repeats or a dependency is unknown or declared later
+        """
+        self.steps = steps
+        self.store = store
+        self.page_url = page_url
+        self.recorder = recorder
+        self.diagnostics = diagnostics
+        self._by_name: Dict[str, Step] = {}
+        for step in steps:
+            if step.name in self._by_name:
+                raise ValueError(f"Duplicate step: {step.name}")
+            for dependency in step.after:
+                if dependency not in self._by_name:
+                    raise ValueError(f"Step '{step.name}' runs after unknown or later step '{dependency}'")
+            self._by_name[step.name] = step
+
+    def dependents(self, name: str) -> List[str]:
+        """Every step that depends on a step, directly or transitively, in run order."""
+        affected = {name}
+        result = []
+        for step in self.steps:
+            if affected.intersection(step.after):
+                affected.add(step.name)
+                result.append(step.name)
+        return result
+
+    def next_step(self, checkpoint: Checkpoint) -> Optional[str]:
+        """First step the checkpoint has not completed, or None if the flow is done."""
+        return next((step.name for step in self.steps if step.name not in checkpoint.completed), None)
+
+    def forget(self, checkpoint: Checkpoint, name: str):
+        """Mark a step and everything depending on it as not completed."""
+        stale = {name, *self.dependents(name)}
+        checkpoint.completed = [done for done in checkpoint.completed if done not in stale]
+
+    async def run(self, checkpoint: Checkpoint, deadline=None) -> bool:
+        """
+        Run the flow, resuming after the steps the checkpoint already completed.
+
+        Args:
+            checkpoint: Checkpoint to resume from and update
+            deadline: Optional Deadline each step runs under
+
+        Returns:
+            bool: True if every step succeeded
+        """
+        # Drop completions for steps this flow no longer has
+        checkpoint.completed = [name for name in checkpoint.completed if name in self._by_name]
+
+        for step in self.steps:
+            if step.name in checkpoint.completed:
+                if step.replay is None:
+                    log.info("⏭️ Skipping completed step: %s", step.name)
+                    continue
+                log.info("🔁 Replaying completed step: %s", step.name)
+                if await self._call(step, f"{step.name} (replay)", step.replay, checkpoint, deadline):
+                    continue
+                log.warning("⚠️ Replay of '%s' failed, running it again", step.name)
+
+            # Running a step afresh invalidates whatever was built on its old result
+            self.forget(checkpoint, step.name)
+            if not await self._call(step, step.name, step.run, checkpoint, deadline):
+                log.error("❌ Step '%s' failed. Rerun to resume from here.", step.name)
+                self._save(checkpoint)
+                return False
+
+            checkpoint.completed.append(step.name)
+            if self.page_url:
+                checkpoint.page_url = self.page_url() or checkpoint.page_url
+            self._save(checkpoint)
+
+        return True
+
+    async def _call(self, step: Step, name: str, action: StepAction, checkpoint: Checkpoint, deadline) -> bool:
+        policy = step.policy or retry_policy(name)
+
+        def attempt():
+            # No breaker here: the site calls inside a step report to it themselves
+            return retry_async(lambda: action(checkpoint), policy, name)
+
+        if self.recorder:
+            await self.recorder.mark_step(name)
+        try:
+            with self.diagnostics.step(name) if self.diagnostics else contextlib.nullcontext():
+                if deadline is None:
+                    ok = bool(await attempt())
+                else:
+                    ok = bool(await deadline.run(name, attempt))
+        except (Exception, BudgetExceeded) as e:
+            if self.recorder:
+                await self.recorder.dump(name, e)
+            raise
+        if not ok and self.recorder:
+            await self.recorder.dump(name)
+        return ok
+
+    def _save(self, checkpoint: Checkpoint):
+        if self.store:
+            try:
+                self.store.save(checkpoint)
+            except OSError as e:
+                log.warning("⚠️ Could not save checkpoint: %s", e)
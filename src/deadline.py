@@ -0,0 +1,251 @@
+"""
+Deadline module for Playo booking automation.
+Runs the flow under one overall latency budget: every step gets the time that
+is left, running out cancels the step and everything it awaits, and the
+report shows which steps used the budget. Time spent at prompts is not
+counted. A step can also have its own timeout, e.g. one learned from past
+runs, which caps the waits inside it the same way.
+"""
+
+import asyncio
+import contextlib
+import math
+import time
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Awaitable, Callable, List, Optional, Tuple, TypeVar
+from src.log import get_logger, step_context
+
+log = get_logger(__name__)
+
+T = TypeVar('T')
+
+_current: ContextVar[Optional['Deadline']] = ContextVar('deadline', default=None)
+_step_path: ContextVar[Tuple[str, ...]] = ContextVar('deadline_step', default=())
+# When the running step must end, in Deadline.elapsed() seconds
+_step_end: ContextVar[float] = ContextVar('deadline_step_end', default=math.inf)
+
+
+class BudgetExceeded(BaseException):
+    """
+    Raised when the latency budget runs out during a step.
+
+    Derives from BaseException, like asyncio.CancelledError, so the broad
+    `except Exception` blocks inside steps cannot swallow it.
+    """
+
+    def __init__(self, step: str, deadline: 'Deadline'):
+        super().__init__(f"Latency budget of {deadline.budget:.0f}s exhausted during '{step}'")
+        self.step = step
+        self.deadline = deadline
+
+
+class StepTimeout(asyncio.TimeoutError):
+    """Raised when a step outlives its own timeout while budget is still left."""
+
+    def __init__(self, step: str, limit: float):
+        super().__init__(f"Step '{step}' exceeded its {limit:.1f}s timeout")
+        self.step = step
+        self.limit = limit
+
+
+@dataclass
+class StepRecord:
+    """Budget consumed by one step."""
+    name: str
+    started: float
+    elapsed: float
+    status: str  # ok, failed, timeout or cancelled
+    url: str = ''  # Page the step started on
+    round_trips: int = 0  # Messages sent to the browser while the step ran
+
+
+class StepHistory:
+    """What a Deadline needs from a latency store; see src.latency."""
+
+    def timeout_for(self, step: str) -> Optional[float]:
+        """Timeout for a step in seconds, or None to use only the budget."""
+        return None
+
+    def record(self, record: StepRecord):
+        """Store one finished step."""
+
+    def round_trips(self) -> int:
+        """Running count of messages sent to the browser."""
+        return 0
+
+
+class Deadline:
+    """Overall latency budget shared by every step of a run."""
+
+    def __init__(self, budget_seconds: float, history: Optional[StepHistory] = None,
+                 page_url: Optional[Callable[[], str]] = None):
+        """
+        Args:
+            budget_seconds: Overall budget, excluding paused time
+            history: Supplies per-step timeouts and stores finished steps
+            page_url: Returns the URL of the page the flow is on
+        """
+        self.budget = budget_seconds
+        self.history = history
+        self.page_url = page_url
+        self.started = time.monotonic()
+        self.paused_total = 0.0
+        self._paused_since: Optional[float] = None
+        self.steps: List[StepRecord] = []
+
+    def elapsed(self) -> float:
+        """Budget used so far, excluding paused time."""
+        now = time.monotonic()
+        paused = self.paused_total + (now - self._paused_since if self._paused_since is not None else 0.0)
+        return now - self.started - paused
+
+    def remaining(self) -> float:
+        """Seconds of budget left."""
+        return self.budget - self.elapsed()
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+    def step_remaining(self) -> float:
+        """Seconds left for the running step: the budget left, capped by the step's timeout."""
+        return min(self.remaining(), _step_end.get() - self.elapsed())
+
+    def timeout_ms(self, cap_ms: float) -> int:
+        """A Playwright timeout no longer than the time left for the step (at least 1 ms)."""
+        return max(1, int(min(cap_ms, self.step_remaining() * 1000)))
+
+    @contextlib.contextmanager
+    def paused(self):
+        """Stop the clock, e.g. while waiting for the user at a prompt."""
+        if self._paused_since is not None:
+            yield
+            return
+        self._paused_since = time.monotonic()
+        try:
+            yield
+        finally:
+            self.paused_total += time.monotonic() - self._paused_since
+            self._paused_since = None
+
+    async def run(self, name: str, step: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a step with whatever budget is left.
+
+        Nested steps are recorded as "outer/inner". If the budget or the
+        step's own timeout runs out, the step task is cancelled, which cancels
+        every wait inside it.
+
+        Args:
+            name: Step name for the report
+            step: Zero-argument coroutine function performing the step
+
+        Returns:
+            Whatever the step returns
+
+        Raises:
+            BudgetExceeded: If the budget ran out before or during the step
+            StepTimeout: If the step's own timeout ran out first
+        """
+        path = _step_path.get() + (name,)
+        label = '/'.join(path)
+        url = self.page_url() if self.page_url else ''
+        if self.expired():
+            self._finish(StepRecord(label, self.elapsed(), 0.0, 'timeout', url))
+            raise BudgetExceeded(label, self)
+
+        started = self.elapsed()
+        trips = self.history.round_trips() if self.history else 0
+        limit = self.history.timeout_for(label) if self.history else None
+        step_end = min(_step_end.get(), started + limit) if limit else _step_end.get()
+
+        # The task copies the context here, so nested steps see this deadline, path and end and log under this step
+        tokens = _current.set(self), _step_path.set(path), _step_end.set(step_end), step_context.set(label)
+        try:
+            task = asyncio.ensure_future(step())
+        finally:
+            for var, token in zip((_current, _step_path, _step_end, step_context), tokens):
+                var.reset(token)
+
+        status = 'failed'
+        try:
+            while not task.done():
+                left = min(self.remaining(), step_end - self.elapsed())
+                await asyncio.wait({task}, timeout=max(left, 0.0))
+                if task.done():
+                    break
+                if self.expired() or self.elapsed() >= step_end:
+                    status = 'timeout'
+                    task.cancel()
+                    with contextlib.suppress(asyncio.CancelledError, Exception):
+                        await task
+                    if self.expired():
+                        raise BudgetExceeded(label, self)
+                    raise StepTimeout(label, step_end - started)
+            result = task.result()
+            status = 'ok'
+            return result
+        except BudgetExceeded:
+            status = 'timeout'
+            raise
+        except asyncio.CancelledError:
+            status = 'cancelled'
+            raise
+        finally:
+            if not task.done():
+                task.cancel()
+            trips = self.history.round_trips() - trips if self.history else 0
+            self._finish(StepRecord(label, started, self.elapsed() - started, status, url, trips))
+
+    def _finish(self, record: StepRecord):
+        self.steps.append(record)
+        if self.history:
+            try:
+                self.history.record(record)
+            except Exception as e:
+                log.warning("⚠️ Could not record step timing: %s", e)
+
+    def report(self) -> str:
+        """Per-step budget consumption, in the order steps started."""
+        lines = [
+            f"⏱️ Budget {self.budget:.0f}s, used {self.elapsed():.1f}s"
+            f" (+{self.paused_total:.1f}s paused at prompts)"
+        ]
+        for record in sorted(self.steps, key=lambda r: r.started):
+            share = record.elapsed / self.budget if self.budget else 0.0
+            lines.append(f"   {record.name:<40} {record.elapsed:7.1f}s {share:6.1%}  {record.status}")
+        return "\n".join(lines)
+
+
+def current_deadline() -> Optional[Deadline]:
+    """Deadline of the step being run, if any."""
+    return _current.get()
+
+
+def budget_timeout(cap_ms: float) -> int:
+    """
+    Playwright timeout for a wait inside a step: the cap, shortened to the budget left.
+
+    Args:
+        cap_ms: Timeout the wait would use on its own, in milliseconds
+
+    Returns:
+        int: Timeout in milliseconds
+    """
+    deadline = _current.get()
+    return int(cap_ms) if deadline is None else deadline.timeout_ms(cap_ms)
+
+
+async def step(name: str, fn: Callable[[], Awaitable[T]]) -> T:
+    """Run a nested step under the current deadline, or directly if there is none."""
+    deadline = _current.get()
+    if deadline is None:
+        return await fn()
+    return await deadline.run(name, fn)
+
+
+def prompt(message: str) -> str:
+    """input() with the deadline paused while the user types."""
+    deadline = _current.get()
+    with deadline.paused() if deadline else contextlib.nullcontext():
+        return input(message)
@@ -0,0 +1,347 @@
+"""
+Diagnostics module for Playo booking automation.
+Opt-in mode for finding what blocks the event loop: asyncio debug reports
+slow callbacks, a watchdog thread samples the loop thread's stack whenever
+the loop stalls, and each step can run under cProfile and tracemalloc. The
+summary attributes blocked time and allocations to functions in src/.
+"""
+
+import ast
+import asyncio
+import contextlib
+import cProfile
+import functools
+import logging
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+import traceback
+from collections import Counter, defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+from config import (
+    DIAGNOSTICS_DIR, SLOW_CALLBACK_SECONDS, STALL_THRESHOLD_SECONDS, STALL_SAMPLE_INTERVAL,
+    DIAGNOSTICS_PROFILE, DIAGNOSTICS_TRACE_ALLOCATIONS, DIAGNOSTICS_TRACE_FRAMES
+)
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SRC_DIR = os.path.join(ROOT_DIR, 'src') + os.sep
+
+# Task repr in asyncio's slow callback warning, e.g. "coro=<BookingFlow.checkout() running at /…/booking.py:88>"
+_CORO_RE = re.compile(r"coro=<([\w.<>]+)\(\) \w+ at ([^:>]+):(\d+)>")
+
+MAX_STALLS = 20  # Longest stalls kept with their stacks
+
+
+@functools.lru_cache(maxsize=None)
+def _functions(filename: str) -> List[Tuple[int, int, str]]:
+    """(first line, last line, qualified name) of every function in a file, outermost first."""
+    try:
+        with open(filename, 'r', encoding='utf-8') as f:
+            tree = ast.parse(f.read())
+    except (OSError, SyntaxError, ValueError):
+        return []
+
+    found = []
+
+    def visit(node, prefix: str):
+        for child in ast.iter_child_nodes(node):
+            if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                name = f"{prefix}{child.name}"
+                if not isinstance(child, ast.ClassDef):
+                    found.append((child.lineno, child.end_lineno, name))
+                visit(child, f"{name}.")
+            else:
+                visit(child, prefix)
+
+    visit(tree, '')
+    return found
+
+
+def location(filename: str, lineno: int, function: Optional[str] = None) -> str:
+    """'src/booking.py:120 BookingFlow.checkout' for a line, naming the innermost enclosing function."""
+    lineno = lineno or 0  # None while a frame is between lines
+    if function is None:
+        enclosing = [name for first, last, name in _functions(filename) if first <= lineno <= last]
+        function = enclosing[-1] if enclosing else '<module>'
+    path = os.path.relpath(filename, ROOT_DIR) if filename.startswith(ROOT_DIR) else filename
+    return f"{path}:{lineno} {function}"
+
+
+def in_src(filename: str) -> bool:
+    return filename.startswith(SRC_DIR)
+
+
+def frame_location(frame) -> str:
+    """Location of the innermost src/ frame of a stack, or of its top frame if no src/ code is on it."""
+    top = frame
+    while frame is not None:
+        if in_src(frame.f_code.co_filename):
+            return location(frame.f_code.co_filename, frame.f_lineno)
+        frame = frame.f_back
+    return location(top.f_code.co_filename, top.f_lineno)
+
+
+class StallDetector:
+    """
+    Watchdog thread that notices when the event loop stops turning.
+
+    The loop bumps a heartbeat every interval; when the heartbeat is older
+    than the threshold, the watchdog samples the loop thread's stack each
+    interval until the loop runs again and charges the time to the
+    innermost src/ function on the stack.
+    """
+
+    def __init__(self, threshold: float = STALL_THRESHOLD_SECONDS, interval: float = STALL_SAMPLE_INTERVAL):
+        self.threshold = threshold
+        self.interval = interval
+        self.blocked: Counter = Counter()  # location -> seconds
+        self.stalls: List[Tuple[float, str, str]] = []  # (seconds, location, stack), longest first
+        self.stall_count = 0
+        self._beat = 0.0
+        self._loop = None
+        self._loop_thread: Optional[int] = None
+        self._handle = None
+        self._thread: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+        self._suspended = False
+
+    def start(self, loop: asyncio.AbstractEventLoop):
+        """Start the heartbeat on the loop (call from the loop thread) and the watchdog thread."""
+        self._loop = loop
+        self._loop_thread = threading.get_ident()
+        self._beat = time.monotonic()
+        self._handle = loop.call_soon(self._heartbeat)
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._watch, name="stall-detector", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._handle:
+            self._handle.cancel()
+            self._handle = None
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    @contextlib.contextmanager
+    def suspended(self):
+        """Ignore the loop blocking inside this block, e.g. while diagnostics take a snapshot."""
+        self._suspended = True
+        try:
+            yield
+        finally:
+            self._beat = time.monotonic()
+            self._suspended = False
+
+    def _heartbeat(self):
+        self._beat = time.monotonic()
+        self._handle = self._loop.call_later(self.interval, self._heartbeat)
+
+    def _watch(self):
+        stall_start = None
+        first_stack = ''
+        where: Counter = Counter()
+        while not self._stop.wait(self.interval):
+            lag = time.monotonic() - self._beat - self.interval
+            if lag < self.threshold or self._suspended:
+                if stall_start is not None:
+                    self._end_stall(time.monotonic() - stall_start, where, first_stack)
+                    stall_start, where = None, Counter()
+                continue
+
+            frame = sys._current_frames().get(self._loop_thread)
+            if frame is None:
+                continue
+            here = frame_location(frame)
+            if stall_start is None:
+                # The loop was already blocked for `lag` before this first sample
+                stall_start = time.monotonic() - lag
+                first_stack = ''.join(traceback.format_stack(frame, limit=15))
+                self.blocked[here] += lag
+                where[here] += lag
+            self.blocked[here] += self.interval
+            where[here] += self.interval
+            del frame
+
+        if stall_start is not None:
+            self._end_stall(time.monotonic() - stall_start, where, first_stack)
+
+    def _end_stall(self, seconds: float, where: Counter, stack: str):
+        self.stall_count += 1
+        self.stalls.append((seconds, where.most_common(1)[0][0], stack))
+        self.stalls.sort(key=lambda stall: stall[0], reverse=True)
+        del self.stalls[MAX_STALLS:]
+
+
+class _SlowCallbackHandler(logging.Handler):
+    """Collects asyncio's 'Executing <handle> took N seconds' debug warnings."""
+
+    def __init__(self, diagnostics: 'Diagnostics'):
+        super().__init__(logging.WARNING)
+        self.diagnostics = diagnostics
+
+    def emit(self, record: logging.LogRecord):
+        if not (isinstance(record.msg, str) and record.msg.startswith('Executing') and len(record.args) == 2):
+            return
+        handle, seconds = record.args
+        match = _CORO_RE.search(handle)
+        if match:
+            where = location(match.group(2), int(match.group(3)), match.group(1))
+        else:
+            where = handle[:120]
+        self.diagnostics.slow_callbacks[where] += seconds
+        self.diagnostics.slow_callback_count += 1
+
+
+class Diagnostics:
+    """Loop stall, slow callback, per-step profile and allocation tracking for one run."""
+
+    def __init__(self, out_dir: str = DIAGNOSTICS_DIR, slow_callback: float = SLOW_CALLBACK_SECONDS,
+                 profile: bool = DIAGNOSTICS_PROFILE, trace_allocations: bool = DIAGNOSTICS_TRACE_ALLOCATIONS):
+        self.out_dir = out_dir
+        self.slow_callback = slow_callback
+        self.profile = profile
+        self.trace_allocations = trace_allocations
+        self.enabled = False
+        self.stall_detector = StallDetector()
+        self.slow_callbacks: Counter = Counter()  # location -> seconds
+        self.slow_callback_count = 0
+        self.profiles: Dict[str, pstats.Stats] = {}
+        self.allocations: Dict[str, Counter] = defaultdict(Counter)  # step -> location -> bytes
+        self._handler = _SlowCallbackHandler(self)
+        self._loop = None
+        self._loop_debug = False
+
+    def start(self, loop: Optional[asyncio.AbstractEventLoop] = None):
+        """
+        Turn diagnostics on for the running loop.
+
+        Args:
+            loop: Loop to watch; defaults to the running loop
+        """
+        if self.enabled:
+            return
+        loop = loop or asyncio.get_running_loop()
+        self._loop, self._loop_debug = loop, loop.get_debug()
+        loop.set_debug(True)
+        loop.slow_callback_duration = self.slow_callback
+        logging.getLogger('asyncio').addHandler(self._handler)
+        self.stall_detector.start(loop)
+        if self.trace_allocations and not tracemalloc.is_tracing():
+            tracemalloc.start(DIAGNOSTICS_TRACE_FRAMES)
+        self.enabled = True
+        log.info("🩺 Diagnostics on: slow callbacks, loop stalls%s%s",
+                 ', per-step profiles' if self.profile else '', ', allocations' if self.trace_allocations else '')
+
+    @contextlib.contextmanager
+    def step(self, name: str):
+        """Profile a step and record what it allocated; does nothing while diagnostics are off."""
+        if not self.enabled:
+            yield
+            return
+
+        profiler = cProfile.Profile() if self.profile else None
+        before = self._snapshot() if self.trace_allocations else None
+        if profiler:
+            profiler.enable()
+        try:
+            yield
+        finally:
+            if profiler:
+                profiler.disable()
+            # Our own bookkeeping blocks the loop too; keep it out of the stall report
+            with self.stall_detector.suspended():
+                if profiler and name in self.profiles:
+                    self.profiles[name].add(profiler)
+                elif profiler:
+                    self.profiles[name] = pstats.Stats(profiler)
+                if before is not None:
+                    for stat in tracemalloc.take_snapshot().compare_to(before, 'traceback'):
+                        site = self._allocation_site(stat.traceback) if stat.size_diff > 0 else None
+                        if site:
+                            self.allocations[name][site] += stat.size_diff
+
+    def _snapshot(self) -> tracemalloc.Snapshot:
+        with self.stall_detector.suspended():
+            return tracemalloc.take_snapshot()
+
+    @staticmethod
+    def _allocation_site(trace: tracemalloc.Traceback) -> Optional[str]:
+        # Frames run oldest to newest; charge the newest one in src/, skipping our own bookkeeping
+        for frame in reversed(trace):
+            if in_src(frame.filename):
+                return None if frame.filename == __file__ else location(frame.filename, frame.lineno)
+        return None
+
+    def stop(self) -> str:
+        """
+        Turn diagnostics off, save the profiles and the summary, and return the summary.
+
+        Returns:
+            str: Summary text, or an empty string if diagnostics were not on
+        """
+        if not self.enabled:
+            return ''
+        self.enabled = False
+        self.stall_detector.stop()
+        self._loop.set_debug(self._loop_debug)
+        logging.getLogger('asyncio').removeHandler(self._handler)
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+        summary = self.summary()
+        folder = os.path.join(self.out_dir, datetime.now().strftime('%Y%m%d-%H%M%S'))
+        try:
+            os.makedirs(folder, exist_ok=True)
+            for name, stats in self.profiles.items():
+                stats.dump_stats(os.path.join(folder, f"{re.sub(r'[^A-Za-z0-9_.-]+', '_', name)}.prof"))
+            with open(os.path.join(folder, "summary.txt"), 'w', encoding='utf-8') as f:
+                f.write(summary)
+            summary += f"\n📁 Profiles and summary saved to {folder}"
+        except OSError as e:
+            summary += f"\n⚠️ Could not save diagnostics: {e}"
+        return summary
+
+    def summary(self, limit: int = 10) -> str:
+        """Blocked time, slow callbacks, CPU time and allocations, attributed to src/ functions."""
+        detector = self.stall_detector
+        lines = [f"🩺 Diagnostics: {detector.stall_count} loop stalls over {detector.threshold:.2f}s, "
+                 f"{self.slow_callback_count} callbacks over {self.slow_callback:.2f}s"]
+
+        if detector.blocked:
+            lines.append("\nLoop blocked in (sampled; prompts waiting for input show up here too):")
+            lines.extend(f"  {seconds:8.2f}s  {where}" for where, seconds in detector.blocked.most_common(limit))
+        for seconds, where, stack in detector.stalls[:3]:
+            lines.append(f"\nStall of {seconds:.2f}s in {where}:\n{stack.rstrip()}")
+
+        if self.slow_callbacks:
+            lines.append("\nSlow callbacks (task suspended at):")
+            lines.extend(f"  {seconds:8.2f}s  {where}" for where, seconds in self.slow_callbacks.most_common(limit))
+
+        for name, stats in self.profiles.items():
+            own = sorted(
+                ((timing[3], key) for key, timing in stats.stats.items() if in_src(key[0])),
+                reverse=True
+            )[:5]
+            if own:
+                lines.append(f"\nCPU in step '{name}' (cumulative, src/ only):")
+                lines.extend(f"  {seconds:8.3f}s  {location(*key)}" for seconds, key in own)
+
+        for name, sites in self.allocations.items():
+            if sites:
+                lines.append(f"\nAllocated in step '{name}' (net, src/ only):")
+                lines.extend(f"  {size / 1024:8.1f}KiB  {where}" for where, size in sites.most_common(5))
+        return '\n'.join(lines)
+
+
+# Shared diagnostics; off until started
+diagnostics = Diagnostics()
@@ -0,0 +1,194 @@
+"""
+Flight recorder module for Playo booking automation.
+Keeps the last few hundred browser calls, console messages, page errors,
+network summaries and DOM snippets in a memory ring buffer, and writes them
+to disk with a screenshot, the DOM and optionally a trace only when a step
+fails. Successful runs pay for little more than appending tuples to a deque.
+"""
+
+import json
+import os
+import re
+import time
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Optional
+from config import (
+    FLIGHT_RECORDER_CAPACITY, FLIGHT_RECORDER_DIR, FLIGHT_RECORDER_TRACING, FLIGHT_RECORDER_SNIPPET_CHARS
+)
+from src.latency import round_trip_counter
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+# Protocol calls worth keeping; the rest (handles, evaluation plumbing) are noise
+_ACTION_RE = re.compile(
+    r"^(click|dblclick|tap|fill|press|type|check|uncheck|selectOption|hover|goto|reload|goBack|"
+    r"waitForSelector|waitForTimeout|setContent|screenshot|dispatchEvent|setInputFiles)$"
+)
+
+# Params recorded with an action; typed values are left out so OTPs and phone numbers never hit disk
+_ACTION_PARAMS = ('selector', 'url', 'key', 'timeout', 'state')
+
+# Resource types whose responses are summarised; images, fonts and scripts are skipped
+_NETWORK_TYPES = frozenset(('document', 'xhr', 'fetch'))
+
+_SNIPPET_JS = """
+(limit) => {
+    const el = document.activeElement;
+    const dialog = document.querySelector('[role="dialog"]');
+    return {
+        title: document.title,
+        active: el && el !== document.body ? el.outerHTML.slice(0, limit) : '',
+        dialog: dialog ? dialog.innerText.slice(0, limit) : '',
+    };
+}
+"""
+
+
+class FlightRecorder:
+    """Ring buffer of recent browser activity, dumped to disk when a step fails."""
+
+    def __init__(self, capacity: int = FLIGHT_RECORDER_CAPACITY, out_dir: str = FLIGHT_RECORDER_DIR,
+                 tracing: bool = FLIGHT_RECORDER_TRACING, snippet_chars: int = FLIGHT_RECORDER_SNIPPET_CHARS):
+        self.events: deque = deque(maxlen=capacity)  # (unix time, kind, text)
+        self.out_dir = out_dir
+        self.tracing = tracing
+        self.snippet_chars = snippet_chars
+        self.context = None
+        self.current_page: Optional[Callable[[], object]] = None
+        self.dumps = 0
+        self._tracing_started = False
+
+    async def attach(self, context, current_page: Optional[Callable[[], object]] = None):
+        """
+        Start recording a browser context: every current and future page, and
+        every action sent to the browser.
+
+        Args:
+            context: Playwright browser context
+            current_page: Returns the page the flow is on, used for dumps
+        """
+        self.context = context
+        self.current_page = current_page
+        context.on("page", self.watch_page)
+        for page in context.pages:
+            self.watch_page(page)
+
+        if self._on_call not in round_trip_counter.listeners:
+            round_trip_counter.listeners.append(self._on_call)
+        round_trip_counter.install()
+
+        if self.tracing and not self._tracing_started:
+            try:
+                await context.tracing.start(screenshots=True, snapshots=True)
+                await context.tracing.start_chunk()
+                self._tracing_started = True
+            except Exception as e:
+                log.warning("⚠️ Could not start tracing: %s", e)
+        log.info("✅ Flight recorder attached")
+
+    def watch_page(self, page):
+        """Record a page's console messages, errors, navigations and network summaries."""
+        page.on("console", lambda message: self._add('console', f"{message.type}: {message.text}"))
+        page.on("pageerror", lambda error: self._add('pageerror', str(error)))
+        page.on("framenavigated", lambda frame: frame.parent_frame is None and self._add('navigate', frame.url))
+        page.on("response", self._on_response)
+        page.on("requestfailed", self._on_request_failed)
+
+    def note(self, kind: str, text: str):
+        """Add an event of any kind, e.g. a step starting."""
+        self._add(kind, text)
+
+    def _add(self, kind: str, text: str):
+        self.events.append((time.time(), kind, text))
+
+    def _on_call(self, method: str, params: Optional[Dict]):
+        if not _ACTION_RE.match(method or ''):
+            return
+        details = ' '.join(f"{key}={params[key]}" for key in _ACTION_PARAMS if params and key in params)
+        self._add('action', f"{method} {details}".rstrip())
+
+    def _on_response(self, response):
+        request = response.request
+        if request.resource_type in _NETWORK_TYPES or response.status >= 400:
+            self._add('network', f"{response.status} {request.method} {response.url[:200]}")
+
+    def _on_request_failed(self, request):
+        self._add('network', f"failed {request.method} {request.url[:200]}: {request.failure}")
+
+    async def mark_step(self, name: str):
+        """
+        Note a step starting, with a DOM snippet of the focused element and any open dialog.
+
+        Costs one evaluation per step. With tracing on, the trace is
+        restarted so it only ever holds the current step.
+        """
+        self._add('step', name)
+        page = self.current_page() if self.current_page else None
+        if page is not None:
+            try:
+                snippet = await page.evaluate(_SNIPPET_JS, self.snippet_chars)
+                self._add('dom', json.dumps(snippet, ensure_ascii=False))
+            except Exception:
+                pass  # Page navigating or closed; the dump still has the rest
+
+        if self._tracing_started:
+            try:
+                await self.context.tracing.stop_chunk()
+                await self.context.tracing.start_chunk()
+            except Exception as e:
+                log.warning("⚠️ Could not restart trace chunk: %s", e)
+
+    async def dump(self, step: str, error: Optional[BaseException] = None) -> Optional[str]:
+        """
+        Write the ring buffer, a screenshot, the DOM and the trace for a failed step.
+
+        Args:
+            step: Name of the step that failed
+            error: Exception the step raised, if any
+
+        Returns:
+            str: Directory the dump was written to, or None if it could not be created
+        """
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        folder = os.path.join(self.out_dir, f"{stamp}-{re.sub(r'[^A-Za-z0-9_.-]+', '_', step)}")
+        try:
+            os.makedirs(folder, exist_ok=True)
+        except OSError as e:
+            log.warning("⚠️ Could not create flight recorder dump: %s", e)
+            return None
+
+        if error is not None:
+            self._add('error', f"{type(error).__name__}: {error}")
+        with open(os.path.join(folder, "events.jsonl"), 'w', encoding='utf-8') as f:
+            for stamp_s, kind, text in self.events:
+                f.write(json.dumps({'time': stamp_s, 'kind': kind, 'text': text}, ensure_ascii=False))
+                f.write('\n')
+
+        page = self.current_page() if self.current_page else None
+        if page is not None:
+            try:
+                await page.screenshot(path=os.path.join(folder, "screenshot.png"), full_page=True)
+            except Exception as e:
+                log.warning("⚠️ Could not save screenshot: %s", e)
+            try:
+                with open(os.path.join(folder, "dom.html"), 'w', encoding='utf-8') as f:
+                    f.write(await page.content())
+            except Exception as e:
+                log.warning("⚠️ Could not save DOM: %s", e)
+
+        if self._tracing_started:
+            try:
+                await self.context.tracing.stop_chunk(path=os.path.join(folder, "trace.zip"))
+                await self.context.tracing.start_chunk()
+            except Exception as e:
+                log.warning("⚠️ Could not save trace: %s", e)
+
+        self.dumps += 1
+        log.info("🛩️ Flight recorder dump for '%s' written to %s", step, folder)
+        return folder
+
+
+# Shared recorder; attach it to the browser context once
+flight_recorder = FlightRecorder()
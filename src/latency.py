@@ -0,0 +1,375 @@
+"""
+Latency history module for Playo booking automation.
+Records how long every step took across runs in a local SQLite store, along
+with its area, venue and browser round trips. Each step's timeout is derived
+from its observed p99 plus a margin, bounded by the limits in config.py, and
+reports split the history by day, area and venue and flag regressions.
+"""
+
+import asyncio
+import functools
+import os
+import sqlite3
+import time
+import uuid
+from collections import defaultdict
+from statistics import median
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from config import (
+    LATENCY_DB_PATH, LATENCY_WINDOW, ADAPTIVE_TIMEOUT_MIN_SAMPLES, ADAPTIVE_TIMEOUT_MARGIN,
+    ADAPTIVE_TIMEOUT_PAD, ADAPTIVE_TIMEOUT_MIN, ADAPTIVE_TIMEOUT_MAX, LATENCY_REPORT_DAYS,
+    TREND_RECENT_DAYS, TREND_BASELINE_DAYS, TREND_REGRESSION_THRESHOLD
+)
+from src.deadline import StepHistory, StepRecord
+from src.selector_cache import page_type_for
+
+SCHEMA_VERSION = 2
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS step_timings (
+    id INTEGER PRIMARY KEY,
+    run_id TEXT NOT NULL,
+    step TEXT NOT NULL,
+    page_type TEXT NOT NULL,
+    seconds REAL NOT NULL,
+    status TEXT NOT NULL,
+    recorded REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS step_timings_step ON step_timings (step, status, recorded);
+"""
+
+# Schema version -> statements upgrading the previous version to it
+_MIGRATIONS = {
+    2: """
+    ALTER TABLE step_timings ADD COLUMN area TEXT NOT NULL DEFAULT '';
+    ALTER TABLE step_timings ADD COLUMN venue TEXT NOT NULL DEFAULT '';
+    ALTER TABLE step_timings ADD COLUMN round_trips INTEGER NOT NULL DEFAULT 0;
+    CREATE INDEX IF NOT EXISTS step_timings_recorded ON step_timings (status, recorded);
+    """,
+}
+
+# Latest successful samples per step, newest first
+_RECENT_SQL = """
+SELECT step, page_type, seconds FROM (
+    SELECT step, page_type, seconds,
+           ROW_NUMBER() OVER (PARTITION BY step ORDER BY recorded DESC) AS n
+    FROM step_timings WHERE status = 'ok'
+) WHERE n <= ?
+"""
+
+_SPLITS = {
+    'step': "''",
+    'day': "date(recorded, 'unixepoch', 'localtime')",
+    'area': "area",
+    'venue': "venue",
+}
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    """
+    Nearest-rank percentile of sorted values.
+
+    Args:
+        values: Values sorted ascending, not empty
+        q: Percentile between 0 and 100
+
+    Returns:
+        float: The percentile
+    """
+    rank = max(1, -(-len(values) * q // 100))  # ceil without floats drifting
+    return values[min(int(rank), len(values)) - 1]
+
+
+def learned_timeout(samples: Sequence[float]) -> Optional[float]:
+    """
+    Timeout in seconds for a step from its successful durations.
+
+    Returns:
+        float: p99 times the margin plus padding, clamped to the config bounds,
+            or None with fewer than ADAPTIVE_TIMEOUT_MIN_SAMPLES samples
+    """
+    if len(samples) < ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+        return None
+    p99 = percentile(sorted(samples), 99)
+    return min(ADAPTIVE_TIMEOUT_MAX, max(ADAPTIVE_TIMEOUT_MIN, p99 * ADAPTIVE_TIMEOUT_MARGIN + ADAPTIVE_TIMEOUT_PAD))
+
+
+class RoundTripCounter:
+    """
+    Counts messages the Playwright client sends to the browser.
+
+    Wraps the send methods of Playwright's internal Channel class once. The
+    wrap is guarded: if those internals are missing or change shape, nothing
+    is patched and the count stays at zero. Listeners are called with the
+    protocol method and params of every message.
+    """
+
+    _METHODS = ('send', 'send_return_as_dict', 'send_no_reply')
+
+    def __init__(self):
+        self.count = 0
+        self.installed = False
+        self.listeners: List[Callable[[str, Optional[Dict]], None]] = []
+
+    def install(self) -> bool:
+        """
+        Start counting. Safe to call repeatedly.
+
+        Returns:
+            bool: True if the counter is active
+        """
+        if self.installed:
+            return True
+        try:
+            from playwright._impl._connection import Channel
+        except ImportError:
+            return False
+
+        for name in self._METHODS:
+            original = getattr(Channel, name, None)
+            if original is None or getattr(original, '_round_trip_counter', False):
+                continue
+            setattr(Channel, name, self._wrap(original))
+        self.installed = True
+        return True
+
+    def _notify(self, args: tuple, kwargs: Dict):
+        # Channel.send(self, method, params=None, ...)
+        method = args[1] if len(args) > 1 else kwargs.get('method', '')
+        params = args[2] if len(args) > 2 else kwargs.get('params')
+        for listener in self.listeners:
+            try:
+                listener(method, params)
+            except Exception:
+                pass  # A broken listener must never break the browser call
+
+    def _wrap(self, original):
+        counter = self
+        if asyncio.iscoroutinefunction(original):
+            @functools.wraps(original)
+            async def counted(*args, **kwargs):
+                counter.count += 1
+                if counter.listeners:
+                    counter._notify(args, kwargs)
+                return await original(*args, **kwargs)
+        else:
+            @functools.wraps(original)
+            def counted(*args, **kwargs):
+                counter.count += 1
+                if counter.listeners:
+                    counter._notify(args, kwargs)
+                return original(*args, **kwargs)
+        counted._round_trip_counter = True
+        return counted
+
+
+class LatencyHistory(StepHistory):
+    """SQLite store of step durations across runs, with timeouts learned from it."""
+
+    def __init__(self, path: str = LATENCY_DB_PATH, counter: Optional[RoundTripCounter] = None):
+        self.path = path
+        self.counter = counter
+        self.run_id = uuid.uuid4().hex[:12]
+        self.area = ''
+        self.venue = ''
+        self._conn: Optional[sqlite3.Connection] = None
+        self._timeouts: Optional[Dict[str, Optional[float]]] = None
+
+    def connect(self) -> sqlite3.Connection:
+        """Open the store, creating or upgrading it on first use."""
+        if self._conn is None:
+            conn = sqlite3.connect(self.path)
+            conn.executescript(_SCHEMA)
+            version = conn.execute("PRAGMA user_version").fetchone()[0] or 1
+            for target in range(version + 1, SCHEMA_VERSION + 1):
+                conn.executescript(_MIGRATIONS[target])
+                conn.execute(f"PRAGMA user_version = {target}")
+            self._conn = conn
+        return self._conn
+
+    def tag(self, area: Optional[str] = None, venue: Optional[str] = None):
+        """Set the area and venue recorded with the steps that follow."""
+        if area is not None:
+            self.area = area
+        if venue is not None:
+            self.venue = venue
+
+    def round_trips(self) -> int:
+        return self.counter.count if self.counter else 0
+
+    def record(self, record: StepRecord):
+        """Store one finished step."""
+        conn = self.connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO step_timings "
+                "(run_id, step, page_type, seconds, status, recorded, area, venue, round_trips) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (self.run_id, record.name, page_type_for(record.url) if record.url else '',
+                 record.elapsed, record.status, time.time(), self.area, self.venue, record.round_trips)
+            )
+
+    def timeout_for(self, step: str) -> Optional[float]:
+        """
+        Learned timeout for a step, in seconds.
+
+        Timeouts are computed once per run from the history as it was at
+        start, so a slow step in this run doesn't move its own limit.
+        """
+        if self._timeouts is None:
+            self._timeouts = {
+                name: learned_timeout(samples) for name, samples in self._recent_by_step().items()
+            }
+        return self._timeouts.get(step)
+
+    def _recent(self) -> List[Tuple[str, str, float]]:
+        """Latest LATENCY_WINDOW successful samples of every step."""
+        if not os.path.exists(self.path):
+            return []
+        return self.connect().execute(_RECENT_SQL, (LATENCY_WINDOW,)).fetchall()
+
+    def _recent_by_step(self) -> Dict[str, List[float]]:
+        by_step: Dict[str, List[float]] = defaultdict(list)
+        for step, _, seconds in self._recent():
+            by_step[step].append(seconds)
+        return by_step
+
+    def report(self, split: Optional[str] = None) -> str:
+        """
+        Printable latency report.
+
+        Args:
+            split: None for learned timeouts and the trend check; "step", "day",
+                "area" or "venue" for p50/p95/p99 per step split that way
+
+        Raises:
+            ValueError: If the split is unknown
+        """
+        if split is not None:
+            return self.percentiles(split)
+        if not os.path.exists(self.path):
+            return f"No step timings recorded yet in {self.path}"
+        return "\n\n".join((self.learned_report(), self.trend()))
+
+    def learned_report(self) -> str:
+        """Learned timeouts per step and per page type, as a printable table."""
+        rows = self._recent()
+        if not rows:
+            return f"No step timings recorded yet in {self.path}"
+
+        by_step: Dict[str, List[float]] = defaultdict(list)
+        by_page: Dict[str, List[float]] = defaultdict(list)
+        for step, page_type, seconds in rows:
+            by_step[step].append(seconds)
+            by_page[page_type or '-'].append(seconds)
+
+        lines = [f"📈 Learned timeouts from {self.path} (last {LATENCY_WINDOW} successful runs per step)"]
+        lines.extend(self._timeout_table("Step", by_step))
+        lines.append("")
+        lines.extend(self._timeout_table("Page type", by_page))
+        return "\n".join(lines)
+
+    def _timeout_table(self, title: str, groups: Dict[str, List[float]]) -> List[str]:
+        lines = [f"   {title:<36} {'n':>5} {'p50':>8} {'p99':>8} {'timeout':>8}"]
+        for name in sorted(groups):
+            samples = sorted(groups[name])
+            timeout = learned_timeout(samples)
+            lines.append(
+                f"   {name:<36} {len(samples):>5} {percentile(samples, 50):>7.2f}s {percentile(samples, 99):>7.2f}s "
+                f"{f'{timeout:.1f}s' if timeout is not None else '-':>8}"
+            )
+        return lines
+
+    def percentiles(self, split: str = 'step', days: int = LATENCY_REPORT_DAYS) -> str:
+        """
+        p50/p95/p99 and median round trips per step over the last days, split by day, area or venue.
+
+        Raises:
+            ValueError: If the split is unknown
+        """
+        if split not in _SPLITS:
+            raise ValueError(f"Unknown split '{split}', expected one of: {', '.join(_SPLITS)}")
+        if not os.path.exists(self.path):
+            return f"No step timings recorded yet in {self.path}"
+
+        # One indexed range scan, already ordered for grouping
+        rows = self.connect().execute(
+            f"SELECT step, {_SPLITS[split]} AS part, seconds, round_trips FROM step_timings "
+            f"WHERE status = 'ok' AND recorded >= ? ORDER BY step, part",
+            (time.time() - days * 86400,)
+        ).fetchall()
+        if not rows:
+            return f"No successful steps in the last {days} days"
+
+        groups: Dict[Tuple[str, str], Tuple[List[float], List[int]]] = defaultdict(lambda: ([], []))
+        for step, part, seconds, trips in rows:
+            durations, round_trips = groups[(step, part)]
+            durations.append(seconds)
+            round_trips.append(trips)
+
+        heading = f"{split.capitalize():<14} " if split != 'step' else ""
+        lines = [
+            f"📊 Step latency over the last {days} days" + (f" by {split}" if split != 'step' else ""),
+            f"   {'Step':<36} {heading}{'n':>5} {'p50':>8} {'p95':>8} {'p99':>8} {'trips':>6}",
+        ]
+        for (step, part), (durations, round_trips) in groups.items():
+            durations.sort()
+            label = f"{(part or '-')[:14]:<14} " if split != 'step' else ""
+            lines.append(
+                f"   {step:<36} {label}{len(durations):>5} {percentile(durations, 50):>7.2f}s "
+                f"{percentile(durations, 95):>7.2f}s {percentile(durations, 99):>7.2f}s {median(round_trips):>6.0f}"
+            )
+        return "\n".join(lines)
+
+    def trend(self) -> str:
+        """
+        Compare each step's last TREND_RECENT_DAYS against the TREND_BASELINE_DAYS before them.
+
+        A step regressed when its p50 grew by more than TREND_REGRESSION_THRESHOLD.
+        If its round trips grew too, our code is doing more work; otherwise the
+        site got slower.
+        """
+        now = time.time()
+        recent_start = now - TREND_RECENT_DAYS * 86400
+        baseline_start = recent_start - TREND_BASELINE_DAYS * 86400
+        rows = self.connect().execute(
+            "SELECT step, recorded >= ?, seconds, round_trips FROM step_timings "
+            "WHERE status = 'ok' AND recorded >= ?",
+            (recent_start, baseline_start)
+        ).fetchall()
+
+        # step -> (baseline, recent) -> (durations, round trips)
+        windows: Dict[str, Tuple[Tuple[List[float], List[int]], ...]] = defaultdict(lambda: (([], []), ([], [])))
+        for step, is_recent, seconds, trips in rows:
+            durations, round_trips = windows[step][int(is_recent)]
+            durations.append(seconds)
+            round_trips.append(trips)
+
+        lines = [f"📉 Trend: last {TREND_RECENT_DAYS} days against the {TREND_BASELINE_DAYS} days before"]
+        regressions = 0
+        for step in sorted(windows):
+            (base, base_trips), (recent, recent_trips) = windows[step]
+            if len(base) < ADAPTIVE_TIMEOUT_MIN_SAMPLES or len(recent) < ADAPTIVE_TIMEOUT_MIN_SAMPLES:
+                continue
+            before, after = median(base), median(recent)
+            if before <= 0 or after / before - 1 <= TREND_REGRESSION_THRESHOLD:
+                continue
+            regressions += 1
+            trips_before, trips_after = median(base_trips), median(recent_trips)
+            cause = ("more round trips, our code is doing more work" if trips_after > trips_before * 1.1
+                     else "same round trips, the site got slower")
+            lines.append(f"   ⚠️ {step}: p50 {before:.2f}s → {after:.2f}s ({after / before - 1:+.0%}), "
+                         f"trips {trips_before:.0f} → {trips_after:.0f}: {cause}")
+        if not regressions:
+            lines.append("   ✅ No step regressed")
+        return "\n".join(lines)
+
+    def close(self):
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# Shared counter and history for the current run
+round_trip_counter = RoundTripCounter()
+latency_history = LatencyHistory(counter=round_trip_counter)
@@ -0,0 +1,148 @@
+"""
+Logging module for Playo booking automation.
+Status messages go through the standard logging module under the "playo"
+logger. The console keeps the familiar one-line emoji format; a JSON lines
+copy with level, job and step fields is written by a background thread so
+file I/O never runs on the event loop. Per-click detail is logged at DEBUG
+and dropped before any formatting in fast mode.
+"""
+
+import atexit
+import json
+import logging
+import queue
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from typing import Optional
+from config import LOG_LEVEL, LOG_JSON_PATH, LOG_FAST_MODE
+
+ROOT_LOGGER = "playo"
+
+# Set per run and per step; tasks inherit them, so every record carries the right ones
+job_context: ContextVar[str] = ContextVar('log_job', default='')
+step_context: ContextVar[str] = ContextVar('log_step', default='')
+
+# LogRecord attributes that are not `extra` fields
+_RECORD_FIELDS = frozenset(vars(logging.LogRecord('', 0, '', 0, '', (), None))) | {
+    'message', 'asctime', 'job', 'step', 'traceback'
+}
+
+_listener: Optional[QueueListener] = None
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger for a module.
+
+    Args:
+        name: Module __name__, e.g. "src.booking"
+
+    Returns:
+        logging.Logger: "playo.booking"
+    """
+    return logging.getLogger(f"{ROOT_LOGGER}.{name.rsplit('.', 1)[-1]}")
+
+
+def start_job(job_id: Optional[str] = None) -> str:
+    """
+    Tag every record from here on (and from tasks started here) with a job id.
+
+    Args:
+        job_id: Id to use; a short random one by default
+
+    Returns:
+        str: The job id
+    """
+    job_id = job_id or uuid.uuid4().hex[:8]
+    job_context.set(job_id)
+    return job_id
+
+
+class _ContextFilter(logging.Filter):
+    """Stamps records with the job and step they were logged in."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.job = job_context.get()
+        record.step = step_context.get()
+        return True
+
+
+class _MessageFormatter(logging.Formatter):
+    """Renders only the message; keeps a traceback aside so it survives the queue as its own field."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        if record.exc_info:
+            record.traceback = self.formatException(record.exc_info)
+        return record.getMessage()
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, job, step, message and any `extra` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname.lower(),
+            'logger': record.name,
+            'job': getattr(record, 'job', ''),
+            'step': getattr(record, 'step', ''),
+            'message': record.getMessage().strip(),
+        }
+        entry.update((key, value) for key, value in vars(record).items() if key not in _RECORD_FIELDS)
+        if getattr(record, 'traceback', None):
+            entry['traceback'] = record.traceback
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(level: str = LOG_LEVEL, json_path: Optional[str] = LOG_JSON_PATH, fast: bool = LOG_FAST_MODE):
+    """
+    Send "playo" records to the console and, through a background writer, to a JSON lines file.
+
+    Args:
+        level: Console level name, e.g. "INFO" or "DEBUG"
+        json_path: JSON lines file; None writes only to the console
+        fast: Drop DEBUG (per-click) records at the logger, before they are built
+    """
+    global _listener
+    logger = logging.getLogger(ROOT_LOGGER)
+    if _listener or logger.handlers:
+        return
+
+    logger.setLevel(logging.INFO if fast else logging.DEBUG)
+    logger.propagate = False
+    context_filter = _ContextFilter()
+
+    console = logging.StreamHandler(sys.stdout)
+    console.setLevel(max(logging.getLevelName(level.upper()), logger.level))
+    console.setFormatter(logging.Formatter("%(message)s"))
+    console.addFilter(context_filter)
+    logger.addHandler(console)
+
+    if json_path:
+        try:
+            writer = logging.FileHandler(json_path, encoding='utf-8')
+        except OSError as e:
+            logger.warning("⚠️ Could not open log file %s: %s", json_path, e)
+            return
+        writer.setFormatter(JsonFormatter())
+        records: queue.SimpleQueue = queue.SimpleQueue()
+        handler = QueueHandler(records)
+        handler.setFormatter(_MessageFormatter())
+        handler.addFilter(context_filter)
+        logger.addHandler(handler)
+        _listener = QueueListener(records, writer)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flush queued records to the JSON lines file and stop the writer."""
+    global _listener
+    if _listener:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
@@ -0,0 +1,223 @@
+"""
+Fuzzy matching module for Playo booking automation.
+Provides a trigram index that ranks sport, venue, time slot and court names
+against free-text user input.
+"""
+
+import heapq
+import re
+import unicodedata
+from collections import Counter, OrderedDict
+from itertools import chain
+from typing import Dict, FrozenSet, List, Optional, Sequence, Tuple
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+# Score bands: exact > prefix > substring > all tokens > trigram similarity (0..1).
+# Within a band, trigram similarity breaks ties.
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+SUBSTRING_SCORE = 1.5
+TOKEN_SCORE = 1.2
+BAND_TIEBREAK = 0.1
+MIN_SIMILARITY = 0.3
+AMBIGUITY_MARGIN = 0.02
+CANDIDATE_POOL = 32
+PROBE_GRAMS = 6  # Only the rarest query trigrams are used to gather candidates
+MAX_PROBE_POSTINGS = 2048  # Cap on names gathered from those trigrams, so search cost stays flat as the list grows
+
+_TOKEN_RE = re.compile(r"[a-z]+|[0-9]+")
+_INDEX_CACHE_SIZE = 16
+_index_cache: "OrderedDict[Tuple[str, ...], MatchIndex]" = OrderedDict()
+
+
+def normalize(text: str) -> str:
+    """
+    Normalize text for matching: strip accents, lowercase, drop punctuation
+    and leading zeros in numbers ("06:00 AM" -> "6 00 am").
+
+    Args:
+        text: Text to normalize
+
+    Returns:
+        str: Space-separated normalized tokens
+    """
+    text = unicodedata.normalize('NFKD', text).encode('ascii', 'ignore').decode().lower()
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        if token.isdigit():
+            token = token.lstrip('0') or '0'
+        tokens.append(token)
+    return ' '.join(tokens)
+
+
+def _trigrams(normalized: str) -> FrozenSet[str]:
+    """Return the distinct trigrams of a normalized string, padded at the edges."""
+    padded = f" {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+class MatchIndex:
+    """Trigram index over a list of names, returning ranked matches."""
+
+    def __init__(self, names: Sequence[str]):
+        self.names = list(names)
+        self._normalized = [normalize(name) for name in self.names]
+        self._compact = [n.replace(' ', '') for n in self._normalized]
+        self._grams = [_trigrams(n) for n in self._normalized]
+        self._postings: Dict[str, List[int]] = {}
+
+        for idx, grams in enumerate(self._grams):
+            for gram in grams:
+                self._postings.setdefault(gram, []).append(idx)
+
+    @classmethod
+    def for_names(cls, names: Sequence[str]) -> "MatchIndex":
+        """
+        Return a cached index for a list of names, building it on first use.
+
+        Args:
+            names: Names to index
+
+        Returns:
+            MatchIndex: Index shared by every caller with the same list
+        """
+        key = tuple(names)
+        index = _index_cache.get(key)
+        if index is None:
+            index = cls(key)
+            _index_cache[key] = index
+            if len(_index_cache) > _INDEX_CACHE_SIZE:
+                _index_cache.popitem(last=False)
+        else:
+            _index_cache.move_to_end(key)
+        return index
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def search(self, query: str, limit: int = 5) -> List[Tuple[int, float]]:
+        """
+        Rank indexed names against a query.
+
+        Args:
+            query: Free-text user input
+            limit: Maximum number of results
+
+        Returns:
+            List[Tuple[int, float]]: (index, score) pairs, best first; ties keep list order
+        """
+        normalized = normalize(query)
+        if not normalized:
+            return []
+        compact = normalized.replace(' ', '')
+
+        if len(compact) < 3:
+            # Too short for trigrams; a substring scan over short names is cheap
+            candidates = [i for i, c in enumerate(self._compact) if compact in c]
+            grams = frozenset()
+        else:
+            grams = _trigrams(normalized)
+            postings = sorted(
+                (self._postings[g] for g in grams if g in self._postings), key=len
+            )[:PROBE_GRAMS]
+            hits = Counter(chain.from_iterable(self._capped(postings)))
+            candidates = [i for i, _ in hits.most_common(max(CANDIDATE_POOL, limit))]
+
+        query_tokens = normalized.split()
+        scored = []
+        for idx in candidates:
+            score = self._score(idx, normalized, compact, query_tokens, grams)
+            if score >= MIN_SIMILARITY:
+                scored.append((-score, idx))
+
+        return [(idx, -neg_score) for neg_score, idx in heapq.nsmallest(limit, scored)]
+
+    @staticmethod
+    def _capped(postings: List[List[int]]) -> List[List[int]]:
+        """
+        Keep the rarest posting lists until MAX_PROBE_POSTINGS names are gathered.
+
+        Args:
+            postings: Posting lists, rarest first
+
+        Returns:
+            List[List[int]]: Lists to count; the rarest is truncated if it alone exceeds the cap
+        """
+        kept, total = [], 0
+        for posting in postings:
+            if total + len(posting) > MAX_PROBE_POSTINGS:
+                break
+            kept.append(posting)
+            total += len(posting)
+        if not kept and postings:
+            kept.append(postings[0][:MAX_PROBE_POSTINGS])
+        return kept
+
+    def best(self, query: str) -> Tuple[Optional[int], List[Tuple[int, float]]]:
+        """
+        Return the unambiguous best match for a query.
+
+        Args:
+            query: Free-text user input
+
+        Returns:
+            Tuple: (index or None if there is no single best match, ranked matches)
+        """
+        ranked = self.search(query)
+        if not ranked:
+            return None, ranked
+        if len(ranked) == 1 or ranked[0][1] - ranked[1][1] > AMBIGUITY_MARGIN:
+            return ranked[0][0], ranked
+        return None, ranked
+
+    def _score(self, idx: int, normalized: str, compact: str,
+               query_tokens: List[str], grams: FrozenSet[str]) -> float:
+        """Score a single candidate against the query."""
+        name_normalized = self._normalized[idx]
+        if normalized == name_normalized:
+            return EXACT_SCORE
+
+        # Dice coefficient over trigram sets
+        if grams:
+            name_grams = self._grams[idx]
+            similarity = 2 * len(grams & name_grams) / (len(grams) + len(name_grams))
+        else:
+            similarity = len(compact) / len(self._compact[idx])
+
+        name_compact = self._compact[idx]
+        if name_compact.startswith(compact):
+            return PREFIX_SCORE + BAND_TIEBREAK * similarity
+        if compact in name_compact:
+            return SUBSTRING_SCORE + BAND_TIEBREAK * similarity
+        name_tokens = name_normalized.split()
+        if all(any(t.startswith(q) for t in name_tokens) for q in query_tokens):
+            return TOKEN_SCORE + BAND_TIEBREAK * similarity
+        return similarity
+
+
+def best_or_closest(index: MatchIndex, query: str, label: str) -> Optional[int]:
+    """
+    Return the best match for a query, falling back to the top-ranked one when
+    several names score alike.
+
+    Args:
+        index: Index to search
+        query: Free-text user input
+        label: What is being matched, for logging (e.g. "sport")
+
+    Returns:
+        int: Matched index, or None if nothing matched
+    """
+    best, ranked = index.best(query)
+    if best is not None:
+        return best
+    if not ranked:
+        return None
+
+    closest = ranked[0][0]
+    others = ', '.join(index.names[idx] for idx, _ in ranked[1:])
+    log.warning("⚠️ Several %ss match '%s'. Using closest: %s (also: %s)",
+                label, query, index.names[closest], others)
+    return closest
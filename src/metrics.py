@@ -0,0 +1,205 @@
+"""
+Metrics module for Playo booking automation.
+Serves Prometheus text-format metrics over HTTP from a background thread.
+Nothing is counted specially for it: every value is read at scrape time
+from counters the flow already keeps (step records, round trips, modal
+dismissals, retries, cache hits), so the hot path pays nothing.
+"""
+
+import os
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+from config import METRICS_HOST, METRICS_PORT, METRICS_LATENCY_BUCKETS
+from src.latency import round_trip_counter
+from src.popups import popup_guard
+from src.selector_cache import selector_resolver
+from src.utils import retry_stats, site_breaker
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+def _family(name: str, kind: str, help_text: str, samples: Iterable[Tuple[str, Dict[str, str], float]]) -> List[str]:
+    """HELP/TYPE header plus one line per (suffix, labels, value) sample."""
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}"]
+    lines.extend(f"{name}{suffix}{_labels(labels)} {value}" for suffix, labels, value in samples)
+    return lines
+
+
+def browser_rss_bytes() -> Optional[int]:
+    """
+    Summed resident memory of every process this one started (the Playwright driver and browser).
+
+    Returns:
+        int: Bytes, or None where /proc is not available
+    """
+    if not os.path.isdir('/proc/self'):
+        return None
+
+    parents: Dict[int, int] = {}
+    rss: Dict[int, int] = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat', 'r') as f:
+                fields = f.read().rsplit(')', 1)[1].split()
+        except (OSError, IndexError):
+            continue  # Process exited while scanning
+        parents[int(entry)] = int(fields[1])
+        rss[int(entry)] = int(fields[21])
+
+    children: Dict[int, List[int]] = {}
+    for pid, ppid in parents.items():
+        children.setdefault(ppid, []).append(pid)
+    total, stack = 0, list(children.get(os.getpid(), []))
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total * os.sysconf('SC_PAGE_SIZE')
+
+
+class Metrics:
+    """Collects the flow's counters into Prometheus metrics and serves them."""
+
+    def __init__(self, host: str = METRICS_HOST, port: int = METRICS_PORT,
+                 buckets: Tuple[float, ...] = METRICS_LATENCY_BUCKETS):
+        self.host = host
+        self.port = port
+        self.buckets = tuple(sorted(buckets))
+        self.jobs: Counter = Counter()  # outcome -> runs
+        self.deadline = None
+        self.context = None
+        self.venue_index = None
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    def track(self, deadline=None, context=None, venue_index=None):
+        """
+        Point the metrics at the current run's objects.
+
+        Args:
+            deadline: Deadline whose step records give step counts and latencies
+            context: Playwright browser context, for open pages
+            venue_index: VenueIndex, for catalogue hit rate
+        """
+        self.deadline = deadline or self.deadline
+        self.context = context or self.context
+        self.venue_index = venue_index or self.venue_index
+
+    def job_finished(self, outcome: str):
+        """Count a finished run, e.g. 'success', 'stopped', 'budget_exceeded' or 'error'."""
+        self.jobs[outcome] += 1
+
+    def collect(self) -> str:
+        """Render every metric in Prometheus text exposition format."""
+        lines = _family("playo_jobs_total", "counter", "Booking runs by outcome.",
+                        (('', {'outcome': outcome}, count) for outcome, count in dict(self.jobs).items()))
+
+        records = list(self.deadline.steps) if self.deadline else []
+        statuses = Counter((record.name, record.status) for record in records)
+        lines += _family("playo_steps_total", "counter", "Steps run, by step and status.",
+                         (('', {'step': step, 'status': status}, count) for (step, status), count in statuses.items()))
+        lines += _family("playo_step_duration_seconds", "histogram", "Step latency.",
+                         self._histogram(records))
+
+        lines += _family("playo_browser_round_trips_total", "counter", "Protocol calls sent to the browser.",
+                         [('', {}, round_trip_counter.count)])
+        lines += _family("playo_error_modals_dismissed_total", "counter", "Blocking overlays dismissed.",
+                         (('', {'overlay': key}, count) for key, count in dict(popup_guard.dismissed).items()))
+        lines += _family("playo_retries_total", "counter", "Retries, by step.",
+                         (('', {'step': step}, count) for step, count in dict(retry_stats).items()))
+        lines += _family("playo_circuit_breaker_trips_total", "counter", "Times the site circuit breaker opened.",
+                         [('', {}, site_breaker.trips)])
+
+        if self.context is not None:
+            lines += _family("playo_open_pages", "gauge", "Open browser tabs.", [('', {}, len(self.context.pages))])
+        rss = browser_rss_bytes()
+        if rss is not None:
+            lines += _family("playo_browser_rss_bytes", "gauge", "Summed resident memory of the driver and browser.",
+                             [('', {}, rss)])
+
+        lookups = [('selector_cache', selector_resolver.hits, selector_resolver.misses)]
+        if self.venue_index is not None:
+            lookups.append(('venue_catalogue', self.venue_index.hits, self.venue_index.misses))
+        lines += _family("playo_cache_lookups_total", "counter", "Cache lookups, by cache and result.", (
+            ('', {'cache': cache, 'result': result}, count)
+            for cache, hits, misses in lookups
+            for result, count in (('hit', hits), ('miss', misses))
+        ))
+        return '\n'.join(lines) + '\n'
+
+    def _histogram(self, records) -> List[Tuple[str, Dict[str, str], float]]:
+        by_step: Dict[str, List[float]] = {}
+        for record in records:
+            by_step.setdefault(record.name, []).append(record.elapsed)
+
+        samples = []
+        for step, durations in by_step.items():
+            for bound in self.buckets:
+                samples.append(('_bucket', {'step': step, 'le': f"{bound:g}"}, sum(d <= bound for d in durations)))
+            samples.append(('_bucket', {'step': step, 'le': '+Inf'}, len(durations)))
+            samples.append(('_sum', {'step': step}, sum(durations)))
+            samples.append(('_count', {'step': step}, len(durations)))
+        return samples
+
+    def start(self) -> bool:
+        """
+        Serve /metrics from a daemon thread.
+
+        Returns:
+            bool: True if the server is listening
+        """
+        if self._server:
+            return True
+
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = metrics.collect().encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Keep scrapes out of the console
+
+        try:
+            self._server = ThreadingHTTPServer((self.host, self.port), Handler)
+        except OSError as e:
+            log.warning("⚠️ Could not start metrics endpoint on %s:%s: %s", self.host, self.port, e)
+            return False
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, name="metrics", daemon=True).start()
+        log.info("📈 Metrics at http://%s:%s/metrics", self.host, self._server.server_port)
+        return True
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+# Shared metrics; start() it once per process
+metrics = Metrics()
@@ -0,0 +1,171 @@
+"""
+Domain models for Playo booking automation.
+Compact immutable records for sports, venues, time slots and courts. Live
+Playwright handles are kept apart in a HandleRegistry, so models can be
+cached, compared and written to JSON lines freely.
+"""
+
+import functools
+import json
+import sys
+from dataclasses import dataclass, fields
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Type, Union
+from src.utils import dispose_handles
+
+
+@functools.lru_cache(maxsize=None)
+def _field_names(cls: type) -> Tuple[str, ...]:
+    return tuple(f.name for f in fields(cls))
+
+
+def _intern_strings(model):
+    """Intern every string field; repeated names and labels then share one object."""
+    for name in _field_names(type(model)):
+        value = getattr(model, name)
+        if type(value) is str:
+            object.__setattr__(model, name, sys.intern(value))
+
+
+@dataclass(frozen=True, slots=True)
+class Sport:
+    """Sport card on the home page."""
+    name: str
+    index: int = -1  # Position among the sport cards
+
+    def __post_init__(self):
+        _intern_strings(self)
+
+
+@dataclass(frozen=True, slots=True)
+class Venue:
+    """Venue from a listing; name is the full "<Venue> - <Area>" label."""
+    name: str
+    venue: str = ''
+    location: str = ''
+    distance: str = ''
+    distance_km: Optional[float] = None
+    lat: Optional[float] = None
+    lng: Optional[float] = None
+    url: str = ''
+    id: str = ''
+    index: int = -1  # Position among the venue cards
+
+    def __post_init__(self):
+        _intern_strings(self)
+
+
+@dataclass(frozen=True, slots=True)
+class TimeSlot:
+    """Bookable start time. selector/index locate its option; None if it came from a payload."""
+    text: str
+    minutes: Optional[int] = None
+    selector: Optional[str] = None
+    index: Optional[int] = None
+    price_value: Optional[float] = None
+    length: Optional[int] = None  # Minutes the slot lasts, when the site reports it
+
+    def __post_init__(self):
+        _intern_strings(self)
+
+
+@dataclass(frozen=True, slots=True)
+class Court:
+    """Court offered for the selected slot."""
+    name: str
+    price: str = ''
+    price_value: Optional[float] = None
+    slot: str = ''
+    index: int = -1  # Position among the court options
+
+    def __post_init__(self):
+        _intern_strings(self)
+
+
+Model = Union[Sport, Venue, TimeSlot, Court]
+
+_KINDS: Dict[str, Type] = {'sport': Sport, 'venue': Venue, 'slot': TimeSlot, 'court': Court}
+_KIND_OF: Dict[Type, str] = {cls: kind for kind, cls in _KINDS.items()}
+
+
+class HandleRegistry:
+    """Maps models to the live ElementHandles or Locators used to click them."""
+
+    def __init__(self):
+        self._handles: Dict[Model, object] = {}
+
+    def register(self, model: Model, handle) -> Model:
+        """Remember the handle for a model and return the model."""
+        self._handles[model] = handle
+        return model
+
+    def get(self, model: Model):
+        """Handle for a model, or None if it has none."""
+        return self._handles.get(model)
+
+    def release(self, model: Model):
+        """Forget a model's handle and return it."""
+        return self._handles.pop(model, None)
+
+    def clear(self):
+        """Forget every handle."""
+        self._handles.clear()
+
+    async def dispose(self):
+        """Dispose any ElementHandles held and forget every handle; Locators need no disposal."""
+        handles = list(self._handles.values())
+        self._handles.clear()
+        await dispose_handles(handles)
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+
+def to_record(model: Model) -> Dict:
+    """Plain dict for a model, tagged with its kind."""
+    record = {'kind': _KIND_OF[type(model)]}
+    for name in _field_names(type(model)):
+        record[name] = getattr(model, name)
+    return record
+
+
+def from_record(record: Dict) -> Model:
+    """
+    Rebuild a model from a dict produced by to_record.
+
+    Raises:
+        ValueError: If the kind is unknown
+    """
+    cls = _KINDS.get(record.get('kind'))
+    if cls is None:
+        raise ValueError(f"Unknown model kind: {record.get('kind')!r}")
+    names = _field_names(cls)
+    return cls(**{key: value for key, value in record.items() if key in names})
+
+
+def dump_jsonl(models: Iterable[Model], path: str, append: bool = False) -> int:
+    """
+    Write models to a JSON lines file, one model per line.
+
+    Args:
+        models: Models to write; consumed lazily
+        path: Output file
+        append: Add to the file instead of replacing it
+
+    Returns:
+        int: Number of models written
+    """
+    count = 0
+    with open(path, 'a' if append else 'w', encoding='utf-8') as f:
+        for model in models:
+            f.write(json.dumps(to_record(model), ensure_ascii=False, separators=(',', ':')))
+            f.write('\n')
+            count += 1
+    return count
+
+
+def iter_jsonl(path: str) -> Iterator[Model]:
+    """Stream models from a JSON lines file without loading it whole."""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield from_record(json.loads(line))
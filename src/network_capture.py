@@ -0,0 +1,289 @@
+"""
+Network capture module for Playo booking automation.
+Listens to JSON responses on the browser context and decodes venue, slot and
+court payloads into models, so scraping steps can skip DOM extraction.
+"""
+
+import asyncio
+import re
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import urljoin
+from config import CAPTURE_URL_PATTERNS, CAPTURE_MAX_RECORDS
+from src.models import Court, TimeSlot, Venue
+from src.slots import format_minutes, parse_time_to_minutes
+from src.utils import parse_distance_km, parse_price
+
+
+# Key aliases seen across listing and availability payloads
+_VENUE_NAME_KEYS = ('venueName', 'venue_name', 'name', 'title')
+_VENUE_HINT_KEYS = ('lat', 'latitude', 'lng', 'longitude', 'distance', 'address', 'area', 'locality')
+_TIME_KEYS = ('slotTime', 'startTime', 'start_time', 'time', 'slot')
+_END_KEYS = ('endTime', 'end_time', 'slotEndTime')
+_LENGTH_KEYS = ('durationMinutes', 'duration_minutes', 'slotDuration')
+_COURT_NAME_KEYS = ('courtName', 'court_name', 'court')
+_PRICE_KEYS = ('price', 'amount', 'courtPrice', 'slotPrice')
+_AVAILABLE_KEYS = ('available', 'isAvailable', 'is_available', 'bookable')
+_MAX_DEPTH = 8
+_SITE_URL = "https://playo.co/"  # Relative venue paths in payloads resolve against it
+# Request headers worth replaying: body type and auth; cookies come from the context itself
+_REPLAY_HEADERS = re.compile(r'^(content-type|accept|authorization|x-[\w-]+)$', re.IGNORECASE)
+
+
+def _first(item: Dict, keys: Tuple[str, ...]) -> Any:
+    """Return the first present, non-empty value among alias keys."""
+    for key in keys:
+        value = item.get(key)
+        if value not in (None, ''):
+            return value
+    return None
+
+
+def _is_available(item: Dict) -> bool:
+    """Treat items without an availability flag as available."""
+    flag = _first(item, _AVAILABLE_KEYS)
+    if flag is None:
+        status = str(item.get('status', '')).lower()
+        return status not in ('booked', 'blocked', 'unavailable', 'closed')
+    return bool(flag)
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _time_label(value: Any) -> Optional[str]:
+    """Normalize a slot time (label, "HH:MM:SS" or epoch milliseconds) to "06:00 AM"."""
+    if isinstance(value, (int, float)) and value > 10 ** 9:
+        local = time.localtime(value / 1000 if value > 10 ** 11 else value)
+        return format_minutes(local.tm_hour * 60 + local.tm_min)
+    minutes = parse_time_to_minutes(str(value))
+    return format_minutes(minutes) if minutes is not None else None
+
+
+def _slot_length(item: Dict, label: str) -> Optional[int]:
+    """Minutes a payload slot lasts, from its end time or a duration in minutes."""
+    end = _first(item, _END_KEYS)
+    if end is not None:
+        end_label = _time_label(end)
+        if end_label:
+            return (parse_time_to_minutes(end_label) - parse_time_to_minutes(label)) % (24 * 60) or None
+    length = _to_float(_first(item, _LENGTH_KEYS))
+    return int(length) if length and length > 0 else None
+
+
+def _walk_dicts(payload: Any, depth: int = 0) -> Iterator[Dict]:
+    """Yield every dict nested in a JSON payload."""
+    if depth > _MAX_DEPTH:
+        return
+    if isinstance(payload, dict):
+        yield payload
+        for value in payload.values():
+            if isinstance(value, (dict, list)):
+                yield from _walk_dicts(value, depth + 1)
+    elif isinstance(payload, list):
+        for value in payload:
+            if isinstance(value, (dict, list)):
+                yield from _walk_dicts(value, depth + 1)
+
+
+def decode_payload(payload: Any) -> Dict[str, List]:
+    """
+    Decode a JSON payload into Venue, TimeSlot and Court models.
+
+    Args:
+        payload: Parsed JSON body
+
+    Returns:
+        Dict: {'venues': [...], 'slots': [...], 'courts': [...]}
+    """
+    records: Dict[str, List] = {'venues': [], 'slots': [], 'courts': []}
+    seen_slots = set()
+
+    for item in _walk_dicts(payload):
+        court_name = _first(item, _COURT_NAME_KEYS)
+        venue_name = _first(item, _VENUE_NAME_KEYS)
+        slot_time = _first(item, _TIME_KEYS)
+        price = _first(item, _PRICE_KEYS)
+
+        if isinstance(court_name, str):
+            if _is_available(item):
+                price_text = str(price) if price is not None else ''
+                slot_label = _time_label(slot_time) if slot_time is not None else None
+                records['courts'].append(Court(
+                    name=court_name, price=price_text, price_value=parse_price(price_text),
+                    slot=slot_label or '',
+                ))
+        elif isinstance(venue_name, str) and any(key in item for key in _VENUE_HINT_KEYS):
+            records['venues'].append(_decode_venue(item, venue_name, len(records['venues'])))
+        elif slot_time is not None:
+            label = _time_label(slot_time)
+            if label and label not in seen_slots and _is_available(item):
+                seen_slots.add(label)
+                records['slots'].append(TimeSlot(
+                    text=label, minutes=parse_time_to_minutes(label),
+                    price_value=parse_price(str(price)) if price is not None else None,
+                    length=_slot_length(item, label),
+                ))
+
+    records['slots'].sort(key=lambda slot: slot.minutes)
+    return records
+
+
+def is_availability_payload(payload: Any) -> bool:
+    """
+    True if a payload lists slots or courts, even if none of them is free.
+
+    Tells a fully booked date apart from a response that isn't availability at all.
+    """
+    return any(
+        isinstance(_first(item, _COURT_NAME_KEYS), str) or _first(item, _TIME_KEYS) is not None
+        for item in _walk_dicts(payload)
+    )
+
+
+def _venue_url(item: Dict) -> str:
+    """Absolute venue page URL from a listing item; empty for a bare slug, which isn't one."""
+    url = item.get('url')
+    if not isinstance(url, str):
+        return ''
+    if url.startswith(('http://', 'https://')):
+        return url
+    return urljoin(_SITE_URL, url) if url.startswith('/') else ''
+
+
+def _decode_venue(item: Dict, name: str, index: int) -> Venue:
+    """Build a Venue from a listing item."""
+    location = _first(item, ('area', 'locality', 'location', 'address'))
+    location = location if isinstance(location, str) else ''
+    distance = item.get('distance')
+    if isinstance(distance, (int, float)):
+        distance_km, distance_text = float(distance), f"{distance:.1f} km"
+    else:
+        distance_text = str(distance or '').replace('(', '').replace(')', '').strip()
+        distance_km = parse_distance_km(distance_text)
+
+    full_name = f"{name} - {location}" if location and ' - ' not in name else name
+    venue, _, area = full_name.rpartition(' - ')
+    return Venue(
+        id=str(_first(item, ('venueId', 'venue_id', 'id', 'slug')) or ''),
+        name=full_name,
+        venue=venue or full_name,
+        location=area if venue else '',
+        distance=distance_text,
+        distance_km=distance_km,
+        lat=_to_float(_first(item, ('lat', 'latitude'))),
+        lng=_to_float(_first(item, ('lng', 'lon', 'longitude'))),
+        url=_venue_url(item),
+        index=index,
+    )
+
+
+def _endpoint(request, url: str) -> Tuple[str, str, Optional[str], Dict[str, str]]:
+    """Method, URL, body and replayable headers of a captured request."""
+    headers = {name: value for name, value in request.headers.items() if _REPLAY_HEADERS.match(name)}
+    return request.method, url, request.post_data, headers
+
+
+class NetworkCapture:
+    """Collects decoded models from JSON responses, newest last."""
+
+    def __init__(self, url_patterns: List[str] = None, max_records: int = CAPTURE_MAX_RECORDS):
+        self.url_patterns = [re.compile(p) for p in (url_patterns or CAPTURE_URL_PATTERNS)]
+        # kind -> (sequence number, models) per payload
+        self.payloads: Dict[str, Deque[Tuple[int, List]]] = {
+            kind: deque(maxlen=max_records) for kind in ('venues', 'slots', 'courts')
+        }
+        # kind -> last (method, url, body, headers) that carried it, for replaying via the request API
+        self.endpoints: Dict[str, Tuple[str, str, Optional[str], Dict[str, str]]] = {}
+        self.seq = 0
+        self._attached = set()
+        self._arrived = asyncio.Event()
+
+    def attach(self, target):
+        """
+        Start listening on a page or browser context. Safe to call repeatedly.
+
+        Args:
+            target: Playwright page or browser context
+        """
+        if id(target) in self._attached:
+            return
+        self._attached.add(id(target))
+        target.on("response", self._on_response)
+
+    def mark(self) -> int:
+        """Sequence number to pass as `since` so only later payloads count."""
+        return self.seq
+
+    def latest(self, kind: str, since: int = 0) -> List:
+        """
+        Models from the newest payload of a kind captured after a mark.
+
+        Args:
+            kind: 'venues', 'slots' or 'courts'
+            since: Mark returned by mark()
+
+        Returns:
+            List: Models, empty if no matching payload was seen
+        """
+        payloads = self.payloads[kind]
+        if payloads and payloads[-1][0] > since:
+            return payloads[-1][1]
+        return []
+
+    async def wait_for(self, kind: str, since: int, timeout: float) -> List:
+        """
+        Wait until a payload of a kind arrives after a mark.
+
+        Args:
+            kind: 'venues', 'slots' or 'courts'
+            since: Mark returned by mark()
+            timeout: Seconds to wait
+
+        Returns:
+            List: Models, empty if nothing arrived in time
+        """
+        deadline = time.monotonic() + timeout
+        while not self.latest(kind, since):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return []
+            self._arrived.clear()
+            try:
+                await asyncio.wait_for(self._arrived.wait(), remaining)
+            except asyncio.TimeoutError:
+                return []
+        return self.latest(kind, since)
+
+    def _wanted(self, response) -> bool:
+        """Check a response is a JSON API call we know how to decode."""
+        if response.request.resource_type not in ('xhr', 'fetch'):
+            return False
+        if 'json' not in response.headers.get('content-type', ''):
+            return False
+        return any(p.search(response.url) for p in self.url_patterns)
+
+    async def _on_response(self, response):
+        """Decode a response into models; never raises into Playwright."""
+        try:
+            if not self._wanted(response):
+                return
+            records = decode_payload(await response.json())
+        except Exception:
+            return
+
+        for kind, items in records.items():
+            if items:
+                self.seq += 1
+                self.payloads[kind].append((self.seq, items))
+                self.endpoints[kind] = _endpoint(response.request, response.url)
+        self._arrived.set()
+
+
+# Shared capture layer; attach it to the browser context once per run
+network_capture = NetworkCapture()
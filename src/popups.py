@@ -0,0 +1,132 @@
+"""
+Popup handling module for Playo booking automation.
+Dismisses the "Something went wrong" modal and other blocking overlays in the
+background and lets the step that was interrupted retry straight away.
+"""
+
+import asyncio
+import weakref
+from typing import Awaitable, Callable, Dict, List
+from config import SELECTORS, BLOCKING_OVERLAYS
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+
+class StepInterrupted(Exception):
+    """Raised when a step kept being interrupted by blocking overlays."""
+
+
+class PopupGuard:
+    """Registers overlay handlers once per page and restarts interrupted steps."""
+
+    def __init__(self, overlay_keys: List[str] = None):
+        self.overlay_keys = overlay_keys or BLOCKING_OVERLAYS
+        self.dismissed: Dict[str, int] = {key: 0 for key in self.overlay_keys}
+        self._events: "weakref.WeakKeyDictionary" = weakref.WeakKeyDictionary()
+
+    async def install(self, page):
+        """
+        Register the background handlers for a page. Safe to call repeatedly.
+
+        Playwright runs these handlers whenever an overlay blocks an action,
+        so clicks and fills no longer time out behind the modal.
+
+        Args:
+            page: Playwright page object
+        """
+        if page in self._events:
+            return
+        self._events[page] = asyncio.Event()
+
+        for key in self.overlay_keys:
+            locator = page.locator(SELECTORS[key])
+            await page.add_locator_handler(locator, self._make_handler(page, key))
+        log.info("✅ Popup guard installed")
+
+    async def run(self, page, step: Callable[[], Awaitable], description: str, attempts: int = 3):
+        """
+        Run a step, restarting it as soon as a blocking overlay is dismissed.
+
+        Args:
+            page: Playwright page object the step works on
+            step: Zero-argument coroutine function performing the step
+            description: Step description for logging
+            attempts: Maximum number of runs
+
+        Returns:
+            Whatever the step returns
+
+        Raises:
+            StepInterrupted: If every attempt was interrupted by an overlay
+        """
+        await self.install(page)
+
+        for attempt in range(1, attempts + 1):
+            self._events[page].clear()
+            step_task = asyncio.ensure_future(step())
+            watch_task = asyncio.ensure_future(self._watch(page))
+
+            try:
+                done, _ = await asyncio.wait({step_task, watch_task}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                # Cancelling run (e.g. the deadline ran out) must reach the step too
+                if not step_task.done():
+                    step_task.cancel()
+                watch_task.cancel()
+            if step_task in done:
+                return step_task.result()
+
+            try:
+                await step_task
+            except (asyncio.CancelledError, Exception):
+                pass
+            log.warning("🔁 Overlay interrupted %s, retrying (%s/%s)...", description, attempt, attempts)
+
+        raise StepInterrupted(f"{description} was interrupted by overlays {attempts} times")
+
+    def _make_handler(self, page, key: str):
+        """Build the no-argument handler Playwright calls when an overlay shows up."""
+        async def handler():
+            await self._dismiss(page, key)
+        return handler
+
+    async def _dismiss(self, page, key: str):
+        """Click an overlay's dismiss button and notify the running step."""
+        try:
+            await page.locator(SELECTORS[key]).first.click(timeout=2000)
+            self.dismissed[key] += 1
+            log.warning("⚠️ Dismissed blocking overlay: %s", key)
+        except Exception as e:
+            log.error("❌ Could not dismiss overlay %s: %s", key, e)
+        finally:
+            event = self._events.get(page)
+            if event:
+                event.set()
+
+    async def _watch(self, page):
+        """
+        Return once an overlay has been dismissed. Covers waits such as
+        wait_for_selector, during which Playwright doesn't run the handlers.
+        """
+        event = self._events[page]
+        overlay = page.locator(", ".join(SELECTORS[key] for key in self.overlay_keys)).first
+        appeared = asyncio.ensure_future(overlay.wait_for(state="visible", timeout=0))
+        handled = asyncio.ensure_future(event.wait())
+        try:
+            done, _ = await asyncio.wait({appeared, handled}, return_when=asyncio.FIRST_COMPLETED)
+            if appeared in done and not event.is_set() and appeared.exception() is None:
+                for key in self.overlay_keys:
+                    if await page.locator(SELECTORS[key]).first.is_visible():
+                        await self._dismiss(page, key)
+                        break
+            if not event.is_set():
+                # Already dismissed by a background handler, or the wait failed
+                await handled
+        finally:
+            appeared.cancel()
+            handled.cancel()
+
+
+# Shared guard so each page gets its handlers registered once
+popup_guard = PopupGuard()
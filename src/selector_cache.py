@@ -0,0 +1,165 @@
+"""
+Selector cache module for Playo booking automation.
+Remembers which fallback selector matched for each page type so later runs
+try the known winner first instead of walking the whole candidate list.
+"""
+
+import json
+import os
+import re
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlparse
+from config import SELECTORS, SELECTOR_CACHE_PATH
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+# Selectors using Playwright-only syntax cannot be raced with document.querySelector
+_ENGINE_ONLY_RE = re.compile(r"(^\w+=)|>>|:(has-text|text|text-is|text-matches|visible|nth-match)\b")
+
+_RACE_JS = """
+(selectors) => {
+    for (let i = 0; i < selectors.length; i++) {
+        try {
+            if (document.querySelector(selectors[i])) return i;
+        } catch (e) {}
+    }
+    return -1;
+}
+"""
+
+
+def page_type_for(url: str) -> str:
+    """
+    Classify a page URL by its first path segment (e.g. "venues", "booking").
+
+    Args:
+        url: Page URL
+
+    Returns:
+        str: Page type, "home" for the site root
+    """
+    path = urlparse(url or '').path.strip('/')
+    return path.split('/')[0] if path else 'home'
+
+
+def is_engine_only(selector: str) -> bool:
+    """Return True if a selector relies on Playwright-only syntax."""
+    return bool(_ENGINE_ONLY_RE.search(selector))
+
+
+class SelectorResolver:
+    """Resolves fallback selector lists, caching the winning candidate per page type."""
+
+    def __init__(self, path: str = SELECTOR_CACHE_PATH):
+        self.path = path
+        # page type -> selector key -> winning selector
+        self.winners: Dict[str, Dict[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._loaded = False
+
+    def load(self):
+        """Load remembered winners from disk."""
+        self._loaded = True
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                self.winners = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("⚠️ Could not read selector cache: %s", e)
+
+    def save(self):
+        """Persist remembered winners to disk."""
+        try:
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(self.winners, f, indent=2)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            log.warning("⚠️ Could not save selector cache: %s", e)
+
+    async def locate(self, page, key: str) -> Tuple[Optional[str], object]:
+        """
+        Find a locator for a fallback selector list in SELECTORS.
+
+        Matching is checked with counts, so no ElementHandles are created;
+        use `.first` or `.nth()` on the returned locator.
+
+        Args:
+            page: Playwright page object
+            key: Key of a selector list in SELECTORS
+
+        Returns:
+            Tuple: (matching selector, Locator over all its matches), or (None, None)
+        """
+        if not self._loaded:
+            self.load()
+
+        candidates: List[str] = SELECTORS[key]
+        page_type = page_type_for(page.url)
+        known = self.winners.get(page_type, {}).get(key)
+
+        # Warm path: the remembered winner usually still matches
+        if known in candidates and await self._count(page, known):
+            self.hits += 1
+            return known, page.locator(known)
+
+        self.misses += 1
+        winner = await self._race(page, candidates, skip=known)
+        if winner is None:
+            return None, None
+
+        self._remember(page_type, key, known, winner)
+        return winner, page.locator(winner)
+
+    async def _race(self, page, candidates: List[str], skip: Optional[str] = None) -> Optional[str]:
+        """
+        Return the earliest matching candidate in list order.
+
+        All CSS candidates are tested in one evaluation; Playwright-only ones
+        go through the engine one by one, and only those listed ahead of the
+        CSS winner can beat it.
+        """
+        native = [s for s in candidates if s != skip and not is_engine_only(s)]
+        native_winner = None
+        if native:
+            try:
+                idx = await page.evaluate(_RACE_JS, native)
+                if idx >= 0:
+                    native_winner = native[idx]
+            except Exception as e:
+                log.warning("⚠️ Selector race failed: %s", e)
+
+        for selector in candidates:
+            if selector == native_winner:
+                return selector
+            if selector == skip or not is_engine_only(selector):
+                continue
+            if await self._count(page, selector):
+                return selector
+        return None
+
+    async def _count(self, page, selector: str) -> int:
+        """Count matches without creating handles, treating selector errors as a miss."""
+        try:
+            return await page.locator(selector).count()
+        except Exception:
+            return 0
+
+    def _remember(self, page_type: str, key: str, previous: Optional[str], winner: str):
+        """Record a new winner and report layout changes."""
+        if previous == winner:
+            return
+        if previous:
+            log.warning(
+                "⚠️ Selector '%s' on %s page switched from '%s' to '%s' — the site layout may have changed",
+                key, page_type, previous, winner
+            )
+        self.winners.setdefault(page_type, {})[key] = winner
+        self.save()
+
+
+# Shared resolver so every module benefits from the same cache
+selector_resolver = SelectorResolver()
@@ -0,0 +1,137 @@
+"""
+Selector registry module for Playo booking automation.
+Validates every entry in config.SELECTORS once at startup against the
+browser's selector engine, so hot loops never retry selectors that can't parse.
+"""
+
+import re
+from typing import Dict, List, Tuple
+from config import SELECTORS
+from src.selector_cache import is_engine_only
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+# jQuery-style text intents and their Playwright equivalents
+TEXT_INTENT_REWRITES: List[Tuple[re.Pattern, str]] = [
+    (re.compile(r':contains\((["\'][^"\']*["\'])\)'), r':text(\1)'),
+]
+
+_VALIDATE_JS = """
+(selectors) => selectors.map(selector => {
+    try {
+        document.querySelector(selector);
+        return null;
+    } catch (e) {
+        return String(e.message || e);
+    }
+})
+"""
+
+
+def rewrite_text_intents(selector: str) -> str:
+    """
+    Rewrite unsupported text-matching syntax into Playwright selector syntax.
+
+    Args:
+        selector: Selector string
+
+    Returns:
+        str: Selector the Playwright engine can parse
+    """
+    for pattern, replacement in TEXT_INTENT_REWRITES:
+        selector = pattern.sub(replacement, selector)
+    return selector
+
+
+class SelectorRegistry:
+    """Validates and prunes the shared SELECTORS mapping in place."""
+
+    def __init__(self, selectors: Dict = None):
+        self.selectors = SELECTORS if selectors is None else selectors
+        self.invalid: Dict[str, List[str]] = {}
+        self.rewritten: Dict[str, List[Tuple[str, str]]] = {}
+        self.validated = False
+
+    async def validate(self, page) -> bool:
+        """
+        Compile every selector once and drop or flag invalid entries.
+
+        Invalid entries in fallback lists are removed; an invalid single
+        selector is kept but flagged, since there is nothing to fall back to.
+
+        Args:
+            page: Playwright page object
+
+        Returns:
+            bool: True if every selector is valid after rewriting
+        """
+        if self.validated:
+            return not self.invalid
+
+        entries = []  # (key, rewritten selector)
+        for key, value in self.selectors.items():
+            candidates = value if isinstance(value, list) else [value]
+            rewritten = [rewrite_text_intents(s) for s in candidates]
+            changes = [(old, new) for old, new in zip(candidates, rewritten) if old != new]
+            if changes:
+                self.rewritten[key] = changes
+            entries.extend((key, s) for s in rewritten)
+
+        # Templated selectors are compiled with a sample value
+        errors = await self._compile(page, [s.format(i=1) for _, s in entries])
+
+        valid: Dict[str, List[str]] = {key: [] for key in self.selectors}
+        for (key, selector), error in zip(entries, errors):
+            if error:
+                self.invalid.setdefault(key, []).append(selector)
+            else:
+                valid[key].append(selector)
+
+        for key, value in self.selectors.items():
+            if isinstance(value, list):
+                value[:] = valid[key]
+            elif valid[key]:
+                self.selectors[key] = valid[key][0]
+
+        self.validated = True
+        self._report()
+        return not self.invalid
+
+    async def _compile(self, page, selectors: List[str]) -> List[str]:
+        """Return an error message (or empty string) per selector."""
+        errors = [''] * len(selectors)
+
+        # Plain CSS compiles in the browser in a single evaluation
+        native_idx = [i for i, s in enumerate(selectors) if not is_engine_only(s)]
+        if native_idx:
+            results = await page.evaluate(_VALIDATE_JS, [selectors[i] for i in native_idx])
+            for i, error in zip(native_idx, results):
+                errors[i] = error or ''
+
+        # Playwright-only syntax needs the engine itself
+        native = set(native_idx)
+        for i, selector in enumerate(selectors):
+            if i in native:
+                continue
+            try:
+                await page.locator(selector).count()  # Parses the selector without creating handles
+            except Exception as e:
+                errors[i] = str(e).splitlines()[0]
+        return errors
+
+    def _report(self):
+        """Print a summary of rewritten and invalid selectors."""
+        for key, changes in self.rewritten.items():
+            for old, new in changes:
+                log.info("🔧 Rewrote selector '%s': %s → %s", key, old, new)
+        for key, bad in self.invalid.items():
+            action = "Dropped" if isinstance(self.selectors[key], list) else "Flagged"
+            for selector in bad:
+                log.warning("⚠️ %s invalid selector '%s': %s", action, key, selector)
+        if not self.invalid:
+            log.info("✅ All selectors validated")
+
+
+# Shared registry, validated once per run
+selector_registry = SelectorRegistry()
@@ -0,0 +1,182 @@
+"""
+Time slot module for Playo booking automation.
+Parses slot labels into minutes since midnight and answers contiguous
+availability queries over a sorted slot index.
+"""
+
+import bisect
+import re
+from typing import Dict, List, Optional, Sequence, Tuple
+from config import SLOT_MINUTES
+
+_TIME_RE = re.compile(r"(\d{1,2})(?:[:.](\d{2}))?\s*([ap])?\.?\s*m?\.?", re.IGNORECASE)
+_RANGE_RE = re.compile(r"\s*(?:-|–|\bto\b)\s*", re.IGNORECASE)
+
+
+def parse_time_to_minutes(text: str) -> Optional[int]:
+    """
+    Parse the first time in a label such as "06:00 AM", "6pm", "18:30" or
+    "06:00 AM - 07:00 AM" into minutes since midnight.
+
+    Args:
+        text: Time label
+
+    Returns:
+        int: Minutes since midnight, or None if no time was found
+    """
+    match = _TIME_RE.search(text or '')
+    if not match:
+        return None
+
+    hours = int(match.group(1))
+    minutes = int(match.group(2) or 0)
+    meridiem = (match.group(3) or '').lower()
+    if meridiem:
+        if not 1 <= hours <= 12:
+            return None
+        hours = hours % 12 + (12 if meridiem == 'p' else 0)
+    if hours > 23 or minutes > 59:
+        return None
+    return hours * 60 + minutes
+
+
+def format_minutes(minutes: int) -> str:
+    """
+    Format minutes since midnight as a 12-hour label like "06:30 PM".
+
+    Args:
+        minutes: Minutes since midnight
+
+    Returns:
+        str: Formatted time
+    """
+    hours, mins = divmod(minutes % (24 * 60), 60)
+    return f"{hours % 12 or 12:02d}:{mins:02d} {'AM' if hours < 12 else 'PM'}"
+
+
+def parse_slot_minutes(text: str) -> Optional[int]:
+    """
+    Parse the length of a range label such as "06:00 AM - 07:00 AM".
+
+    Args:
+        text: Time label
+
+    Returns:
+        int: Minutes between the two times, or None if the label is not a range
+    """
+    parts = _RANGE_RE.split(text or '', maxsplit=1)
+    if len(parts) < 2:
+        return None
+    start, end = parse_time_to_minutes(parts[0]), parse_time_to_minutes(parts[1])
+    if start is None or end is None:
+        return None
+    return (end - start) % (24 * 60) or None
+
+
+class SlotIndex:
+    """Sorted index of available slot start times with contiguous-run lookup."""
+
+    def __init__(self, labels: List[str], lengths: Optional[Sequence[Optional[int]]] = None):
+        """
+        Args:
+            labels: Slot labels as listed on the page
+            lengths: Slot lengths in minutes reported by the site, aligned with labels;
+                a missing length is read from a range label, else SLOT_MINUTES
+        """
+        parsed = sorted(
+            (minutes, idx) for idx, minutes in
+            ((idx, parse_time_to_minutes(label)) for idx, label in enumerate(labels))
+            if minutes is not None
+        )
+        self.labels = list(labels)
+        self.starts = [minutes for minutes, _ in parsed]
+        self.positions = [idx for _, idx in parsed]
+        self._pos_of = {idx: pos for pos, idx in enumerate(self.positions)}
+        self.lengths = [
+            (lengths[idx] if lengths is not None else None)
+            or parse_slot_minutes(labels[idx]) or SLOT_MINUTES
+            for idx in self.positions
+        ]
+
+        # Contiguous runs of slots as (first start, end of last slot)
+        self.runs: List[Tuple[int, int]] = []
+        self._run_of: List[int] = []
+        for start, length in zip(self.starts, self.lengths):
+            if self.runs and start <= self.runs[-1][1]:
+                self.runs[-1] = (self.runs[-1][0], max(self.runs[-1][1], start + length))
+            else:
+                self.runs.append((start, start + length))
+            self._run_of.append(len(self.runs) - 1)
+
+        # duration -> (latest valid start per fitting run, fitting run ids)
+        self._fit_cache: Dict[int, Tuple[List[int], List[int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    def free_minutes(self, label_idx: int) -> int:
+        """
+        Contiguous free minutes from the start of a slot.
+
+        Args:
+            label_idx: Index into the original label list
+
+        Returns:
+            int: Free minutes, 0 if the label could not be parsed
+        """
+        pos = self._pos_of.get(label_idx)
+        if pos is None:
+            return 0
+        return self.runs[self._run_of[pos]][1] - self.starts[pos]
+
+    def earliest_fit(self, minutes: int, duration: int) -> Optional[int]:
+        """
+        Find the earliest slot starting at or after a time with enough contiguous room.
+
+        Args:
+            minutes: Earliest acceptable start, in minutes since midnight
+            duration: Required contiguous minutes
+
+        Returns:
+            int: Index into the original label list, or None if nothing fits
+        """
+        latest_starts, run_ids = self._fitting_runs(duration)
+        r = bisect.bisect_left(latest_starts, minutes)
+        while r < len(run_ids):
+            run_start, _ = self.runs[run_ids[r]]
+            pos = bisect.bisect_left(self.starts, max(minutes, run_start))
+            if pos < len(self.starts) and self.starts[pos] <= latest_starts[r]:
+                return self.positions[pos]
+            r += 1
+        return None
+
+    def nearest(self, minutes: int) -> Optional[int]:
+        """
+        Find the slot whose start is closest to a time (earlier slot wins ties).
+
+        Args:
+            minutes: Target time in minutes since midnight
+
+        Returns:
+            int: Index into the original label list, or None if the index is empty
+        """
+        if not self.starts:
+            return None
+        pos = bisect.bisect_left(self.starts, minutes)
+        if pos == len(self.starts):
+            return self.positions[-1]
+        if pos > 0 and minutes - self.starts[pos - 1] <= self.starts[pos] - minutes:
+            return self.positions[pos - 1]
+        return self.positions[pos]
+
+    def _fitting_runs(self, duration: int) -> Tuple[List[int], List[int]]:
+        """Runs long enough for a duration, keyed by their latest valid start."""
+        cached = self._fit_cache.get(duration)
+        if cached is None:
+            fitting = [
+                (end - duration, run_id) for run_id, (start, end) in enumerate(self.runs)
+                if end - start >= duration
+            ]
+            cached = ([latest for latest, _ in fitting], [run_id for _, run_id in fitting])
+            self._fit_cache[duration] = cached
+        return cached
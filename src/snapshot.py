@@ -0,0 +1,617 @@
+"""
+Snapshot module for Playo booking automation.
+Parses one `page.content()` snapshot with the standard library HTML parser and
+extracts sports, venues, calendar cells, time slots and courts in Python,
+using the selectors in config.SELECTORS. Works on saved HTML fixtures too.
+"""
+
+import asyncio
+import functools
+import re
+from concurrent.futures import ThreadPoolExecutor
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple, TypeVar, Union
+from config import SELECTORS, SNAPSHOT_WORKERS, CALENDAR_OUTSIDE_CLASSES
+from src.models import Court, Sport, TimeSlot, Venue
+from src.slots import parse_time_to_minutes
+from src.utils import parse_distance_km, parse_price
+
+T = TypeVar('T')
+
+_VOID_TAGS = frozenset((
+    'area', 'base', 'br', 'col', 'embed', 'hr', 'img', 'input', 'link', 'meta', 'param', 'source', 'track', 'wbr'
+))
+_SKIP_TEXT_TAGS = frozenset(('script', 'style', 'noscript', 'template'))
+_INLINE_TAGS = frozenset((
+    'a', 'abbr', 'b', 'bdi', 'code', 'em', 'i', 'label', 'mark', 'small', 'span', 'strong', 'sub', 'sup', 'u'
+))
+_WS_RE = re.compile(r"\s+")
+_NTH_RE = re.compile(r"^([+-]?\d*)n(?:\s*([+-])\s*(\d+))?$")
+
+
+class SelectorError(ValueError):
+    """Raised for selectors outside the supported CSS subset."""
+
+
+class Node:
+    """Element of a parsed snapshot."""
+
+    __slots__ = ('tag', 'attrs', 'parent', 'children', 'content', 'order', 'end', '_text')
+
+    def __init__(self, tag: str, attrs: Dict[str, str], parent: Optional['Node']):
+        self.tag = tag
+        self.attrs = attrs
+        self.parent = parent
+        self.children: List['Node'] = []
+        self.content: List[Union['Node', str]] = []  # Children and text, in order
+        self.order = -1  # Position in document order
+        self.end = -1  # Position of the last descendant
+        self._text: Optional[str] = None
+
+    def get(self, name: str, default: Optional[str] = None) -> Optional[str]:
+        return self.attrs.get(name, default)
+
+    def text(self) -> str:
+        """Whitespace-collapsed text, close to innerText.trim() for extraction purposes."""
+        if self._text is None:
+            parts = []
+            stack: List[Union[Node, str]] = [self]
+            while stack:
+                item = stack.pop()
+                if isinstance(item, str):
+                    parts.append(item)
+                elif item.tag not in _SKIP_TEXT_TAGS:
+                    block = item.tag not in _INLINE_TAGS
+                    if block:
+                        stack.append(' ')
+                    stack.extend(reversed(item.content))
+                    if block:
+                        stack.append(' ')
+            self._text = _WS_RE.sub(' ', ''.join(parts)).strip()
+        return self._text
+
+    def __repr__(self) -> str:
+        return f"<Node {self.tag} {self.attrs}>"
+
+
+def _iter_descendants(node: Node) -> Iterator[Node]:
+    stack = list(reversed(node.children))
+    while stack:
+        child = stack.pop()
+        yield child
+        stack.extend(reversed(child.children))
+
+
+class _TreeBuilder(HTMLParser):
+    """Builds a Node tree, closing unclosed elements the way serialized DOMs need."""
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.root = Node('#document', {}, None)
+        self.elements: List[Node] = []
+        self._stack = [self.root]
+
+    def handle_starttag(self, tag, attrs):
+        node = self._open(tag, attrs)
+        if tag in _VOID_TAGS:
+            node.end = node.order
+        else:
+            self._stack.append(node)
+
+    def handle_startendtag(self, tag, attrs):
+        node = self._open(tag, attrs)
+        node.end = node.order
+
+    def handle_endtag(self, tag):
+        for depth in range(len(self._stack) - 1, 0, -1):
+            if self._stack[depth].tag == tag:
+                while len(self._stack) > depth:
+                    self._stack.pop().end = len(self.elements) - 1
+                return
+
+    def handle_data(self, data):
+        self._stack[-1].content.append(data)
+
+    def close(self):
+        super().close()
+        while len(self._stack) > 1:
+            self._stack.pop().end = len(self.elements) - 1
+        self.root.end = len(self.elements) - 1
+
+    def _open(self, tag, attrs) -> Node:
+        parent = self._stack[-1]
+        node = Node(tag, {name: value or '' for name, value in reversed(attrs)}, parent)
+        node.order = len(self.elements)
+        self.elements.append(node)
+        parent.children.append(node)
+        parent.content.append(node)
+        return node
+
+
+# Compiled selectors: a list of complex selectors, each a list of
+# (combinator, compound) pairs read left to right; a compound is
+# (tag or None, predicates) or the scope marker used inside :has().
+_SCOPE = object()
+
+
+def _match_compound(node: Node, compound, scope: Optional[Node]) -> bool:
+    if compound is _SCOPE:
+        return node is scope
+    tag, predicates = compound
+    if node.parent is None or (tag is not None and node.tag != tag):
+        return False
+    return all(predicate(node) for predicate in predicates)
+
+
+def _match_complex(node: Node, parts, i: int, scope: Optional[Node] = None) -> bool:
+    combinator, compound = parts[i]
+    if not _match_compound(node, compound, scope):
+        return False
+    if i == 0:
+        return True
+    ancestor = node.parent
+    if combinator == '>':
+        return ancestor is not None and _match_complex(ancestor, parts, i - 1, scope)
+    while ancestor is not None:
+        if _match_complex(ancestor, parts, i - 1, scope):
+            return True
+        ancestor = ancestor.parent
+    return False
+
+
+def _matches(node: Node, selector_list) -> bool:
+    return any(_match_complex(node, parts, len(parts) - 1) for parts in selector_list)
+
+
+def _normalize_text(text: str) -> str:
+    return _WS_RE.sub(' ', text).strip().lower()
+
+
+def _text_predicate(needle: str, mode: str) -> Callable[[Node], bool]:
+    """Playwright-style text matching: 'has' (substring), 'smallest' (:text) or 'exact'."""
+    needle = _normalize_text(needle)
+
+    def contains(node: Node) -> bool:
+        return needle in node.text().lower()
+
+    if mode == 'has':
+        return contains
+    if mode == 'exact':
+        return lambda node: node.text().lower() == needle
+    return lambda node: contains(node) and not any(contains(child) for child in node.children)
+
+
+def _attr_predicate(name: str, op: Optional[str], value: str, ignore_case: bool) -> Callable[[Node], bool]:
+    if ignore_case:
+        value = value.lower()
+
+    def predicate(node: Node) -> bool:
+        actual = node.attrs.get(name)
+        if actual is None:
+            return False
+        if op is None:
+            return True
+        if ignore_case:
+            actual = actual.lower()
+        if op == '=':
+            return actual == value
+        if op == '~=':
+            return value in actual.split()
+        if op == '|=':
+            return actual == value or actual.startswith(value + '-')
+        if op == '^=':
+            return bool(value) and actual.startswith(value)
+        if op == '$=':
+            return bool(value) and actual.endswith(value)
+        return bool(value) and value in actual  # *=
+    return predicate
+
+
+def _nth_predicate(expr: str, of_type: bool, from_end: bool) -> Callable[[Node], bool]:
+    expr = expr.strip().lower().replace(' ', '')
+    if expr == 'odd':
+        a, b = 2, 1
+    elif expr == 'even':
+        a, b = 2, 0
+    elif expr.lstrip('+-').isdigit():
+        a, b = 0, int(expr)
+    else:
+        match = _NTH_RE.match(expr)
+        if not match:
+            raise SelectorError(f"Unsupported nth expression: {expr}")
+        coefficient = match.group(1)
+        a = -1 if coefficient == '-' else int(coefficient) if coefficient not in ('', '+') else 1
+        b = int(match.group(3) or 0) * (-1 if match.group(2) == '-' else 1)
+
+    def predicate(node: Node) -> bool:
+        siblings = node.parent.children
+        if of_type:
+            siblings = [sibling for sibling in siblings if sibling.tag == node.tag]
+        position = (len(siblings) - siblings.index(node)) if from_end else siblings.index(node) + 1
+        if a == 0:
+            return position == b
+        return (position - b) % a == 0 and (position - b) // a >= 0
+    return predicate
+
+
+class _SelectorParser:
+    """Recursive-descent parser for the CSS subset used in config.SELECTORS."""
+
+    def __init__(self, text: str):
+        self.text = text
+        self.pos = 0
+
+    def parse(self):
+        selector_list = self._list(relative=False)
+        if self.pos != len(self.text):
+            self._fail("unexpected input")
+        return selector_list
+
+    def _fail(self, reason: str):
+        raise SelectorError(f"{reason} at {self.pos} in {self.text!r}")
+
+    def _peek(self) -> str:
+        return self.text[self.pos] if self.pos < len(self.text) else ''
+
+    def _skip_ws(self) -> bool:
+        start = self.pos
+        while self._peek().isspace():
+            self.pos += 1
+        return self.pos > start
+
+    def _expect(self, char: str):
+        self._skip_ws()
+        if self._peek() != char:
+            self._fail(f"expected {char!r}")
+        self.pos += 1
+
+    def _list(self, relative: bool):
+        items = [self._complex(relative)]
+        while self._peek() == ',':
+            self.pos += 1
+            items.append(self._complex(relative))
+        return items
+
+    def _complex(self, relative: bool):
+        self._skip_ws()
+        parts = []
+        combinator = ' '
+        if relative:
+            parts.append((None, _SCOPE))
+            if self._peek() == '>':
+                self.pos += 1
+                combinator = '>'
+                self._skip_ws()
+
+        while True:
+            parts.append((combinator if parts else None, self._compound()))
+            had_space = self._skip_ws()
+            char = self._peek()
+            if char == '>':
+                self.pos += 1
+                self._skip_ws()
+                combinator = '>'
+            elif char in ('+', '~'):
+                self._fail("sibling combinators are not supported")
+            elif char in (',', ')', ''):
+                return parts
+            elif had_space:
+                combinator = ' '
+            else:
+                self._fail("unexpected character")
+
+    def _ident(self) -> str:
+        chars = []
+        while True:
+            char = self._peek()
+            if char == '\\':
+                escaped = re.match(r"\\([0-9a-fA-F]{1,6})\s?", self.text[self.pos:])
+                if escaped:
+                    chars.append(chr(int(escaped.group(1), 16)))
+                    self.pos += escaped.end()
+                else:
+                    chars.append(self.text[self.pos + 1:self.pos + 2])
+                    self.pos += 2
+            elif char and (char.isalnum() or char in '-_'):
+                chars.append(char)
+                self.pos += 1
+            else:
+                break
+        if not chars:
+            self._fail("expected identifier")
+        return ''.join(chars)
+
+    def _string_or_ident(self) -> str:
+        quote = self._peek()
+        if quote in ('"', "'"):
+            end = self.text.find(quote, self.pos + 1)
+            if end < 0:
+                self._fail("unterminated string")
+            value = self.text[self.pos + 1:end]
+            self.pos = end + 1
+            return value
+        return self._ident()
+
+    def _raw_argument(self) -> str:
+        """Argument of a pseudo-class, quoted or up to the closing parenthesis."""
+        self._skip_ws()
+        if self._peek() in ('"', "'"):
+            value = self._string_or_ident()
+        else:
+            end = self.text.find(')', self.pos)
+            if end < 0:
+                self._fail("unterminated argument")
+            value = self.text[self.pos:end].strip()
+            self.pos = end
+        self._expect(')')
+        return value
+
+    def _compound(self):
+        tag = None
+        predicates = []
+        char = self._peek()
+        if char == '*':
+            self.pos += 1
+        elif char.isalpha():
+            tag = self._ident().lower()
+        elif char not in ('.', '#', '[', ':'):
+            self._fail("expected selector")
+
+        while True:
+            char = self._peek()
+            if char == '.':
+                self.pos += 1
+                name = self._ident()
+                predicates.append(lambda node, name=name: name in node.attrs.get('class', '').split())
+            elif char == '#':
+                self.pos += 1
+                predicates.append(_attr_predicate('id', '=', self._ident(), False))
+            elif char == '[':
+                predicates.append(self._attribute())
+            elif char == ':':
+                predicates.append(self._pseudo())
+            else:
+                return tag, predicates
+
+    def _attribute(self):
+        self.pos += 1
+        self._skip_ws()
+        name = self._ident().lower()
+        self._skip_ws()
+        match = re.match(r"[~|^$*]?=", self.text[self.pos:])
+        if not match:
+            self._expect(']')
+            return _attr_predicate(name, None, '', False)
+        op = match.group(0)
+        self.pos += len(op)
+        self._skip_ws()
+        value = self._string_or_ident()
+        self._skip_ws()
+        ignore_case = False
+        if self._peek() in ('i', 'I'):
+            ignore_case = True
+            self.pos += 1
+        elif self._peek() in ('s', 'S'):
+            self.pos += 1
+        self._expect(']')
+        return _attr_predicate(name, op, value, ignore_case)
+
+    def _pseudo(self):
+        self.pos += 1
+        name = self._ident().lower()
+        simple = {
+            'first-child': ('1', False, False), 'last-child': ('1', False, True),
+            'first-of-type': ('1', True, False), 'last-of-type': ('1', True, True),
+        }
+        if name in simple:
+            return _nth_predicate(*simple[name])
+        if self._peek() != '(':
+            self._fail(f"unsupported pseudo-class :{name}")
+        self.pos += 1
+
+        if name in ('has', 'not'):
+            inner = self._list(relative=name == 'has')
+            self._expect(')')
+            if name == 'not':
+                return lambda node: not _matches(node, inner)
+            return lambda node: any(
+                _match_complex(descendant, parts, len(parts) - 1, node)
+                for descendant in _iter_descendants(node) for parts in inner
+            )
+        if name in ('has-text', 'text', 'text-is'):
+            mode = {'has-text': 'has', 'text': 'smallest', 'text-is': 'exact'}[name]
+            return _text_predicate(self._raw_argument(), mode)
+        if name in ('nth-child', 'nth-of-type', 'nth-last-child', 'nth-last-of-type'):
+            return _nth_predicate(self._raw_argument(), 'of-type' in name, 'last' in name)
+        self._fail(f"unsupported pseudo-class :{name}")
+
+
+@functools.lru_cache(maxsize=256)
+def compile_selector(selector: str):
+    """
+    Compile a selector from the supported subset: type, class, id and
+    attribute selectors, descendant and child combinators, comma lists,
+    :has(), :not(), structural pseudo-classes, Playwright's :has-text(),
+    :text() and :text-is(), and the `text=` engine.
+
+    Raises:
+        SelectorError: If the selector uses anything outside the subset
+    """
+    selector = selector.strip()
+    if selector.startswith('text='):
+        value = selector[5:].strip()
+        quoted = len(value) > 1 and value[0] == value[-1] and value[0] in ('"', "'")
+        predicate = _text_predicate(value[1:-1] if quoted else value, 'exact' if quoted else 'smallest')
+        return [[(None, (None, [predicate]))]]
+    return _SelectorParser(selector).parse()
+
+
+class Snapshot:
+    """Parsed page snapshot queried with the same selectors as the live page."""
+
+    def __init__(self, html: str):
+        builder = _TreeBuilder()
+        builder.feed(html)
+        builder.close()
+        self.root = builder.root
+        self.elements = builder.elements
+
+    @classmethod
+    def from_file(cls, path: str) -> 'Snapshot':
+        """Load a saved HTML fixture."""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(f.read())
+
+    def select(self, selector: str, scope: Optional[Node] = None) -> List[Node]:
+        """
+        Elements matching a selector, in document order (querySelectorAll).
+
+        Args:
+            selector: Selector from the supported subset
+            scope: Only return descendants of this element
+        """
+        compiled = compile_selector(selector)
+        base = scope or self.root
+        return [node for node in self.elements[base.order + 1:base.end + 1] if _matches(node, compiled)]
+
+    def select_one(self, selector: str, scope: Optional[Node] = None) -> Optional[Node]:
+        """First element matching a selector, or None."""
+        compiled = compile_selector(selector)
+        base = scope or self.root
+        for node in self.elements[base.order + 1:base.end + 1]:
+            if _matches(node, compiled):
+                return node
+        return None
+
+    def first_match(self, selectors: Sequence[str], scope: Optional[Node] = None) -> Tuple[Optional[str], List[Node]]:
+        """
+        Try candidate selectors in order, like the selector resolver does on the page.
+
+        Returns:
+            Tuple: (winning selector, matches), or (None, []) if none matched
+        """
+        for selector in selectors:
+            try:
+                nodes = self.select(selector, scope)
+            except SelectorError:
+                continue
+            if nodes:
+                return selector, nodes
+        return None, []
+
+
+def extract_sports(snapshot: Snapshot) -> List[Sport]:
+    """Sport cards, indexed among the sport cards inside the container."""
+    container = snapshot.select_one(SELECTORS["sports_container"])
+    if not container:
+        return []
+    sports = []
+    for idx, card in enumerate(snapshot.select(SELECTORS["sport_cards"], container)):
+        name_div = snapshot.select_one(SELECTORS["sport_name"], card)
+        sports.append(Sport(name_div.text() if name_div else f"Sport {idx+1}", idx))
+    return sports
+
+
+def extract_venues(snapshot: Snapshot) -> Tuple[Optional[str], List[Venue]]:
+    """
+    Venue cards as VenueFinder would scrape them.
+
+    Returns:
+        Tuple: (card selector that matched, venues indexed among its matches)
+    """
+    card_selector, cards = snapshot.first_match(SELECTORS["venue_cards"])
+    venues = []
+    for idx, card in enumerate(cards):
+        name = ''
+        for name_selector in SELECTORS["venue_name_selectors"]:
+            name_el = snapshot.select_one(name_selector, card)
+            if name_el:
+                name = name_el.text()
+                if name and len(name) > 3:
+                    break
+
+        distance = ''
+        for dist_selector in SELECTORS["venue_distance_selectors"]:
+            for dist_el in snapshot.select(dist_selector, card):
+                if 'km' in dist_el.text():
+                    distance = dist_el.text().replace('(', '').replace(')', '').strip()
+                    break
+            if distance:
+                break
+
+        venue, _, location = name.rpartition(' - ') if ' - ' in name else (name, '', '')
+        venues.append(Venue(
+            name=name,
+            venue=venue,
+            location=location,
+            distance=distance,
+            distance_km=parse_distance_km(distance),
+            index=idx,
+        ))
+    return card_selector, venues
+
+
+def extract_calendar(snapshot: Snapshot) -> Optional[Dict]:
+    """Calendar header text and day cells, in the shape CalendarResolver reads in-page."""
+    panel = snapshot.select_one(SELECTORS["calendar_popover"])
+    if not panel:
+        return None
+    cells = [
+        {
+            'text': cell.text(),
+            'label': cell.get('aria-label') or cell.get('data-date') or cell.get('datetime') or '',
+            'outside': bool(re.search(CALENDAR_OUTSIDE_CLASSES, cell.get('class') or ''))
+            or cell.get('aria-disabled') == 'true',
+        }
+        for cell in snapshot.select(SELECTORS["calendar_days"])
+    ]
+    return {'header': panel.text()[:300], 'cells': cells}
+
+
+def extract_time_slots(snapshot: Snapshot) -> List[TimeSlot]:
+    """Time slots with their option references, new structure first."""
+    for selector in (SELECTORS["time_slots_new"], SELECTORS["time_slots_old"]):
+        options = snapshot.select(selector)
+        if options:
+            return [
+                TimeSlot(option.text(), parse_time_to_minutes(option.text()), selector, idx)
+                for idx, option in enumerate(options) if option.text()
+            ]
+    return []
+
+
+def extract_courts(snapshot: Snapshot) -> List[Court]:
+    """Court options, indexed among SELECTORS["court_options"] matches."""
+    courts = []
+    for idx, option in enumerate(snapshot.select(SELECTORS["court_options"])):
+        spans = snapshot.select('span', option)
+        name = spans[0].text() if spans else ''
+        price = spans[1].text() if len(spans) > 1 else ''
+        courts.append(Court(name, price, parse_price(price), index=idx))
+    return courts
+
+
+class SnapshotExtractor:
+    """Takes one page snapshot and runs an extractor over it on a thread pool."""
+
+    def __init__(self, max_workers: int = SNAPSHOT_WORKERS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="snapshot")
+
+    async def run(self, page, extract: Callable[[Snapshot], T]) -> T:
+        """
+        Snapshot a page with a single round trip and extract from it off the event loop.
+
+        Args:
+            page: Playwright page object
+            extract: Function taking a Snapshot, e.g. extract_venues
+
+        Returns:
+            Whatever the extractor returns
+        """
+        html = await page.content()
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: extract(Snapshot(html)))
+
+
+# Shared extractor so every scrape reuses the same worker threads
+snapshot_extractor = SnapshotExtractor()
@@ -4,7 +4,39 @@ Contains browser setup, mouse cursor injection, and other helper functions.
 """
 
 import asyncio
-from typing import Dict
+import math
+import random
+import re
+import time
+from collections import Counter
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Sequence, TypeVar
+from config import RETRY_DEFAULT, RETRY_POLICIES, CIRCUIT_FAILURE_THRESHOLD, CIRCUIT_RESET_SECONDS
+from src.deadline import budget_timeout, current_deadline
+from src.popups import StepInterrupted
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+T = TypeVar('T')
+
+# Finds the nearest clickable ancestor of an element in-page. Other scripts
+# can embed it as `const findClickable = ${FIND_CLICKABLE_JS};`.
+FIND_CLICKABLE_JS = """
+(el, {maxDepth = 5, tags = ['button', 'a'], classes = ['cursor-pointer'], roles = ['button', 'option'], includeSelf = false} = {}) => {
+    let node = includeSelf ? el : el.parentElement;
+    for (let depth = 0; node && depth < maxDepth + (includeSelf ? 1 : 0); depth++) {
+        const className = typeof node.className === 'string' ? node.className : (node.getAttribute('class') || '');
+        if (tags.includes(node.tagName.toLowerCase())
+            || roles.includes(node.getAttribute('role'))
+            || classes.some(c => className.includes(c))) {
+            return node;
+        }
+        node = node.parentElement;
+    }
+    return null;
+}
+"""
 
 
 async def setup_browser_context(playwright, user_data_dir: str, geolocation: Dict):
@@ -26,8 +58,8 @@ async def setup_browser_context(playwright, user_data_dir: str, geolocation: Dic
         permissions=["geolocation"]
     )
     
-    print(f"✅ Browser context created with user data dir: {user_data_dir}")
-    print(f"✅ Geolocation set to: {geolocation}")
+    log.info("✅ Browser context created with user data dir: %s", user_data_dir)
+    log.info("✅ Geolocation set to: %s", geolocation)
     
     return context
 
@@ -70,7 +102,7 @@ async def add_mouse_cursor(page):
   }, true);
 })();
 """)
-    print("✅ Mouse cursor injected for visual debugging")
+    log.info("✅ Mouse cursor injected for visual debugging")
 
 
 async def safe_click(page, element, description: str = "element", timeout: int = 5000):
@@ -89,7 +121,7 @@ async def safe_click(page, element, description: str = "element", timeout: int =
     try:
         box = await element.bounding_box()
         if not box:
-            print(f"❌ Could not get bounding box for {description}")
+            log.error("❌ Could not get bounding box for %s", description)
             return False
         
         # Move mouse to element center
@@ -100,26 +132,114 @@ async def safe_click(page, element, description: str = "element", timeout: int =
         
         # Try element click first
         try:
-            await element.click(force=True, timeout=timeout)
-            print(f"✅ Clicked {description} with element.click")
+            await element.click(force=True, timeout=budget_timeout(timeout))
+            log.debug("✅ Clicked %s with element.click", description)
             return True
         except Exception as e:
-            print(f"⚠️ Element click failed for {description}: {e}")
+            log.debug("⚠️ Element click failed for %s: %s", description, e)
             
             # Fallback to mouse click
             try:
                 await page.mouse.click(center_x, center_y)
-                print(f"✅ Clicked {description} with mouse.click")
+                log.debug("✅ Clicked %s with mouse.click", description)
                 return True
             except Exception as e2:
-                print(f"❌ Mouse click also failed for {description}: {e2}")
+                log.error("❌ Mouse click also failed for %s: %s", description, e2)
                 return False
                 
     except Exception as e:
-        print(f"❌ Error during safe_click for {description}: {e}")
+        log.error("❌ Error during safe_click for %s: %s", description, e)
         return False
 
 
+async def resolve_clickable_ancestor(element, max_depth: int = 5,
+                                     tags: Sequence[str] = ('button', 'a'),
+                                     class_substrings: Sequence[str] = ('cursor-pointer',),
+                                     roles: Sequence[str] = ('button', 'option'),
+                                     include_self: bool = False):
+    """
+    Resolve the nearest clickable ancestor of an element in a single in-page call.
+    
+    Args:
+        element: ElementHandle to start from
+        max_depth: Maximum number of parents to climb
+        tags: Tag names treated as clickable
+        class_substrings: Class substrings treated as clickable
+        roles: ARIA roles treated as clickable
+        include_self: Also test the element itself
+        
+    Returns:
+        ElementHandle: The clickable ancestor, or the element itself if none matched.
+        The caller owns the returned handle and should dispose it (see HandleScope).
+    """
+    handle = await element.evaluate_handle(FIND_CLICKABLE_JS, {
+        'maxDepth': max_depth,
+        'tags': list(tags),
+        'classes': list(class_substrings),
+        'roles': list(roles),
+        'includeSelf': include_self,
+    })
+    ancestor = handle.as_element()
+    if ancestor is None:
+        await handle.dispose()
+        return element
+    return ancestor
+
+
+async def dispose_handles(*handles):
+    """
+    Dispose ElementHandles and JSHandles, releasing their renderer-side objects.
+    
+    None, Locators and already-detached handles are skipped; lists are flattened.
+    """
+    for handle in handles:
+        if handle is None:
+            continue
+        if isinstance(handle, (list, tuple)):
+            await dispose_handles(*handle)
+            continue
+        dispose = getattr(handle, 'dispose', None)
+        if dispose is None:
+            continue
+        try:
+            await dispose()
+        except Exception:
+            pass  # Page closed or handle already gone
+
+
+class HandleScope:
+    """
+    Tracks the handles a step creates and disposes them all when the step ends.
+    
+    Usage:
+        async with HandleScope() as scope:
+            span = scope.track(await page.query_selector(...))
+    """
+    
+    disposed = 0  # Handles disposed by every scope, for soak reporting
+    
+    def __init__(self):
+        self._handles: List = []
+    
+    def track(self, handle):
+        """Register a handle (or list of handles) and return it unchanged."""
+        if handle is not None:
+            self._handles.append(handle)
+        return handle
+    
+    async def dispose(self):
+        """Dispose every tracked handle."""
+        handles, self._handles = self._handles, []
+        await dispose_handles(handles)
+        HandleScope.disposed += sum(len(h) if isinstance(h, (list, tuple)) else 1 for h in handles)
+    
+    async def __aenter__(self):
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.dispose()
+
+
 async def wait_and_click(page, selector: str, description: str = "", timeout: int = 10000):
     """
     Wait for selector and perform safe click.
@@ -134,15 +254,11 @@ async def wait_and_click(page, selector: str, description: str = "", timeout: in
         bool: True if successful, False otherwise
     """
     try:
-        await page.wait_for_selector(selector, timeout=timeout)
-        element = await page.query_selector(selector)
-        if element:
-            return await safe_click(page, element, description or selector, timeout)
-        else:
-            print(f"❌ Element not found: {selector}")
-            return False
+        element = page.locator(selector).first
+        await element.wait_for(timeout=budget_timeout(timeout))
+        return await safe_click(page, element, description or selector, timeout)
     except Exception as e:
-        print(f"❌ Error in wait_and_click for {selector}: {e}")
+        log.error("❌ Error in wait_and_click for %s: %s", selector, e)
         return False
 
 
@@ -160,12 +276,12 @@ async def safe_fill(page, selector: str, value: str, description: str = ""):
         bool: True if successful, False otherwise
     """
     try:
-        await page.wait_for_selector(selector, timeout=10000)
+        await page.wait_for_selector(selector, timeout=budget_timeout(10000))
         await page.fill(selector, value)
-        print(f"✅ Filled {description or selector} with: {value}")
+        log.debug("✅ Filled %s", description or selector)  # Never log the value: phone numbers and OTPs
         return True
     except Exception as e:
-        print(f"❌ Error filling {description or selector}: {e}")
+        log.error("❌ Error filling %s: %s", description or selector, e)
         return False
 
 
@@ -192,6 +308,64 @@ def format_time_duration(hours: float) -> str:
             return f"{whole_hours} hour{'s' if whole_hours != 1 else ''} {minutes} minutes"
 
 
+def parse_distance_km(distance_text: str) -> Optional[float]:
+    """
+    Parse a venue distance label such as "(2.3 km)", "2.3 kms" or "850 m" into kilometres.
+    
+    Args:
+        distance_text: Raw distance text scraped from a venue card
+        
+    Returns:
+        float: Distance in kilometres, or None if no distance could be parsed
+    """
+    if not distance_text:
+        return None
+    
+    match = re.search(r"(\d+(?:[.,]\d+)?)\s*(km|m)s?\b", distance_text.lower())
+    if not match:
+        return None
+    
+    value = float(match.group(1).replace(',', '.'))
+    return value if match.group(2) == 'km' else value / 1000
+
+
+def parse_price(price_text: str) -> Optional[float]:
+    """
+    Parse a price label such as "INR 1,200" or "₹ 450.50" into a number.
+    
+    Args:
+        price_text: Raw price text scraped from the page
+        
+    Returns:
+        float: Price, or None if no amount could be parsed
+    """
+    if not price_text:
+        return None
+    
+    match = re.search(r"\d[\d,]*(?:\.\d+)?", price_text)
+    if not match:
+        return None
+    return float(match.group(0).replace(',', ''))
+
+
+def haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """
+    Great-circle distance between two coordinates.
+    
+    Args:
+        lat1, lon1: First coordinate in degrees
+        lat2, lon2: Second coordinate in degrees
+        
+    Returns:
+        float: Distance in kilometres
+    """
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = math.radians(lat2 - lat1)
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * 6371.0088 * math.asin(math.sqrt(a))
+
+
 def validate_date_format(date_string: str) -> bool:
     """
     Validate if date string is in YYYY-MM-DD format.
@@ -239,9 +413,9 @@ async def scroll_element_into_view(page, element, description: str = "element"):
     """
     try:
         await element.scroll_into_view_if_needed()
-        print(f"✅ Scrolled {description} into view")
+        log.debug("✅ Scrolled %s into view", description)
     except Exception as e:
-        print(f"⚠️ Could not scroll {description} into view: {e}")
+        log.warning("⚠️ Could not scroll %s into view: %s", description, e)
 
 
 async def debug_element_info(element, description: str = "element"):
@@ -258,14 +432,13 @@ async def debug_element_info(element, description: str = "element"):
         id_attr = await element.get_attribute('id') or 'none'
         text_content = (await element.inner_text())[:50] if await element.inner_text() else 'none'
         
-        print(f"🔍 Debug {description}:")
-        print(f"   Tag: {tag_name}")
-        print(f"   Classes: {classes}")
-        print(f"   ID: {id_attr}")
-        print(f"   Text: {text_content}...")
+        log.debug(
+            "🔍 Debug %s:\n   Tag: %s\n   Classes: %s\n   ID: %s\n   Text: %s...",
+            description, tag_name, classes, id_attr, text_content
+        )
         
     except Exception as e:
-        print(f"❌ Error debugging {description}: {e}")
+        log.error("❌ Error debugging %s: %s", description, e)
 
 
 def print_banner(text: str, char: str = "="):
@@ -300,14 +473,195 @@ async def handle_potential_modal(page, modal_selector: str, button_selector: str
         bool: True if modal was handled, False if no modal found
     """
     try:
-        modal = await page.query_selector(modal_selector)
-        if modal and await modal.is_visible():
-            button = await page.query_selector(button_selector)
-            if button:
+        if await page.locator(modal_selector).first.is_visible():
+            button = page.locator(button_selector).first
+            if await button.count():
                 await button.click()
-                print(f"✅ Handled {description} modal")
+                log.debug("✅ Handled %s modal", description)
                 return True
         return False
     except Exception as e:
-        print(f"❌ Error handling {description} modal: {e}")
+        log.error("❌ Error handling %s modal: %s", description, e)
         return False
+
+
+class RetryableError(Exception):
+    """Raised for failures that are always worth retrying, e.g. a 5xx response."""
+
+
+class CircuitOpen(Exception):
+    """Raised when the circuit breaker refuses a call because the site looks degraded."""
+
+
+# Playwright error messages for elements that went away under a re-render
+_DETACHED_RE = re.compile(
+    r"not attached to the DOM|element is detached|Element is not attached|"
+    r"Execution context was destroyed|Cannot find context with specified id|"
+    r"Node is detached|element handle refers to a detached",
+    re.IGNORECASE
+)
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Classify a failure as transient.
+    
+    Timeouts (asyncio's and Playwright's), elements detached by a re-render and
+    steps interrupted by the error modal are retried; anything else is treated
+    as a real failure.
+    """
+    if isinstance(error, (RetryableError, StepInterrupted, asyncio.TimeoutError, TimeoutError)):
+        return True
+    if type(error).__name__ == 'TimeoutError':  # playwright.async_api.TimeoutError
+        return True
+    return bool(_DETACHED_RE.search(str(error)))
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Exponential backoff with jitter for one kind of step."""
+    attempts: int = 3
+    base_delay: float = 0.5  # seconds before the first retry
+    max_delay: float = 8.0
+    multiplier: float = 2.0
+    jitter: float = 0.5  # Fraction of each delay that is randomised
+    
+    def delay(self, attempt: int) -> float:
+        """Pause before retry number `attempt` (1-based)."""
+        delay = min(self.max_delay, self.base_delay * self.multiplier ** (attempt - 1))
+        return delay * (1 - self.jitter + self.jitter * random.random())
+
+
+def retry_policy(step: str) -> RetryPolicy:
+    """Policy for a step: RETRY_DEFAULT overlaid with the step's RETRY_POLICIES entry."""
+    return RetryPolicy(**{**RETRY_DEFAULT, **RETRY_POLICIES.get(step, {})})
+
+
+class CircuitBreaker:
+    """
+    Stops retrying against a degraded site.
+    
+    After `threshold` consecutive transient failures the circuit opens and
+    calls fail fast with CircuitOpen. After `reset_after` seconds a single
+    trial call is let through while concurrent calls keep failing fast;
+    success closes the circuit, failure reopens it.
+    """
+    
+    def __init__(self, threshold: int = CIRCUIT_FAILURE_THRESHOLD, reset_after: float = CIRCUIT_RESET_SECONDS):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.probe_at: Optional[float] = None  # When the in-flight trial call started
+        self.trips = 0
+    
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.reset_after:
+            return "half-open"
+        return "open"
+    
+    def allow(self) -> bool:
+        """True if a call may go ahead; when half-open, only for the one trial call."""
+        state = self.state
+        if state == "half-open":
+            now = time.monotonic()
+            # A trial that never reported back stops blocking after another reset period
+            if self.probe_at is not None and now - self.probe_at < self.reset_after:
+                return False
+            self.probe_at = now
+        return state != "open"
+    
+    def release(self):
+        """End a trial call that failed for reasons unrelated to the site's health."""
+        self.probe_at = None
+    
+    def record_success(self):
+        self.failures = 0
+        self.opened_at = None
+        self.probe_at = None
+    
+    def record_failure(self):
+        self.failures += 1
+        self.probe_at = None
+        if self.state == "half-open" or self.failures >= self.threshold:
+            if self.opened_at is None:
+                self.trips += 1
+                log.warning("🚧 Site looks degraded after %s failures, pausing calls for %.0fs",
+                            self.failures, self.reset_after)
+            self.opened_at = time.monotonic()
+
+
+async def retry_async(fn: Callable[[], Awaitable[T]], policy: Optional[RetryPolicy] = None,
+                      description: str = "step", breaker: Optional[CircuitBreaker] = None,
+                      classify: Callable[[BaseException], bool] = is_retryable) -> T:
+    """
+    Run a coroutine function, retrying transient failures with backoff.
+    
+    Backoff pauses never outlast the current deadline; if the budget can't
+    cover the next pause, the last error is raised instead.
+    
+    Args:
+        fn: Zero-argument coroutine function to run
+        policy: Retry policy, defaults to RETRY_DEFAULT
+        description: Description for logging
+        breaker: Circuit breaker shared by calls against the same site; give it only to
+            the call that talks to the site, since a falsy result counts as neither
+            success nor failure
+        classify: Decides whether an error is worth retrying
+        
+    Returns:
+        Whatever fn returns
+        
+    Raises:
+        CircuitOpen: If the breaker is open
+        Exception: The last error once it isn't retryable or attempts ran out
+    """
+    policy = policy or retry_policy("default")
+    for attempt in range(1, policy.attempts + 1):
+        if breaker and not breaker.allow():
+            raise CircuitOpen(f"{description} skipped: site looks degraded")
+        try:
+            result = await fn()
+        except Exception as e:
+            retryable = classify(e)
+            if breaker and retryable:
+                breaker.record_failure()
+                if breaker.state == "open":
+                    raise CircuitOpen(f"{description} failed: site looks degraded") from e
+            elif breaker:
+                breaker.release()
+            if not retryable or attempt == policy.attempts:
+                raise
+            
+            delay = policy.delay(attempt)
+            deadline = current_deadline()
+            if deadline is not None and deadline.remaining() <= delay:
+                raise
+            retry_stats[description] += 1
+            log.warning(
+                "🔁 %s failed (%s), retrying in %.1fs (%s/%s)...",
+                description, type(e).__name__, delay, attempt, policy.attempts - 1
+            )
+            await asyncio.sleep(delay)
+            continue
+        except BaseException:
+            # Cancelled or out of budget: the trial call tells nothing about the site
+            if breaker:
+                breaker.release()
+            raise
+        
+        if breaker and result:
+            breaker.record_success()
+        elif breaker:
+            breaker.release()  # Nothing proves the site is healthy again
+        return result
+
+
+# Retries per description, for reporting
+retry_stats: Counter = Counter()
+
+# Shared breaker for calls against playo.co
+site_breaker = CircuitBreaker()
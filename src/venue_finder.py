@@ -5,14 +5,35 @@ Handles sport selection, location search, and venue selection.
 
 import asyncio
 from typing import Dict, List, Optional
-from config import SELECTORS, DEFAULT_TIMEOUT, LONG_TIMEOUT, VENUE_BATCH_SIZE, VENUE_GARBAGE_PATTERNS
+from config import (
+    SELECTORS, DEFAULT_TIMEOUT, SHORT_TIMEOUT, LONG_TIMEOUT, VENUE_BATCH_SIZE, VENUE_GARBAGE_PATTERNS,
+    CAPTURE_WAIT_SECONDS, EXTRACTION_BACKEND
+)
+from src.deadline import budget_timeout, prompt
+from src.matching import MatchIndex, best_or_closest
+from src.models import HandleRegistry, Sport, Venue
+from src.network_capture import network_capture
+from src.popups import popup_guard
+from src.selector_cache import selector_resolver
+from src.snapshot import extract_sports, extract_venues, snapshot_extractor
+from src.utils import parse_distance_km, retry_async, retry_policy, site_breaker
+from src.venue_index import VenueIndex
+from src.log import get_logger
+
+log = get_logger(__name__)
 
 
 class VenueFinder:
     """Handles venue discovery and selection functionality."""
     
-    def __init__(self, page):
+    def __init__(self, page, venue_index: Optional[VenueIndex] = None):
         self.page = page
+        self.sport = None
+        self.area = ''  # Last searched location
+        self._capture_mark = 0
+        self.handles = HandleRegistry()  # Card handles/locators for scraped sports and venues
+        self.venue_index = venue_index or VenueIndex()
+        self.venue_index.load()
     
     async def select_sport(self) -> Optional[str]:
         """
@@ -26,41 +47,59 @@ class VenueFinder:
             sports = await self._scrape_sports()
             
             if not sports:
-                print("❌ No sports found")
+                log.error("❌ No sports found")
                 return None
             
             selected_sport = await self._prompt_sport_selection(sports)
+            self._capture_mark = network_capture.mark()
             await self._click_sport(sports[selected_sport])
             
-            return sports[selected_sport]['name']
+            self.sport = sports[selected_sport].name
+            return self.sport
             
         except Exception as e:
-            print(f"❌ Error in sport selection: {e}")
+            log.error("❌ Error in sport selection: %s", e)
             return None
     
-    async def select_venue(self) -> Optional[Dict]:
+    async def select_venue(self) -> Optional[Venue]:
         """
         Handle location search and venue selection.
         
         Returns:
-            Dict: Selected venue information, or None if selection failed
+            Venue: Selected venue, or None if selection failed
         """
         try:
             # Get location preference
-            location = input(
+            location = prompt(
                 "Which area do you want to search for venues in? "
-                "(e.g., Bellandur, HSR, Koramangala): "
+                "(e.g., Bellandur, HSR, Koramangala, or 'nearest' for the closest venue you've seen before): "
             ).strip()
+            if location.lower() == 'nearest':
+                venue = await self._open_nearest_catalogued()
+                if venue is not None:
+                    return venue
+                location = prompt("Which area do you want to search for venues in? ").strip()
+            self.area = location
             
             if location:
-                await self._search_location(location)
+                self._capture_mark = network_capture.mark()
+                try:
+                    await retry_async(
+                        lambda: popup_guard.run(self.page, lambda: self._search_location(location), "location search"),
+                        retry_policy("location search"), "location search", site_breaker
+                    )
+                except Exception as e:
+                    # Scrape whatever the page lists rather than give up on the venue step
+                    log.error("❌ Could not search location: %s", e)
             
             # Scrape and select venue
             venues = await self._scrape_venues()
             if not venues:
-                print("❌ No venues found")
+                log.error("❌ No venues found")
                 return None
             
+            self._record_venues(venues, location)
+            
             selected_venue_idx = await self._prompt_venue_selection(venues)
             selected_venue = venues[selected_venue_idx]
             
@@ -69,14 +108,69 @@ class VenueFinder:
             return selected_venue
             
         except Exception as e:
-            print(f"❌ Error in venue selection: {e}")
+            log.error("❌ Error in venue selection: %s", e)
             return None
     
+    def nearest_venues(self, k: int = VENUE_BATCH_SIZE, sport: Optional[str] = None) -> List[Dict]:
+        """
+        Return the k nearest catalogued venues offering a sport, without scraping.
+        
+        Args:
+            k: Number of venues to return
+            sport: Sport name, defaults to the selected sport
+            
+        Returns:
+            List[Dict]: Catalogue entries ordered by distance
+        """
+        return self.venue_index.nearest(k, sport or self.sport)
+    
+    async def _open_nearest_catalogued(self) -> Optional[Venue]:
+        """
+        Open the closest catalogued venue for the selected sport directly, without searching or scraping.
+        
+        Returns:
+            Venue: The opened venue, or None if no catalogued venue has a page to go to
+        """
+        for entry in self.nearest_venues():
+            url = entry.get('url') or ''
+            if not url.startswith('http'):
+                continue
+            distance = self.venue_index.distance_to(entry)
+            await self.page.goto(url)
+            self.area = entry.get('area', '')
+            log.info("✅ Opened nearest catalogued venue: %s (%.1f km)", entry['name'], distance)
+            return Venue(
+                name=entry['name'], venue=entry.get('venue', ''), location=entry.get('location', ''),
+                distance=f"{distance:.1f} km", distance_km=distance,
+                lat=entry.get('lat'), lng=entry.get('lng'), url=url,
+            )
+        log.info("📭 No catalogued %s venue with a known page yet; searching instead", self.sport or '')
+        return None
+    
+    def remember_venue_url(self, name: str, url: str):
+        """Record the page a venue opened on, so 'nearest' can go straight to it next time."""
+        entry = self.venue_index.venues.get(name)
+        if entry is None or not url or (entry.get('url') or '').startswith('http'):
+            return
+        entry['url'] = url
+        try:
+            self.venue_index.save()
+        except Exception as e:
+            log.warning("⚠️ Could not update venue catalogue: %s", e)
+    
+    def _record_venues(self, venues: List[Venue], area: str):
+        """Add scraped venues to the persistent catalogue."""
+        try:
+            self.venue_index.add_venues(venues, self.sport, area)
+            self.venue_index.save()
+        except Exception as e:
+            log.warning("⚠️ Could not update venue catalogue: %s", e)
+    
     async def _scroll_to_sports_section(self):
         """Scroll to the Popular Sports section."""
-        print("📜 Scrolling to Popular Sports section...")
+        log.info("📜 Scrolling to Popular Sports section...")
         try:
-            await self.page.wait_for_selector(SELECTORS["popular_sports_header"], timeout=LONG_TIMEOUT)
+            await self.page.locator(SELECTORS["popular_sports_header"]).first.wait_for(timeout=budget_timeout(LONG_TIMEOUT))
             await self.page.evaluate("""
                 () => {
                     const el = Array.from(document.querySelectorAll('h3'))
@@ -84,41 +178,47 @@ class VenueFinder:
                     if (el) el.scrollIntoView({behavior: 'smooth', block: 'center'});
                 }
             """)
-            print("✅ Popular Sports section is now visible")
+            log.debug("✅ Popular Sports section is now visible")
         except Exception as e:
-            print(f"⚠️ Could not scroll to Popular Sports section: {e}")
+            log.warning("⚠️ Could not scroll to Popular Sports section: %s", e)
     
-    async def _scrape_sports(self) -> List[Dict]:
+    async def _scrape_sports(self) -> List[Sport]:
         """Scrape available sports from the page."""
-        print("🔍 Scraping available sports...")
+        log.info("🔍 Scraping available sports...")
         try:
-            await self.page.wait_for_selector(SELECTORS["sports_container"], timeout=DEFAULT_TIMEOUT)
-            sports_container = await self.page.query_selector(SELECTORS["sports_container"])
-            
-            if not sports_container:
-                return []
+            await self.handles.dispose()
+            container = self.page.locator(SELECTORS["sports_container"]).first
+            await container.wait_for(timeout=budget_timeout(DEFAULT_TIMEOUT))
+            cards = container.locator(SELECTORS["sport_cards"])
             
-            sport_cards = await sports_container.query_selector_all(SELECTORS["sport_cards"])
-            sports = []
+            if EXTRACTION_BACKEND == "snapshot":
+                sports = await snapshot_extractor.run(self.page, extract_sports)
+                return [self.handles.register(sport, cards.nth(sport.index)) for sport in sports]
             
-            for idx, card in enumerate(sport_cards):
-                name_div = await card.query_selector(SELECTORS["sport_name"])
-                name = (await name_div.inner_text()).strip() if name_div else f"Sport {idx+1}"
-                sports.append({'name': name, 'el': card})
+            # Read every card name in one evaluation; cards are clicked through locators
+            names = await cards.evaluate_all("""
+                (cards, nameSelector) => cards.map(card => {
+                    const nameDiv = card.querySelector(nameSelector);
+                    return nameDiv ? nameDiv.innerText.trim() : '';
+                })
+            """, SELECTORS["sport_name"])
             
-            return sports
+            return [
+                self.handles.register(Sport(name or f"Sport {idx+1}", idx), cards.nth(idx))
+                for idx, name in enumerate(names)
+            ]
             
         except Exception as e:
-            print(f"❌ Error scraping sports: {e}")
+            log.error("❌ Error scraping sports: %s", e)
             return []
     
-    async def _prompt_sport_selection(self, sports: List[Dict]) -> int:
+    async def _prompt_sport_selection(self, sports: List[Sport]) -> int:
         """Prompt user to select a sport."""
         print("Available sports:")
         for i, sport in enumerate(sports, 1):
-            print(f"{i}. {sport['name']}")
+            print(f"{i}. {sport.name}")
         
-        user_input = input("Which sport do you want? Enter the number or name: ").strip()
+        user_input = prompt("Which sport do you want? Enter the number or name: ").strip()
         
         # Try number selection
         try:
@@ -126,95 +226,120 @@ class VenueFinder:
             if 0 <= num_choice < len(sports):
                 return num_choice
             else:
-                print(f"Invalid number. Defaulting to first sport: {sports[0]['name']}")
+                print(f"Invalid number. Defaulting to first sport: {sports[0].name}")
                 return 0
         except ValueError:
-            # Try name matching
-            matches = [i for i, s in enumerate(sports) if user_input.lower() in s['name'].lower()]
-            if matches:
-                return matches[0]
+            # Try ranked name matching
+            index = MatchIndex.for_names([s.name for s in sports])
+            match = best_or_closest(index, user_input, "sport")
+            if match is not None:
+                return match
             else:
-                print(f"No match found. Defaulting to first sport: {sports[0]['name']}")
+                print(f"No match found. Defaulting to first sport: {sports[0].name}")
                 return 0
     
-    async def _click_sport(self, sport: Dict):
+    async def _click_sport(self, sport: Sport):
         """Aggressively click the selected sport card."""
-        selected = sport['el']
+        selected = self.handles.get(sport)
         box = await selected.bounding_box()
         
         if box:
-            print(f"🎯 Clicking sport: {sport['name']}")
+            log.debug("🎯 Clicking sport: %s", sport.name)
             await self.page.mouse.move(box['x'] + box['width']/2, box['y'] + box['height']/2)
             await asyncio.sleep(0.5)
             
             try:
-                await selected.click(force=True, timeout=5000)
-                print("✅ Sport clicked successfully")
+                await selected.click(force=True, timeout=budget_timeout(SHORT_TIMEOUT))
+                log.debug("✅ Sport clicked successfully")
             except Exception as e:
-                print(f"Element click failed: {e}, trying mouse click")
+                log.debug("Element click failed: %s, trying mouse click", e)
                 try:
                     await self.page.mouse.click(box['x'] + box['width']/2, box['y'] + box['height']/2)
-                    print("✅ Sport clicked with mouse")
+                    log.debug("✅ Sport clicked with mouse")
                 except Exception as e2:
-                    print(f"❌ Both click methods failed: {e2}")
+                    log.error("❌ Both click methods failed: %s", e2)
         else:
-            print("❌ Could not get bounding box for sport card")
+            log.error("❌ Could not get bounding box for sport card")
     
-    async def _search_location(self, location: str):
-        """Search for a specific location."""
-        print(f"🔍 Searching for location: {location}")
-        try:
-            await self.page.wait_for_selector(SELECTORS["search_input"], timeout=DEFAULT_TIMEOUT)
-            await self.page.fill(SELECTORS["search_input"], location)
-            await self.page.press(SELECTORS["search_input"], 'Enter')
-            print(f"✅ Location search triggered for {location}")
-            await asyncio.sleep(2)
-        except Exception as e:
-            print(f"❌ Could not search location: {e}")
+    async def _search_location(self, location: str) -> bool:
+        """Search for a specific location; errors propagate so the caller can retry them."""
+        log.info("🔍 Searching for location: %s", location)
+        search_input = self.page.locator(SELECTORS["search_input"]).first
+        await search_input.fill(location, timeout=budget_timeout(DEFAULT_TIMEOUT))
+        await search_input.press('Enter')
+        log.debug("✅ Location search triggered for %s", location)
+        await asyncio.sleep(2)
+        return True
     
-    async def _scrape_venues(self) -> List[Dict]:
-        """Scrape venue information from the page."""
-        print("🏢 Scraping venue information...")
-        await asyncio.sleep(3)  # Wait for venues to load
+    async def _scrape_venues(self) -> List[Venue]:
+        """Scrape venue information, preferring the listing payload over the DOM."""
+        log.info("🏢 Scraping venue information...")
+        await self.handles.dispose()
         
-        # Try multiple selectors for venue cards
-        card_els = []
-        for selector in SELECTORS["venue_cards"]:
-            try:
-                card_els = await self.page.query_selector_all(selector)
-                if card_els:
-                    print(f"✅ Found {len(card_els)} venue cards")
-                    break
-            except Exception as e:
-                print(f"Selector failed: {e}")
-                continue
+        # Wait for the listing payload instead of a fixed render delay
+        venues = await network_capture.wait_for('venues', self._capture_mark, CAPTURE_WAIT_SECONDS)
+        if venues:
+            log.info("✅ Found %s venues in network payload", len(venues))
+            cards = self.page.locator(", ".join(SELECTORS["venue_cards"]))
+            for venue in venues:
+                # A card with an element reading exactly the name, so one venue's name inside another's can't match
+                name = self.page.get_by_text(venue.venue, exact=True).or_(self.page.get_by_text(venue.name, exact=True))
+                self.handles.register(venue, cards.filter(has=name).first)
+            return self._finalize_venues([v for v in venues if self._is_valid_venue(v.name)])
+        
+        if EXTRACTION_BACKEND == "snapshot":
+            return await self._scrape_venues_snapshot()
         
-        if not card_els:
-            print("❌ No venue cards found")
+        # Resolve venue cards, trying the selector that worked last time first
+        _, cards = await selector_resolver.locate(self.page, "venue_cards")
+        card_count = await cards.count() if cards else 0
+        if card_count:
+            log.info("✅ Found %s venue cards", card_count)
+        
+        if not card_count:
+            log.error("❌ No venue cards found")
             return []
         
         venues = []
-        for idx, card in enumerate(card_els):
+        for idx in range(card_count):
             try:
-                venue_info = await self._extract_venue_info(card, idx)
-                if venue_info and self._is_valid_venue(venue_info['name']):
+                venue_info = await self._extract_venue_info(cards.nth(idx), idx)
+                if venue_info and self._is_valid_venue(venue_info.name):
                     venues.append(venue_info)
-                    print(f"Venue {len(venues)}: {venue_info['name']} — {venue_info['distance']}")
+                    log.debug("Venue %s: %s — %s", len(venues), venue_info.name, venue_info.distance)
                 
             except Exception as e:
-                print(f"Error processing card {idx+1}: {e}")
+                log.warning("Error processing card %s: %s", idx+1, e)
                 continue
         
-        # Remove duplicates
-        return self._remove_duplicate_venues(venues)
+        return self._finalize_venues(venues)
+    
+    async def _scrape_venues_snapshot(self) -> List[Venue]:
+        """Extract venues from one page snapshot, with card locators for clicking."""
+        card_selector, venues = await snapshot_extractor.run(self.page, extract_venues)
+        if not venues:
+            log.error("❌ No venue cards found")
+            return []
+        log.info("✅ Found %s venue cards in page snapshot", len(venues))
+        
+        cards = self.page.locator(card_selector)
+        for venue in venues:
+            self.handles.register(venue, cards.nth(venue.index))
+        return self._finalize_venues([v for v in venues if self._is_valid_venue(v.name)])
     
-    async def _extract_venue_info(self, card, idx: int) -> Optional[Dict]:
-        """Extract venue information from a venue card element."""
+    def _finalize_venues(self, venues: List[Venue]) -> List[Venue]:
+        """Remove duplicates and order by distance (unknown distances last)."""
+        venues = self._remove_duplicate_venues(venues)
+        venues.sort(key=lambda v: (v.distance_km is None, v.distance_km or 0.0))
+        return venues
+    
+    async def _extract_venue_info(self, card, idx: int) -> Optional[Venue]:
+        """Extract venue information from a venue card locator."""
         # Extract name
         name = ''
         for name_selector in SELECTORS["venue_name_selectors"]:
-            name_el = await card.query_selector(name_selector)
-            if name_el:
+            name_el = card.locator(name_selector).first
+            if await name_el.count():
                 name = (await name_el.inner_text()).strip()
                 if name and len(name) > 3:
                     break
@@ -223,15 +348,14 @@ class VenueFinder:
         distance = ''
         for dist_selector in SELECTORS["venue_distance_selectors"]:
             try:
-                dist_els = await card.query_selector_all(dist_selector)
-                for dist_el in dist_els:
-                    dist_text = (await dist_el.inner_text()).strip()
+                for dist_text in await card.locator(dist_selector).all_inner_texts():
+                    dist_text = dist_text.strip()
                     if 'km' in dist_text:
                         distance = dist_text.replace('(', '').replace(')', '').strip()
                         break
                 if distance:
                     break
-            except:
+            except Exception:
                 continue
         
         # Parse venue name and location
@@ -240,14 +364,15 @@ class VenueFinder:
         else:
             venue, location = name, ''
         
-        return {
-            'name': name,
-            'venue': venue,
-            'location': location,
-            'distance': distance,
-            'el': card,
-            'index': idx
-        }
+        venue_info = Venue(
+            name=name,
+            venue=venue,
+            location=location,
+            distance=distance,
+            distance_km=parse_distance_km(distance),
+            index=idx,
+        )
+        return self.handles.register(venue_info, card)
     
     def _is_valid_venue(self, name: str) -> bool:
         """Check if venue name is valid (not garbage data)."""
@@ -257,21 +382,23 @@ class VenueFinder:
         name_lower = name.lower()
         return not any(pattern in name_lower for pattern in VENUE_GARBAGE_PATTERNS)
     
-    def _remove_duplicate_venues(self, venues: List[Dict]) -> List[Dict]:
+    def _remove_duplicate_venues(self, venues: List[Venue]) -> List[Venue]:
         """Remove duplicate venues based on name."""
         seen = set()
         unique_venues = []
         for venue in venues:
-            if venue['name'] not in seen:
+            if venue.name not in seen:
                 unique_venues.append(venue)
-                seen.add(venue['name'])
+                seen.add(venue.name)
         return unique_venues
     
-    async def _prompt_venue_selection(self, venues: List[Dict]) -> int:
+    async def _prompt_venue_selection(self, venues: List[Venue]) -> int:
         """Prompt user to select a venue with pagination."""
+        index = MatchIndex.for_names([v.name for v in venues])
+        
         if len(venues) == 1:
-            dist_str = f"{venues[0]['distance']} from your current location" if venues[0]['distance'] else "distance unknown"
-            print(f"Only one venue found: {venues[0]['name']} — {dist_str}")
+            dist_str = f"{venues[0].distance} from your current location" if venues[0].distance else "distance unknown"
+            print(f"Only one venue found: {venues[0].name} — {dist_str}")
             return 0
         
         start = 0
@@ -279,20 +406,25 @@ class VenueFinder:
             print("Available venues:")
             for i in range(start, min(start + VENUE_BATCH_SIZE, len(venues))):
                 venue = venues[i]
-                dist_str = f"{venue['distance']} from your current location" if venue['distance'] else "distance unknown"
-                print(f"{i+1}. {venue['name']} — {dist_str}")
+                dist_str = f"{venue.distance} from your current location" if venue.distance else "distance unknown"
+                print(f"{i+1}. {venue.name} — {dist_str}")
             
             if start + VENUE_BATCH_SIZE >= len(venues):
-                prompt = "Enter the number (1-N) or name of your choice: "
+                message = "Enter the number (1-N), name, or 'nearest': "
             else:
-                prompt = "Type 'more' to see more venues, or enter the number (1-N) or name of your choice: "
+                message = "Type 'more' to see more venues, or enter the number (1-N), name, or 'nearest': "
             
-            user_input = input(prompt).strip()
+            user_input = prompt(message).strip()
             
             if user_input.lower() == 'more' and start + VENUE_BATCH_SIZE < len(venues):
                 start += VENUE_BATCH_SIZE
                 continue
             
+            if user_input.lower() == 'nearest':
+                # Venues are sorted by distance, so the first one is the closest
+                print(f"Selected nearest venue: {venues[0].name}")
+                return 0
+            
             # Try number selection
             try:
                 num_choice = int(user_input) - 1
@@ -304,18 +436,22 @@ class VenueFinder:
             except ValueError:
                 pass
             
-            # Try name selection
-            matches = [idx for idx, v in enumerate(venues) if user_input.lower() in v['name'].lower()]
-            if len(matches) == 1:
-                print(f"Selected venue by name: {venues[matches[0]]['name']}")
-                return matches[0]
-            elif len(matches) > 1:
-                print("Multiple venues match that name. Please be more specific or use the number.")
+            # Try ranked name selection
+            best, ranked = index.best(user_input)
+            if best is not None:
+                print(f"Selected venue by name: {venues[best].name}")
+                return best
+            elif ranked:
+                print("Multiple venues match that name. Closest matches:")
+                for idx, _ in ranked:
+                    print(f"{idx+1}. {venues[idx].name}")
+                print("Please be more specific or use the number.")
             else:
                 print("Venue not found. Please try again.")
     
-    async def _click_venue(self, venue: Dict):
+    async def _click_venue(self, venue: Venue):
         """Click the selected venue."""
-        await venue['el'].scroll_into_view_if_needed()
-        await venue['el'].click()
-        print(f"✅ Selected venue: {venue['name']}")
+        card = self.handles.get(venue)
+        await card.scroll_into_view_if_needed()
+        await card.click()
+        log.info("✅ Selected venue: %s", venue.name)
@@ -0,0 +1,180 @@
+"""
+Venue index module for Playo booking automation.
+Keeps a persistent catalogue of scraped venues and answers distance queries
+around the configured geolocation without re-scraping.
+"""
+
+import bisect
+import json
+import os
+from typing import Dict, List, Optional, Tuple
+from config import GEOLOCATION, VENUE_CATALOGUE_PATH
+from src.models import Venue
+from src.utils import haversine_km
+from src.log import get_logger
+
+log = get_logger(__name__)
+
+
+def _same_origin(a: Optional[Dict], b: Optional[Dict]) -> bool:
+    """True if two geolocations agree to about a metre."""
+    if not a or not b:
+        return False
+    return all(
+        a.get(key) is not None and b.get(key) is not None and round(a[key], 5) == round(b[key], 5)
+        for key in ('latitude', 'longitude')
+    )
+
+
+class VenueIndex:
+    """Distance-ordered venue catalogue centred on the user's geolocation."""
+
+    ALL_SPORTS = '*'
+
+    def __init__(self, origin: Dict = None, path: str = VENUE_CATALOGUE_PATH):
+        self.origin = origin or GEOLOCATION
+        self.path = path
+        self.venues: Dict[str, Dict] = {}
+        # sport -> (sorted distances, venue names in the same order)
+        self._by_sport: Dict[str, Tuple[List[float], List[str]]] = {}
+        self._dirty = True
+        self.hits = 0  # Scraped venues the catalogue already knew
+        self.misses = 0
+
+    def load(self) -> int:
+        """
+        Load the catalogue from disk.
+
+        Returns:
+            int: Number of venues loaded
+        """
+        if not os.path.exists(self.path):
+            return 0
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            log.warning("⚠️ Could not read venue catalogue: %s", e)
+            return 0
+
+        # Scraped distance labels were measured from the origin the catalogue was saved at
+        moved = not _same_origin(data.get('origin'), self.origin)
+        stale = 0
+        for venue in data.get('venues', []):
+            venue['sports'] = set(venue.get('sports', []))
+            if moved and venue.pop('distance_km', None) is not None:
+                stale += 1
+            self.venues[venue['name']] = venue
+        if stale:
+            log.info("📍 Geolocation changed since the venue catalogue was saved; "
+                     "dropped %s scraped distances until those venues are seen again", stale)
+        self._dirty = True
+        return len(self.venues)
+
+    def save(self):
+        """Persist the catalogue to disk."""
+        venues = [
+            {**venue, 'sports': sorted(venue['sports'])}
+            for venue in self.venues.values()
+        ]
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'origin': self.origin, 'venues': venues}, f)
+        os.replace(tmp_path, self.path)
+
+    def add_venues(self, venues: List[Venue], sport: Optional[str] = None, area: str = ''):
+        """
+        Merge scraped venues into the catalogue.
+
+        Args:
+            venues: Venues as produced by VenueFinder
+            sport: Sport the venues were listed for
+            area: Area that was searched
+        """
+        for venue in venues:
+            if venue.name in self.venues:
+                self.hits += 1
+            else:
+                self.misses += 1
+            entry = self.venues.setdefault(venue.name, {'name': venue.name, 'sports': set()})
+            entry['venue'] = venue.venue or entry.get('venue', '')
+            entry['location'] = venue.location or entry.get('location', '')
+            entry['area'] = area or entry.get('area', '')
+            for key in ('distance_km', 'lat', 'lng', 'url'):
+                value = getattr(venue, key)
+                if value not in (None, ''):
+                    entry[key] = value
+            if sport:
+                entry['sports'].add(sport.lower())
+        self._dirty = True
+
+    def distance_to(self, venue: Dict) -> Optional[float]:
+        """
+        Distance from the origin to a venue, preferring coordinates over the scraped label.
+
+        Args:
+            venue: Venue dict
+
+        Returns:
+            float: Distance in kilometres, or None if unknown
+        """
+        if venue.get('lat') is not None and venue.get('lng') is not None:
+            return haversine_km(
+                self.origin['latitude'], self.origin['longitude'],
+                venue['lat'], venue['lng']
+            )
+        return venue.get('distance_km')
+
+    def nearest(self, k: int, sport: Optional[str] = None) -> List[Dict]:
+        """
+        Return the k nearest venues, optionally restricted to a sport.
+
+        Args:
+            k: Number of venues to return
+            sport: Sport name to filter by
+
+        Returns:
+            List[Dict]: Venues ordered by distance
+        """
+        _, names = self._bucket(sport)
+        return [self.venues[name] for name in names[:k]]
+
+    def within(self, radius_km: float, sport: Optional[str] = None) -> List[Dict]:
+        """
+        Return all venues within a radius, optionally restricted to a sport.
+
+        Args:
+            radius_km: Search radius in kilometres
+            sport: Sport name to filter by
+
+        Returns:
+            List[Dict]: Venues ordered by distance
+        """
+        distances, names = self._bucket(sport)
+        end = bisect.bisect_right(distances, radius_km)
+        return [self.venues[name] for name in names[:end]]
+
+    def _bucket(self, sport: Optional[str]) -> Tuple[List[float], List[str]]:
+        """Return the sorted (distances, names) bucket for a sport."""
+        if self._dirty:
+            self._rebuild()
+        key = sport.lower() if sport else self.ALL_SPORTS
+        return self._by_sport.get(key, ([], []))
+
+    def _rebuild(self):
+        """Rebuild the per-sport sorted buckets."""
+        entries: Dict[str, List[Tuple[float, str]]] = {self.ALL_SPORTS: []}
+        for name, venue in self.venues.items():
+            distance = self.distance_to(venue)
+            if distance is None:
+                continue
+            entries[self.ALL_SPORTS].append((distance, name))
+            for sport in venue['sports']:
+                entries.setdefault(sport, []).append((distance, name))
+
+        self._by_sport = {}
+        for key, items in entries.items():
+            items.sort()
+            self._by_sport[key] = ([d for d, _ in items], [n for _, n in items])
+        self._dirty = False
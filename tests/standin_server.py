@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Offline stand-in for Playo's availability API.
+Answers GET/POST /availability/<YYYY-MM-DD> with a slot and court payload in
+the shape network capture decodes, and keeps every request it saw. Point
+AVAILABILITY_BASE_URL at it to replay scans without touching the site:
+
+    python tests/standin_server.py [port]
+"""
+
+import json
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Set, Tuple
+
+SLOT_TIMES = ("06:00:00", "07:00:00", "08:00:00")
+COURTS = ("Court 1", "Court 2")
+
+
+def availability_payload(date: str, available: bool = True) -> Dict:
+    """Two courts at every slot, all free or all booked; prices rise through the day."""
+    slots = [{'slotTime': slot, 'price': 400 + 100 * i, 'available': available} for i, slot in enumerate(SLOT_TIMES)]
+    courts = [
+        {'courtName': court, 'slotTime': slot, 'price': 400 + 100 * i, 'available': available}
+        for i, slot in enumerate(SLOT_TIMES) for court in COURTS
+    ]
+    return {'date': date, 'data': {'slots': slots, 'courts': courts}}
+
+
+class StandinServer:
+    """Serves the stand-in API from a daemon thread; usable as a context manager."""
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.requests: List[Tuple[str, str, Dict[str, str]]] = []  # (method, path, headers)
+        self.missing: Set[str] = set()  # Dates answered with 404
+        self.booked: Set[str] = set()  # Dates whose every slot is taken
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _answer(self):
+                length = int(self.headers.get('Content-Length') or 0)
+                if length:
+                    self.rfile.read(length)
+                server.requests.append((self.command, self.path, {k.lower(): v for k, v in self.headers.items()}))
+
+                parts = self.path.split('?', 1)[0].strip('/').split('/')
+                if len(parts) != 2 or parts[0] != 'availability' or parts[1] in server.missing:
+                    self.send_error(404)
+                    return
+                payload = availability_payload(parts[1], available=parts[1] not in server.booked)
+                body = json.dumps(payload).encode('utf-8')
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = do_POST = _answer
+
+            def log_message(self, format, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StandinServer':
+        threading.Thread(target=self._server.serve_forever, name="standin", daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> 'StandinServer':
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+if __name__ == "__main__":
+    standin = StandinServer(port=int(sys.argv[1]) if len(sys.argv) > 1 else 8080)
+    print(f"Stand-in availability API at {standin.base_url}")
+    try:
+        standin._server.serve_forever()
+    except KeyboardInterrupt:
+        standin._server.server_close()
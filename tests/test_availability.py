@@ -0,0 +1,25 @@
+"""Checks for building the court x slot matrix from a decoded payload."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.availability import CourtMatrix  # noqa: E402
+from src.models import Court  # noqa: E402
+
+
+def test_from_courts_groups_by_slot_in_time_order():
+    courts = [
+        Court("Court 2", "₹500", 500.0, slot="07:00 AM"),
+        Court("Court 1", "₹400", 400.0, slot="06:00 AM"),
+        Court("Court 2", "₹450", 450.0, slot="06:00 AM"),
+        Court("Court 3", "", None, slot=""),  # Not tied to a slot: can't be placed
+    ]
+    matrix = CourtMatrix.from_courts(courts, ["08:00 AM", "06:00 AM"], "Arena", "2026-10-20")
+
+    assert matrix.slots == ["06:00 AM", "07:00 AM", "08:00 AM"]
+    assert matrix.courts == ["Court 1", "Court 2"]
+    assert matrix.free_courts("07:00 AM") == ["Court 2"]
+    assert not matrix.any_free("08:00 AM")
+    assert matrix.cheapest_overall() == ("06:00 AM", "Court 1", 400.0)
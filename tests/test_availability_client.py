@@ -0,0 +1,158 @@
+"""Checks for the availability client against the offline stand-in server."""
+
+import asyncio
+import json
+import os
+import sys
+import time
+import urllib.error
+import urllib.request
+from types import SimpleNamespace
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip("asyncio_throttle")
+
+from src.availability_client import AvailabilityClient  # noqa: E402
+from src.network_capture import network_capture  # noqa: E402
+from standin_server import StandinServer  # noqa: E402
+
+# What network capture records after the booking page loads one date
+CAPTURED = (
+    'GET', 'https://api.playo.io/availability/2026-10-20?venue=42', None,
+    {'authorization': 'Bearer test-token', 'content-type': 'application/json'},
+)
+DATES = ['2026-10-21', '2026-10-22', '2026-10-23', '2026-10-24']
+
+
+class RequestContext:
+    """The slice of Playwright's APIRequestContext the client uses, over urllib."""
+
+    async def fetch(self, url, method='GET', data=None, headers=None):
+        return await asyncio.to_thread(self._fetch, url, method, data, headers or {})
+
+    def _fetch(self, url, method, data, headers):
+        request = urllib.request.Request(url, data=data.encode() if data else None, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                status, body = response.status, response.read()
+        except urllib.error.HTTPError as e:
+            status, body = e.code, b''
+
+        async def parsed():
+            return json.loads(body)
+
+        return SimpleNamespace(status=status, ok=200 <= status < 300, json=parsed)
+
+
+@pytest.fixture
+def standin():
+    with StandinServer() as server:
+        yield server
+
+
+@pytest.fixture
+def captured(monkeypatch):
+    monkeypatch.setattr(network_capture, 'endpoints', {'courts': CAPTURED})
+
+
+def make_client(standin, fallback=None, rate_limit=100):
+    return AvailabilityClient(SimpleNamespace(request=RequestContext()), fallback=fallback,
+                              base_url=standin.base_url, rate_limit=rate_limit)
+
+
+def test_replays_captured_request_with_its_headers(standin, captured):
+    client = make_client(standin)
+    records = asyncio.run(client.fetch('2026-10-21'))
+
+    assert [slot.text for slot in records['slots']] == ['06:00 AM', '07:00 AM', '08:00 AM']
+    assert {court.name for court in records['courts']} == {'Court 1', 'Court 2'}
+    method, path, headers = standin.requests[0]
+    assert (method, path) == ('GET', '/availability/2026-10-21?venue=42')
+    assert headers['authorization'] == 'Bearer test-token'
+    assert headers['content-type'] == 'application/json'
+
+
+def test_rate_limit_spaces_requests(standin, captured):
+    client = make_client(standin, rate_limit=2)
+    start = time.monotonic()
+    results = asyncio.run(client.scan(DATES))
+
+    # Two requests per second: the last two of four wait for the next second
+    assert time.monotonic() - start >= 0.9
+    assert list(results) == DATES
+    assert client.requests == len(standin.requests) == 4
+
+
+def test_repeat_scan_is_served_from_cache(standin, captured):
+    client = make_client(standin)
+
+    async def scan_twice():
+        first = await client.scan(DATES)
+        second = await client.scan(DATES)
+        return first, second
+
+    first, second = asyncio.run(scan_twice())
+    assert first == second
+    assert len(standin.requests) == len(DATES)
+    assert client.cache_hits == len(DATES)
+
+
+def test_falls_back_to_the_page_when_the_request_fails(standin, captured):
+    standin.missing.add('2026-10-22')
+    seen = []
+
+    async def fallback(date):
+        seen.append(date)
+        return {'slots': ['from page'], 'courts': []}
+
+    client = make_client(standin, fallback=fallback)
+    results = asyncio.run(client.scan(DATES))
+
+    assert seen == ['2026-10-22']
+    assert results['2026-10-22'] == {'slots': ['from page'], 'courts': []}
+    assert client.fallbacks == 1
+
+
+def test_fully_booked_date_does_not_fall_back(standin, captured):
+    standin.booked.add('2026-10-22')
+
+    async def fallback(date):
+        raise AssertionError(f"fell back for {date}")
+
+    client = make_client(standin, fallback=fallback)
+    results = asyncio.run(client.scan(DATES))
+
+    assert results['2026-10-22'] == {'venues': [], 'slots': [], 'courts': []}
+    assert client.fallbacks == 0
+
+
+def test_date_the_page_cannot_show_has_no_result(standin, monkeypatch):
+    monkeypatch.setattr(network_capture, 'endpoints', {})
+
+    async def fallback(date):
+        return None
+
+    client = make_client(standin, fallback=fallback)
+    assert asyncio.run(client.scan(DATES[:2])) == {DATES[0]: None, DATES[1]: None}
+
+
+def test_falls_back_to_the_page_until_an_endpoint_is_captured(standin, monkeypatch):
+    monkeypatch.setattr(network_capture, 'endpoints', {})
+    seen = []
+
+    async def fallback(date):
+        # Driving the page makes the site issue the request network capture records
+        seen.append(date)
+        network_capture.endpoints['courts'] = CAPTURED
+        return {'slots': ['from page'], 'courts': []}
+
+    client = make_client(standin, fallback=fallback)
+    results = asyncio.run(client.scan(DATES))
+
+    assert seen == DATES[:1]
+    assert client.requests == len(DATES) - 1
+    assert all(records['courts'] for date, records in results.items() if date != DATES[0])
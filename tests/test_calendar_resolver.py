@@ -0,0 +1,62 @@
+"""Checks for mapping calendar grid cells to full dates."""
+
+import os
+import sys
+from datetime import date
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.calendar_resolver import map_calendar_cells, parse_month_header  # noqa: E402
+
+
+def cells(*days, outside=()):
+    return [{'text': str(day), 'label': '', 'outside': idx in outside} for idx, day in enumerate(days)]
+
+
+def test_parse_month_header():
+    assert parse_month_header("Select a date\nAugust 2026\nMo Tu We") == (2026, 8)
+    assert parse_month_header("no heading here") is None
+
+
+def test_leading_run_stays_in_header_month_without_evidence():
+    # August 29 onwards is selectable; the grid continues into September
+    grid = cells(29, 30, 31, *range(1, 11))
+    mapping = map_calendar_cells(2026, 8, grid)
+    assert mapping[date(2026, 8, 29)] == 0
+    assert mapping[date(2026, 8, 31)] == 2
+    assert mapping[date(2026, 9, 1)] == 3
+    assert date(2026, 7, 29) not in mapping
+
+
+def test_leading_run_is_previous_month_when_whole_month_follows():
+    grid = cells(29, 30, 31, *range(1, 32), 1, 2)
+    mapping = map_calendar_cells(2026, 8, grid)
+    assert mapping[date(2026, 7, 29)] == 0
+    assert mapping[date(2026, 8, 1)] == 3
+    assert mapping[date(2026, 8, 31)] == 33
+    assert mapping[date(2026, 9, 2)] == 35
+
+
+def test_leading_run_is_previous_month_when_flagged_outside():
+    grid = cells(29, 30, 31, *range(1, 11), outside=(0, 1, 2))
+    mapping = map_calendar_cells(2026, 8, grid)
+    assert mapping[date(2026, 7, 31)] == 2
+    assert mapping[date(2026, 8, 10)] == 12
+
+
+def test_explicit_labels_win():
+    grid = [{'text': '29', 'label': '2026-08-29'}, {'text': '1', 'label': ''}]
+    mapping = map_calendar_cells(2026, 8, grid)
+    assert mapping[date(2026, 8, 29)] == 0
+    assert mapping[date(2026, 9, 1)] == 1
+    assert date(2026, 8, 1) not in mapping
+
+
+def test_labelled_cells_set_the_month_of_their_run():
+    # The tail of July is labelled; the unlabelled run after it is August, not September
+    grid = [{'text': str(day), 'label': f'2026-07-{day}'} for day in (29, 30, 31)]
+    grid += [{'text': str(day), 'label': ''} for day in range(1, 11)]
+    mapping = map_calendar_cells(2026, 8, grid)
+    assert mapping[date(2026, 7, 31)] == 2
+    assert mapping[date(2026, 8, 1)] == 3
+    assert mapping[date(2026, 8, 10)] == 12
@@ -0,0 +1,63 @@
+"""Checks for the circuit breaker's half-open trial call."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.utils import CircuitBreaker, retry_async, RetryPolicy  # noqa: E402
+
+
+def half_open():
+    breaker = CircuitBreaker(threshold=1, reset_after=60)
+    breaker.record_failure()
+    breaker.opened_at -= 60  # As if the reset period had passed
+    return breaker
+
+
+def test_half_open_lets_a_single_trial_through():
+    breaker = half_open()
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+    assert not breaker.allow()
+
+
+def test_trial_outcome_decides_the_state():
+    breaker = half_open()
+    breaker.allow()
+    breaker.record_success()
+    assert breaker.state == "closed"
+    assert breaker.allow() and breaker.allow()
+
+    breaker = half_open()
+    breaker.allow()
+    breaker.record_failure()
+    assert breaker.state == "open"
+    assert not breaker.allow()
+
+
+def test_released_trial_frees_the_slot():
+    breaker = half_open()
+    assert breaker.allow()
+    assert not breaker.allow()
+    breaker.release()
+    assert breaker.allow()
+
+
+def test_falsy_result_does_not_close_the_circuit():
+    breaker = half_open()
+
+    async def nothing_found():
+        return False
+
+    assert asyncio.run(retry_async(nothing_found, RetryPolicy(attempts=1), "probe", breaker)) is False
+    assert breaker.state == "half-open"
+    assert breaker.allow()
+
+    async def clicked():
+        return True
+
+    breaker.release()
+    asyncio.run(retry_async(clicked, RetryPolicy(attempts=1), "probe", breaker))
+    assert breaker.state == "closed"
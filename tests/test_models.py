@@ -0,0 +1,26 @@
+"""Checks for model serialisation and payload decoding of venue links."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Court, TimeSlot, dump_jsonl, iter_jsonl  # noqa: E402
+from src.network_capture import decode_payload  # noqa: E402
+
+
+def test_jsonl_round_trip(tmp_path):
+    path = str(tmp_path / "scan.jsonl")
+    models = [TimeSlot("06:00 AM", 360), Court("Court 1", "₹400", 400.0, slot="06:00 AM")]
+    assert dump_jsonl(iter(models), path) == 2
+    assert list(iter_jsonl(path)) == models
+
+
+def test_venue_links_are_absolute_or_empty():
+    payload = {'venues': [
+        {'name': 'Slug Arena', 'area': 'HSR', 'distance': 1.2, 'slug': 'slug-arena-hsr'},
+        {'name': 'Path Arena', 'area': 'HSR', 'distance': 2.0, 'url': '/venues/bengaluru/path-arena'},
+        {'name': 'Full Arena', 'area': 'HSR', 'distance': 3.0, 'url': 'https://playo.co/venues/full'},
+    ]}
+    urls = [venue.url for venue in decode_payload(payload)['venues']]
+    assert urls == ['', 'https://playo.co/venues/bengaluru/path-arena', 'https://playo.co/venues/full']
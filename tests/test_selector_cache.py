@@ -0,0 +1,65 @@
+"""Checks that the selector race keeps the fallback list's priority order."""
+
+import asyncio
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.selector_cache import SelectorResolver  # noqa: E402
+
+CANDIDATES = [
+    'button[aria-label="Add to Cart"]',
+    'button:has-text("Add To Cart")',
+    'button.bg-primary.text-white',
+    'button.bg-primary:has-text("Add")',
+]
+
+
+class Locator:
+    def __init__(self, page, selector):
+        self.page, self.selector = page, selector
+
+    async def count(self):
+        self.page.counted.append(self.selector)
+        return int(self.selector in self.page.matching)
+
+
+class Page:
+    """Matches a fixed set of selectors, the way the race script and the engine would."""
+
+    def __init__(self, *matching):
+        self.matching = set(matching)
+        self.counted = []
+
+    async def evaluate(self, script, selectors):
+        return next((i for i, selector in enumerate(selectors) if selector in self.matching), -1)
+
+    def locator(self, selector):
+        return Locator(self, selector)
+
+
+def race(page, skip=None):
+    return asyncio.run(SelectorResolver(path=os.devnull)._race(page, CANDIDATES, skip))
+
+
+def test_earlier_engine_only_selector_beats_later_css():
+    page = Page(CANDIDATES[1], CANDIDATES[2])
+    assert race(page) == CANDIDATES[1]
+
+
+def test_css_winner_skips_engine_only_selectors_listed_after_it():
+    page = Page(CANDIDATES[0], CANDIDATES[3])
+    assert race(page) == CANDIDATES[0]
+    assert page.counted == []
+
+
+def test_engine_only_selectors_after_css_are_tried_when_no_css_matches():
+    page = Page(CANDIDATES[3])
+    assert race(page) == CANDIDATES[3]
+    assert race(Page()) is None
+
+
+def test_skipped_selector_never_wins():
+    page = Page(CANDIDATES[1], CANDIDATES[2])
+    assert race(page, skip=CANDIDATES[1]) == CANDIDATES[2]
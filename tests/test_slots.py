@@ -0,0 +1,41 @@
+"""Checks that slot runs use the slot lengths the site reports."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.network_capture import decode_payload  # noqa: E402
+from src.slots import SlotIndex, parse_slot_minutes  # noqa: E402
+
+
+def test_single_hour_slot_fits_an_hour():
+    index = SlotIndex(["06:00 PM"], [60])
+    assert index.free_minutes(0) == 60
+    assert index.earliest_fit(18 * 60, 60) == 0
+
+
+def test_length_comes_from_range_labels():
+    assert parse_slot_minutes("06:00 AM - 07:30 AM") == 90
+    assert parse_slot_minutes("06:00 AM") is None
+
+    index = SlotIndex(["06:00 AM - 06:30 AM", "06:30 AM - 07:00 AM", "08:00 AM - 08:30 AM"])
+    assert index.free_minutes(0) == 60
+    assert index.free_minutes(2) == 30
+    assert index.earliest_fit(6 * 60, 60) == 0
+    assert index.earliest_fit(7 * 60, 60) is None
+
+
+def test_overlapping_starts_extend_the_run():
+    index = SlotIndex(["06:00 AM", "06:30 AM"], [60, 60])
+    assert index.free_minutes(0) == 90
+    assert index.free_minutes(1) == 60
+
+
+def test_payload_slot_length():
+    records = decode_payload({'slots': [
+        {'slotTime': '18:00:00', 'endTime': '19:00:00', 'available': True},
+        {'slotTime': '20:00:00', 'durationMinutes': 30, 'available': True},
+        {'slotTime': '21:00:00', 'available': True},
+    ]})
+    assert [slot.length for slot in records['slots']] == [60, 30, None]
@@ -0,0 +1,47 @@
+"""Checks for the venue catalogue's distances across geolocation changes."""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.models import Venue  # noqa: E402
+from src.utils import parse_distance_km  # noqa: E402
+from src.venue_index import VenueIndex  # noqa: E402
+
+KORAMANGALA = {"latitude": 12.9352, "longitude": 77.6762}
+WHITEFIELD = {"latitude": 12.9698, "longitude": 77.7500}
+
+
+def saved_catalogue(path):
+    index = VenueIndex(KORAMANGALA, path)
+    index.add_venues([
+        Venue(name="Labelled - HSR", distance="1.2 km", distance_km=1.2),
+        Venue(name="Located - Bellandur", distance="3 km", distance_km=3.0, lat=12.9082, lng=77.6762),
+    ], sport="Badminton")
+    index.save()
+    return path
+
+
+def test_same_origin_keeps_scraped_distances(tmp_path):
+    index = VenueIndex(dict(KORAMANGALA), saved_catalogue(str(tmp_path / "catalogue.json")))
+    assert index.load() == 2
+    assert [venue['name'] for venue in index.nearest(5)] == ["Labelled - HSR", "Located - Bellandur"]
+
+
+def test_moved_origin_drops_scraped_distances(tmp_path):
+    index = VenueIndex(WHITEFIELD, saved_catalogue(str(tmp_path / "catalogue.json")))
+    assert index.load() == 2
+
+    # Only the venue with coordinates can still be placed relative to the new origin
+    nearest = index.nearest(5, sport="badminton")
+    assert [venue['name'] for venue in nearest] == ["Located - Bellandur"]
+    assert index.distance_to(nearest[0]) > 9
+
+
+def test_parse_distance_km_accepts_plural_units():
+    assert parse_distance_km("(2.3 kms)") == 2.3
+    assert parse_distance_km("2.3 km") == 2.3
+    assert parse_distance_km("850 m") == 0.85
+    assert parse_distance_km("850 ms") == 0.85
+    assert parse_distance_km("nearby") is None